@@ -0,0 +1,359 @@
+###############################################################################
+#
+# The MIT License (MIT)
+#
+# Copyright (c) Tavendo GmbH
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+###############################################################################
+
+from __future__ import absolute_import
+
+import os
+import struct
+
+if os.environ.get('USE_ASYNCIO', False):
+
+    import unittest
+
+    try:
+        import asyncio
+    except ImportError:
+        # noinspection PyUnresolvedReferences
+        import trollius as asyncio
+
+    from autobahn.websocket.protocol import WebSocketProtocol
+    from autobahn.asyncio.websocket import WebSocketServerProtocol, \
+        WebSocketServerFactory
+
+    class FakeTransport:
+
+        def __init__(self):
+            self.written = []
+            self.buffered = 0
+            self.reading = True
+            self.limits = None
+
+        def get_extra_info(self, name):
+            return ('127.0.0.1', 12345)
+
+        def set_write_buffer_limits(self, high, low):
+            self.limits = (high, low)
+
+        def get_write_buffer_size(self):
+            return self.buffered
+
+        def write(self, data):
+            self.written.append(data)
+
+        def writelines(self, data):
+            self.written.extend(data)
+
+        def pause_reading(self):
+            self.reading = False
+
+        def resume_reading(self):
+            self.reading = True
+
+        def close(self):
+            pass
+
+    class EventProtocol(WebSocketServerProtocol):
+
+        def onWritePaused(self):
+            self.events.append('paused')
+
+        def onWriteResumed(self):
+            self.events.append('resumed')
+
+    def create_protocol(loop, **options):
+        factory = WebSocketServerFactory(loop=loop)
+        factory.protocol = EventProtocol
+        factory.setProtocolOptions(openHandshakeTimeout=0, **options)
+        proto = factory()
+        proto.events = []
+        proto.connection_made(FakeTransport())
+        proto.state = WebSocketProtocol.STATE_OPEN
+        proto.websocket_version = 13
+        proto.inside_message = False
+        proto.current_frame = None
+        return proto
+
+    def frame(payload):
+        # masked text frame (with an all-zero mask), as sent by a client
+        return struct.pack('!BB', 0x81, 0x80 | len(payload)) + b'\x00\x00\x00\x00' + payload
+
+    class Producer:
+
+        def __init__(self, proto, chunks):
+            self.proto = proto
+            self.chunks = list(chunks)
+            self.calls = 0
+            self.paused = False
+
+        def resumeProducing(self):
+            self.calls += 1
+            self.paused = False
+            if self.chunks:
+                chunk = self.chunks.pop(0)
+                if chunk:
+                    self.proto.sendMessage(chunk)
+
+        def pauseProducing(self):
+            self.paused = True
+
+        def stopProducing(self):
+            pass
+
+    class LoopTestCase(unittest.TestCase):
+
+        def setUp(self):
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+
+        def tearDown(self):
+            asyncio.set_event_loop(None)
+            self.loop.close()
+
+        def run_loop(self, delay=0):
+            for _ in range(3):
+                self.loop.run_until_complete(asyncio.sleep(delay))
+
+    class TestDrain(LoopTestCase):
+
+        def setUp(self):
+            LoopTestCase.setUp(self)
+            self.proto = create_protocol(self.loop, writeBufferHighWatermark=1000, writeBufferLowWatermark=100)
+
+        def test_drain(self):
+            self.proto.pause_writing()
+            self.assertTrue(self.proto.writePaused)
+            d = self.proto.drain()
+            self.assertFalse(d.done())
+            self.proto.resume_writing()
+            self.assertTrue(d.done())
+            self.assertEqual(self.proto.events, ['paused', 'resumed'])
+
+        def test_cancelled_drain(self):
+            self.proto.pause_writing()
+            cancelled = self.proto.drain()
+            d = self.proto.drain()
+            cancelled.cancel()
+            self.proto.resume_writing()
+            self.assertTrue(d.done())
+
+        def test_cancelled_drain_connection_lost(self):
+            self.proto.pause_writing()
+            cancelled = self.proto.drain()
+            d = self.proto.drain()
+            cancelled.cancel()
+            self.proto.connection_lost(None)
+            self.assertTrue(d.done())
+
+    class TestWriteFlowControl(LoopTestCase):
+
+        def test_limits(self):
+            proto = create_protocol(self.loop, writeBufferHighWatermark=1000, writeBufferLowWatermark=100)
+            self.assertEqual(proto.transport.limits, (1000, 100))
+            proto.pause_writing()
+            proto.resume_writing()
+            self.assertEqual(proto.events, ['paused', 'resumed'])
+
+        def test_disabled(self):
+            proto = create_protocol(self.loop)
+            self.assertEqual(proto.transport.limits, None)
+            proto.pause_writing()
+            self.assertFalse(proto.writePaused)
+
+            # the transport's default limits still apply to drain()
+            d = proto.drain()
+            self.assertFalse(d.done())
+            proto.resume_writing()
+            self.assertTrue(d.done())
+            self.assertEqual(proto.events, [])
+
+    class TestProducer(LoopTestCase):
+
+        def setUp(self):
+            LoopTestCase.setUp(self)
+            self.proto = create_protocol(self.loop, writeBufferHighWatermark=1000, writeBufferLowWatermark=100)
+
+        def test_pull_producer(self):
+            producer = Producer(self.proto, [b'a', b'b', None, b'c'])
+            self.proto.registerProducer(producer, False)
+            self.assertEqual(producer.calls, 1)
+            self.run_loop()
+            self.assertEqual(producer.calls, 3)
+
+            # the producer wrote nothing, but is asked again later
+            self.run_loop(self.proto._WRITE_BUFFER_POLL_INTERVAL)
+            self.assertTrue(producer.calls >= 4)
+            self.assertEqual(b''.join(self.proto.transport.written), b'\x81\x01a\x81\x01b\x81\x01c')
+
+        def test_pull_producer_paused(self):
+            producer = Producer(self.proto, [b'a'] * 10)
+            self.proto.registerProducer(producer, False)
+            self.proto.pause_writing()
+            self.run_loop()
+            self.assertEqual(producer.calls, 1)
+            self.proto.resume_writing()
+            self.assertEqual(producer.calls, 2)
+            self.run_loop()
+            self.assertTrue(producer.calls > 2)
+
+        def test_streaming_producer(self):
+            producer = Producer(self.proto, [])
+            self.proto.registerProducer(producer, True)
+            self.assertEqual(producer.calls, 0)
+            self.proto.pause_writing()
+            self.assertTrue(producer.paused)
+            self.proto.resume_writing()
+            self.assertFalse(producer.paused)
+            self.assertEqual(producer.calls, 1)
+
+        def test_default_limits(self):
+            proto = create_protocol(self.loop)
+            producer = Producer(proto, [b'a'] * 10)
+            proto.registerProducer(producer, False)
+            proto.pause_writing()
+            self.run_loop()
+            self.assertEqual(producer.calls, 1)
+            proto.resume_writing()
+            self.run_loop()
+            self.assertTrue(producer.calls > 2)
+
+            producer = Producer(proto, [])
+            proto.unregisterProducer()
+            proto.registerProducer(producer, True)
+            proto.pause_writing()
+            self.assertTrue(producer.paused)
+            proto.resume_writing()
+            self.assertFalse(producer.paused)
+            self.assertEqual(proto.events, [])
+
+        def test_pull_producer_not_open(self):
+            # octets written before the opening handshake count as progress, too
+            self.proto.state = WebSocketProtocol.STATE_CONNECTING
+            producer = Producer(self.proto, [])
+            producer.resumeProducing = lambda: self.proto.sendData(b'x')
+            self.proto.registerProducer(producer, False)
+            self.run_loop()
+            self.assertTrue(len(self.proto.transport.written) > 3)
+
+        def test_unregister(self):
+            producer = Producer(self.proto, [None])
+            self.proto.registerProducer(producer, False)
+            self.assertTrue(self.proto._pullCall is not None)
+            self.proto.connection_lost(None)
+            self.assertTrue(self.proto._pullCall is None)
+            self.assertTrue(self.proto._producer is None)
+
+    class TestReceiveFlowControl(LoopTestCase):
+
+        def create_protocol(self, **options):
+            proto = create_protocol(self.loop, **options)
+            proto.futures = []
+
+            def onMessage(payload, isBinary):
+                f = asyncio.Future(loop=self.loop)
+                proto.futures.append(f)
+                return f
+            proto.onMessage = onMessage
+            return proto
+
+        def test_message_watermarks(self):
+            proto = self.create_protocol(receiveQueueHighWatermark=2, receiveQueueLowWatermark=1)
+            proto.data_received(frame(b'1'))
+            proto.data_received(frame(b'2'))
+            self.assertTrue(proto.transport.reading)
+            proto.data_received(frame(b'3'))
+            self.assertFalse(proto.transport.reading)
+
+            proto.futures[0].set_result(None)
+            self.run_loop()
+            self.assertFalse(proto.transport.reading)
+
+            proto.futures[1].set_result(None)
+            self.run_loop()
+            self.assertTrue(proto.transport.reading)
+
+        def test_message_watermarks_disabled(self):
+            proto = self.create_protocol()
+            for i in range(10):
+                proto.data_received(frame(b'x'))
+            self.assertEqual(len(proto.futures), 10)
+            self.assertTrue(proto.transport.reading)
+
+        def test_inline(self):
+            proto = self.create_protocol()
+            proto.data_received(frame(b'1'))
+            self.assertEqual(len(proto.futures), 1)
+            self.assertEqual(len(proto.receive_queue), 0)
+            self.assertTrue(proto._consumeCall is None)
+
+        def test_queued(self):
+            proto = self.create_protocol(asyncReceiveQueueSize=3)
+            proto.data_received(frame(b'1'))
+            proto.data_received(frame(b'2'))
+            self.assertEqual(proto.futures, [])
+            self.assertTrue(proto.transport.reading)
+
+            # reading is paused when the queue is full ..
+            proto.data_received(frame(b'3'))
+            self.assertFalse(proto.transport.reading)
+
+            # .. and resumed when the queue has been processed
+            self.run_loop()
+            self.assertEqual(len(proto.futures), 3)
+            self.assertEqual(len(proto.receive_queue), 0)
+            self.assertTrue(proto.transport.reading)
+
+        def test_queued_message_watermarks(self):
+            proto = self.create_protocol(asyncReceiveQueueSize=2,
+                                         receiveQueueHighWatermark=1,
+                                         receiveQueueLowWatermark=0)
+            proto.data_received(frame(b'1'))
+            proto.data_received(frame(b'2'))
+            self.assertFalse(proto.transport.reading)
+
+            # the queue has been processed, but messages are still pending
+            self.run_loop()
+            self.assertEqual(len(proto.futures), 2)
+            self.assertFalse(proto.transport.reading)
+
+            proto.futures[0].set_result(None)
+            self.run_loop()
+            self.assertFalse(proto.transport.reading)
+
+            proto.futures[1].set_result(None)
+            self.run_loop()
+            self.assertTrue(proto.transport.reading)
+
+        def test_queued_connection_lost(self):
+            proto = self.create_protocol(asyncReceiveQueueSize=2)
+            proto.data_received(frame(b'1'))
+            proto.connection_lost(None)
+            self.assertTrue(proto._consumeCall is None)
+            self.run_loop()
+            self.assertEqual(proto.futures, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
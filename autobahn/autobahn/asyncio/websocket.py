@@ -73,8 +73,16 @@ class WebSocketAdapterProtocol(asyncio.Protocol):
     def connection_made(self, transport):
         self.transport = transport
 
+        # incoming data queued for asynchronous processing (only used
+        # when asyncReceiveQueueSize is set)
         self.receive_queue = deque()
-        self._consume()
+        self._consumeCall = None
+
+        # read side flow control: number of received messages still
+        # being processed by the application, and reasons reading from
+        # the transport is paused for
+        self._receivePending = 0
+        self._readingPausedBy = set()
 
         try:
             peer = transport.get_extra_info('peername')
@@ -89,28 +97,60 @@ class WebSocketAdapterProtocol(asyncio.Protocol):
 
         self._connectionMade()
 
+        # let the transport tell us when to pause and resume writing
+        if self.writeBufferHighWatermark > 0:
+            self.transport.set_write_buffer_limits(high=self.writeBufferHighWatermark,
+                                                   low=self.writeBufferLowWatermark)
+
     def connection_lost(self, exc):
         self._connectionLost(exc)
+        if self._consumeCall is not None:
+            self._consumeCall.cancel()
+            self._consumeCall = None
         self.transport = None
 
+    def pause_writing(self):
+        self._pauseTransportWriting()
+
+    def resume_writing(self):
+        self._resumeTransportWriting()
+
+    def data_received(self, data):
+        if self.asyncReceiveQueueSize > 0:
+            self.receive_queue.append(data)
+            if self._consumeCall is None:
+                self._consumeCall = self.factory.loop.call_soon(self._consume)
+            if len(self.receive_queue) >= self.asyncReceiveQueueSize:
+                self._pauseReading('queue')
+        else:
+            self._dataReceived(data)
+
     def _consume(self):
-        self.waiter = Future()
+        self._consumeCall = None
+        while self.receive_queue and self.transport:
+            self._dataReceived(self.receive_queue.popleft())
+        self._resumeReading('queue')
 
-        def process(_):
-            while len(self.receive_queue):
-                data = self.receive_queue.popleft()
-                if self.transport:
-                    self._dataReceived(data)
-                else:
-                    print("WebSocketAdapterProtocol._consume: no transport")
-            self._consume()
+    def _pauseReading(self, reason):
+        if not self._readingPausedBy:
+            self.transport.pause_reading()
+        self._readingPausedBy.add(reason)
 
-        self.waiter.add_done_callback(process)
+    def _resumeReading(self, reason):
+        if reason in self._readingPausedBy:
+            self._readingPausedBy.discard(reason)
+            if not self._readingPausedBy and self.transport:
+                self.transport.resume_reading()
 
-    def data_received(self, data):
-        self.receive_queue.append(data)
-        if not self.waiter.done():
-            self.waiter.set_result(None)
+    def _writeSequence(self, data):
+        self.transport.writelines(data)
+
+    def _getWriteBufferSize(self):
+        return self.transport.get_write_buffer_size()
+
+    def _checkWriteBuffer(self):
+        # the transport calls pause_writing() / resume_writing() by itself
+        pass
 
     # noinspection PyUnusedLocal
     def _closeConnection(self, abort=False):
@@ -154,7 +194,17 @@ class WebSocketAdapterProtocol(asyncio.Protocol):
     def _onMessage(self, payload, isBinary):
         res = self.onMessage(payload, isBinary)
         if yields(res):
-            asyncio.async(res)
+            f = asyncio.async(res)
+            if self.receiveQueueHighWatermark > 0:
+                self._receivePending += 1
+                f.add_done_callback(self._onMessageDone)
+                if self._receivePending > self.receiveQueueHighWatermark:
+                    self._pauseReading('messages')
+
+    def _onMessageDone(self, _):
+        self._receivePending -= 1
+        if self._receivePending <= self.receiveQueueLowWatermark:
+            self._resumeReading('messages')
 
     def _onPing(self, payload):
         res = self.onPing(payload)
@@ -166,14 +216,31 @@ class WebSocketAdapterProtocol(asyncio.Protocol):
         if yields(res):
             asyncio.async(res)
 
+    def _onWritePaused(self):
+        res = self.onWritePaused()
+        if yields(res):
+            asyncio.async(res)
+
+    def _onWriteResumed(self):
+        res = self.onWriteResumed()
+        if yields(res):
+            asyncio.async(res)
+
+    @staticmethod
+    def _create_future():
+        return Future()
+
+    @staticmethod
+    def _resolve_future(future, value):
+        # the future might have been cancelled (e.g. by a timeout) in the meantime
+        if not future.done():
+            future.set_result(value)
+
     def _onClose(self, wasClean, code, reason):
         res = self.onClose(wasClean, code, reason)
         if yields(res):
             asyncio.async(res)
 
-    def registerProducer(self, producer, streaming):
-        raise Exception("not implemented")
-
 
 class WebSocketServerProtocol(WebSocketAdapterProtocol, protocol.WebSocketServerProtocol):
     """
@@ -0,0 +1,128 @@
+###############################################################################
+#
+# The MIT License (MIT)
+#
+# Copyright (c) Tavendo GmbH
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+###############################################################################
+
+from __future__ import absolute_import
+
+import os
+
+if os.environ.get('USE_TWISTED', False):
+
+    import unittest
+
+    from twisted.internet.task import Clock
+    from twisted.test.proto_helpers import StringTransport
+
+    from autobahn.websocket.protocol import WebSocketProtocol
+    from autobahn.twisted.websocket import WebSocketServerProtocol, \
+        WebSocketServerFactory, TransportProducer
+
+    class EventProtocol(WebSocketServerProtocol):
+
+        def onWritePaused(self):
+            self.events.append('paused')
+
+        def onWriteResumed(self):
+            self.events.append('resumed')
+
+    class Producer:
+
+        def __init__(self):
+            self.events = []
+
+        def pauseProducing(self):
+            self.events.append('pause')
+
+        def resumeProducing(self):
+            self.events.append('resume')
+
+        def stopProducing(self):
+            self.events.append('stop')
+
+    def create_protocol(transport=None, **options):
+        factory = WebSocketServerFactory(reactor=Clock())
+        factory.protocol = EventProtocol
+        factory.setProtocolOptions(openHandshakeTimeout=0, **options)
+        proto = factory.buildProtocol(None)
+        proto.events = []
+        proto.makeConnection(transport or StringTransport())
+        proto.state = WebSocketProtocol.STATE_OPEN
+        return proto
+
+    class TestWriteFlowControl(unittest.TestCase):
+
+        def test_register(self):
+            proto = create_protocol()
+            self.assertTrue(isinstance(proto.transport.producer, TransportProducer))
+            self.assertTrue(proto.transport.streaming)
+
+        def test_pause_resume(self):
+            proto = create_protocol(writeBufferHighWatermark=1000)
+            proto.transport.producer.pauseProducing()
+            self.assertTrue(proto.writePaused)
+            d = proto.drain()
+            self.assertFalse(d.called)
+            proto.transport.producer.resumeProducing()
+            self.assertTrue(d.called)
+            self.assertEqual(proto.events, ['paused', 'resumed'])
+
+        def test_disabled(self):
+            proto = create_protocol()
+            proto.transport.producer.pauseProducing()
+            self.assertFalse(proto.writePaused)
+
+            # the transport's own limits still apply to drain()
+            d = proto.drain()
+            self.assertFalse(d.called)
+            proto.transport.producer.resumeProducing()
+            self.assertTrue(d.called)
+            self.assertEqual(proto.events, [])
+
+        def test_buffer_size(self):
+            transport = StringTransport()
+            transport.bufferSize = 65536
+            create_protocol(transport, writeBufferHighWatermark=1000)
+            self.assertEqual(transport.bufferSize, 1000)
+
+        def test_producer(self):
+            proto = create_protocol()
+            producer = Producer()
+            proto.registerProducer(producer, True)
+
+            # the producer is chained to the one registered with the transport
+            transportProducer = proto.transport.producer
+            self.assertTrue(isinstance(transportProducer, TransportProducer))
+            transportProducer.pauseProducing()
+            transportProducer.resumeProducing()
+            transportProducer.stopProducing()
+            self.assertEqual(producer.events, ['pause', 'resume', 'stop'])
+
+            proto.unregisterProducer()
+            transportProducer.pauseProducing()
+            self.assertEqual(producer.events, ['pause', 'resume', 'stop'])
+
+
+if __name__ == '__main__':
+    unittest.main()
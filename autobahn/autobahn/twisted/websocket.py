@@ -31,9 +31,9 @@ from base64 import b64encode, b64decode
 from zope.interface import implementer
 
 import twisted.internet.protocol
-from twisted.internet.defer import maybeDeferred
+from twisted.internet.defer import maybeDeferred, Deferred
 from twisted.python import log
-from twisted.internet.interfaces import ITransport
+from twisted.internet.interfaces import ITransport, IPushProducer
 
 from autobahn.stomp import websocket as stompwebsocket
 from autobahn.wamp import websocket as wampwebsocket
@@ -73,6 +73,29 @@ __all__ = (
 )
 
 
+@implementer(IPushProducer)
+class TransportProducer:
+    """
+    Registered as a push producer with the transport of a WebSocket protocol,
+    which pauses and resumes it as its write buffer fills up and drains. A
+    producer registered with the WebSocket protocol is paused and resumed in
+    turn (see :meth:`autobahn.websocket.protocol.WebSocketProtocol.registerProducer`).
+    """
+
+    def __init__(self, proto):
+        self.proto = proto
+
+    def pauseProducing(self):
+        self.proto._pauseTransportWriting()
+
+    def resumeProducing(self):
+        self.proto._resumeTransportWriting()
+
+    def stopProducing(self):
+        if self.proto._producer is not None:
+            self.proto._producer.stopProducing()
+
+
 class WebSocketAdapterProtocol(twisted.internet.protocol.Protocol):
     """
     Adapter class for Twisted WebSocket client and server protocols.
@@ -97,12 +120,32 @@ class WebSocketAdapterProtocol(twisted.internet.protocol.Protocol):
             # eg Unix Domain sockets throw Errno 22 on this
             pass
 
+        # let the transport tell us when to pause and resume writing: file
+        # descriptor based transports (e.g. TCP) pause when buffering more than
+        # bufferSize octets, and resume when the buffer has been written out
+        if self.writeBufferHighWatermark > 0 and hasattr(self.transport, 'bufferSize'):
+            self.transport.bufferSize = self.writeBufferHighWatermark
+        if hasattr(self.transport, 'registerProducer'):
+            self.transport.registerProducer(TransportProducer(self), True)
+
     def connectionLost(self, reason):
         self._connectionLost(reason)
 
     def dataReceived(self, data):
         self._dataReceived(data)
 
+    def _writeSequence(self, data):
+        self.transport.writeSequence(data)
+
+    def _getWriteBufferSize(self):
+        # Twisted transports don't tell how many octets they buffer, only
+        # when to pause and resume writing (see TransportProducer)
+        return 0
+
+    def _checkWriteBuffer(self):
+        # the transport pauses and resumes writing by itself
+        pass
+
     def _closeConnection(self, abort=False):
         if abort and hasattr(self.transport, 'abortConnection'):
             # ProcessProtocol lacks abortConnection()
@@ -140,21 +183,24 @@ class WebSocketAdapterProtocol(twisted.internet.protocol.Protocol):
     def _onPong(self, payload):
         self.onPong(payload)
 
-    def _onClose(self, wasClean, code, reason):
-        self.onClose(wasClean, code, reason)
+    def _onWritePaused(self):
+        self.onWritePaused()
 
-    def registerProducer(self, producer, streaming):
-        """
-        Register a Twisted producer with this protocol.
+    def _onWriteResumed(self):
+        self.onWriteResumed()
 
-        Modes: Hybi, Hixie
+    @staticmethod
+    def _create_future():
+        return Deferred()
 
-        :param producer: A Twisted push or pull producer.
-        :type producer: object
-        :param streaming: Producer type.
-        :type streaming: bool
-        """
-        self.transport.registerProducer(producer, streaming)
+    @staticmethod
+    def _resolve_future(future, value):
+        # the deferred might have been cancelled in the meantime
+        if not future.called:
+            future.callback(value)
+
+    def _onClose(self, wasClean, code, reason):
+        self.onClose(wasClean, code, reason)
 
 
 class WebSocketServerProtocol(WebSocketAdapterProtocol, protocol.WebSocketServerProtocol):
@@ -45,6 +45,7 @@ __all__ = ("utcnow",
            "id",
            "newid",
            "rtime",
+           "cputime",
            "Stopwatch",
            "Tracker",
            "EqualityMixin")
@@ -156,6 +157,28 @@ Precise wallclock time.
 """
 
 
+# Select the most precise process (CPU) time measurement function
+# available on the platform
+##
+if hasattr(time, 'process_time'):
+    # Python 3.3+: sum of system and user CPU time of the current process
+    _cputime = time.process_time
+else:
+    # Python 2: processor time on Unix-like platforms (on Windows, this is
+    # wall-clock time elapsed since the first call)
+    _cputime = time.clock
+
+
+cputime = _cputime
+"""
+Processor time of the current process.
+
+:returns: The CPU time consumed in seconds. Returned values are only guaranteed
+   to be meaningful relative to each other.
+:rtype: float
+"""
+
+
 class Stopwatch(object):
     """
     Stopwatch based on walltime.
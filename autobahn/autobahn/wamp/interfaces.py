@@ -113,7 +113,9 @@ class IMessage(object):
     @abc.abstractmethod
     def uncache(self):
         """
-        Resets the serialization cache.
+        Resets the serialization cache. This must be called after modifying a message
+        that has been serialized or unserialized before, as messages unserialized
+        keep their received serialization in the cache.
         """
 
     @abc.abstractmethod
@@ -576,6 +578,9 @@ class ISubscriber(ISession):
         with :func:`autobahn.wamp.subscribe` is automatically subscribed as event handlers,
         and a list of Deferreds/Futures is returned that each resolves or rejects as above.
 
+        Handlers subscribed to the same topic with the same matching method share one
+        subscription with the router, which is only unsubscribed when the last handler is.
+
         :param handler: The event handler to receive events.
         :type handler: callable or object
         :param topic: When ``handler`` is a callable, the URI (or URI pattern)
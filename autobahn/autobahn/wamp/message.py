@@ -36,6 +36,8 @@ from autobahn.wamp.interfaces import IMessage
 from autobahn.wamp.role import ROLE_NAME_TO_CLASS
 
 __all__ = ('Message',
+           'LazyPayload',
+           'PayloadMessage',
            'Hello',
            'Welcome',
            'Abort',
@@ -173,7 +175,8 @@ class Message(util.EqualityMixin):
     """
 
     def __init__(self):
-        # serialization cache: mapping from ISerializer instances to serialized bytes
+        # serialization cache: mapping from IObjectSerializer instances to serialized
+        # bytes (for messages unserialized, this holds the bytes received)
         self._serialized = {}
 
     def uncache(self):
@@ -195,6 +198,113 @@ class Message(util.EqualityMixin):
 IMessage.register(Message)
 
 
+class LazyPayload:
+    """
+    The application payload (positional and keyword arguments) of a WAMP message
+    received by a serializer in lazy mode, kept serialized until first accessed.
+    """
+
+    def __init__(self, data, unserialize):
+        """
+
+        :param data: The serialized elements of the raw message following the envelope.
+        :type data: bytes or unicode
+        :param unserialize: Function unserializing `data` into the list of elements.
+        :type unserialize: callable
+        """
+        self.data = data
+        self._unserialize = unserialize
+
+    def unserialize(self, message_name):
+        """
+        Unserialize and verify the payload.
+
+        :param message_name: The name of the WAMP message type (for error messages).
+        :type message_name: str
+
+        :returns: tuple -- A pair ``(args, kwargs)``.
+        """
+        try:
+            values = self._unserialize(self.data)
+        except Exception as e:
+            raise ProtocolError("invalid serialization of payload in {0} ({1})".format(message_name, e))
+
+        if len(values) not in (1, 2):
+            raise ProtocolError("invalid message length for {0}".format(message_name))
+
+        args = values[0]
+        if type(args) != list:
+            raise ProtocolError("invalid type {0} for 'args' in {1}".format(type(args), message_name))
+
+        kwargs = None
+        if len(values) > 1:
+            kwargs = values[1]
+            if type(kwargs) != dict:
+                raise ProtocolError("invalid type {0} for 'kwargs' in {1}".format(type(kwargs), message_name))
+
+        return args, kwargs
+
+
+class PayloadMessage(Message):
+    """
+    WAMP message base class for messages carrying an application payload in `args`
+    and `kwargs`, which might be received lazily: the payload is only unserialized
+    (and verified) on first access of `args` or `kwargs`, which might hence raise
+    :class:`autobahn.wamp.exception.ProtocolError`.
+
+    .. note:: This is not supposed to be instantiated.
+    """
+
+    _args = None
+    _kwargs = None
+    _payload = None
+
+    def set_lazy_payload(self, payload):
+        """
+        Set the payload to unserialize on first access.
+
+        :param payload: The payload.
+        :type payload: instance of :class:`autobahn.wamp.message.LazyPayload`
+        """
+        self._payload = payload
+
+    def _materialize(self):
+        self._args, self._kwargs = self._payload.unserialize(self.__class__.__name__.upper())
+        self._payload = None
+
+    @property
+    def args(self):
+        if self._payload is not None:
+            self._materialize()
+        return self._args
+
+    @args.setter
+    def args(self, args):
+        if self._payload is not None:
+            self._materialize()
+        self._args = args
+        self.uncache()
+
+    @property
+    def kwargs(self):
+        if self._payload is not None:
+            self._materialize()
+        return self._kwargs
+
+    @kwargs.setter
+    def kwargs(self, kwargs):
+        if self._payload is not None:
+            self._materialize()
+        self._kwargs = kwargs
+        self.uncache()
+
+    def __eq__(self, other):
+        """
+        Implements :func:`autobahn.wamp.interfaces.IMessage.__eq__`
+        """
+        return Message.__eq__(self, other) and self.args == other.args and self.kwargs == other.kwargs
+
+
 class Hello(Message):
     """
     A WAMP ``HELLO`` message.
@@ -1431,7 +1541,7 @@ class Unsubscribed(Message):
         return "WAMP UNSUBSCRIBED Message (request = {0})".format(self.request)
 
 
-class Event(Message):
+class Event(PayloadMessage):
     """
     A WAMP ``EVENT`` message.
 
@@ -1819,7 +1929,7 @@ class Cancel(Message):
         return "WAMP CANCEL Message (request = {0}, mode = '{1}'')".format(self.request, self.mode)
 
 
-class Result(Message):
+class Result(PayloadMessage):
     """
     A WAMP ``RESULT`` message.
 
@@ -2235,7 +2345,7 @@ class Unregistered(Message):
         return "WAMP UNREGISTERED Message (request = {0})".format(self.request)
 
 
-class Invocation(Message):
+class Invocation(PayloadMessage):
     """
     A WAMP ``INVOCATION`` message.
 
@@ -26,6 +26,7 @@
 
 from __future__ import absolute_import
 
+import functools
 import inspect
 import six
 from six import StringIO
@@ -54,6 +55,16 @@ def is_method_or_function(f):
     return inspect.ismethod(f) or inspect.isfunction(f)
 
 
+def _invoker(obj, fn):
+    """
+    Get a callable invoking `fn`, with `obj` as the first argument if given.
+    """
+    if obj:
+        return functools.partial(fn, obj)
+    else:
+        return fn
+
+
 class Endpoint:
     """
     """
@@ -63,6 +74,7 @@ class Endpoint:
         self.fn = fn
         self.procedure = procedure
         self.options = options
+        self.invoke = _invoker(obj, fn)
 
 
 class Handler:
@@ -74,6 +86,7 @@ class Handler:
         self.fn = fn
         self.topic = topic
         self.details_arg = details_arg
+        self.invoke = _invoker(obj, fn)
 
 
 class Publication:
@@ -93,8 +106,9 @@ class Subscription:
     Object representing a subscription.
     This class implements :class:`autobahn.wamp.interfaces.ISubscription`.
     """
-    def __init__(self, session, subscriptionId):
+    def __init__(self, session, subscriptionId, handler=None):
         self._session = session
+        self._handler = handler
         self.active = True
         self.id = subscriptionId
 
@@ -323,15 +337,37 @@ class ApplicationSession(BaseSession):
         self._register_reqs = {}
         self._unregister_reqs = {}
 
-        # subscriptions in place
+        # subscriptions in place: subscription ID -> list of handlers
         self._subscriptions = {}
 
+        # subscriptions in place and outstanding subscribe requests,
+        # by (topic, match), to share subscriptions between handlers
+        self._subscription_keys = {}
+        self._subscription_ids_keys = {}
+        self._subscribe_reqs_keys = {}
+
         # registrations in place
         self._registrations = {}
 
         # incoming invocations
         self._invocations = {}
 
+        # handlers for messages received while the session is established,
+        # by WAMP message type
+        self._message_handlers = {
+            message.Goodbye.MESSAGE_TYPE: self._onGoodbye,
+            message.Event.MESSAGE_TYPE: self._onEvent,
+            message.Published.MESSAGE_TYPE: self._onPublished,
+            message.Subscribed.MESSAGE_TYPE: self._onSubscribed,
+            message.Unsubscribed.MESSAGE_TYPE: self._onUnsubscribed,
+            message.Result.MESSAGE_TYPE: self._onResult,
+            message.Invocation.MESSAGE_TYPE: self._onInvocation,
+            message.Interrupt.MESSAGE_TYPE: self._onInterrupt,
+            message.Registered.MESSAGE_TYPE: self._onRegistered,
+            message.Unregistered.MESSAGE_TYPE: self._onUnregistered,
+            message.Error.MESSAGE_TYPE: self._onError
+        }
+
     def onOpen(self, transport):
         """
         Implements :func:`autobahn.wamp.interfaces.ITransportHandler.onOpen`
@@ -417,301 +453,293 @@ class ApplicationSession(BaseSession):
 
         else:
 
-            if isinstance(msg, message.Goodbye):
-                if not self._goodbye_sent:
-                    # the peer wants to close: send GOODBYE reply
-                    reply = message.Goodbye()
-                    self._transport.send(reply)
+            # dispatch on message type
+            handler = self._message_handlers.get(msg.MESSAGE_TYPE, None)
+            if handler is None:
+                raise ProtocolError("Unexpected message {0}".format(msg.__class__))
+            handler(msg)
 
-                self._session_id = None
+    def _onGoodbye(self, msg):
+        """
+        Process a GOODBYE message (session established).
+        """
+        if not self._goodbye_sent:
+            # the peer wants to close: send GOODBYE reply
+            reply = message.Goodbye()
+            self._transport.send(reply)
 
-                # fire callback and close the transport
-                self.onLeave(types.CloseDetails(msg.reason, msg.message))
+        self._session_id = None
 
-            # consumer messages
-            elif isinstance(msg, message.Event):
+        # fire callback and close the transport
+        self.onLeave(types.CloseDetails(msg.reason, msg.message))
 
-                if msg.subscription in self._subscriptions:
+    def _onEvent(self, msg):
+        """
+        Process an EVENT message (session established).
+        """
+        if msg.subscription in self._subscriptions:
 
-                    handler = self._subscriptions[msg.subscription]
+            args = msg.args or ()
+            details = None
 
-                    if handler.details_arg:
-                        if not msg.kwargs:
-                            msg.kwargs = {}
-                        msg.kwargs[handler.details_arg] = types.EventDetails(publication=msg.publication, publisher=msg.publisher, topic=msg.topic)
+            # handlers might unsubscribe while we are firing
+            for handler in tuple(self._subscriptions[msg.subscription]):
 
-                    try:
-                        if handler.obj:
-                            if msg.kwargs:
-                                if msg.args:
-                                    handler.fn(handler.obj, *msg.args, **msg.kwargs)
-                                else:
-                                    handler.fn(handler.obj, **msg.kwargs)
-                            else:
-                                if msg.args:
-                                    handler.fn(handler.obj, *msg.args)
-                                else:
-                                    handler.fn(handler.obj)
-                        else:
-                            if msg.kwargs:
-                                if msg.args:
-                                    handler.fn(*msg.args, **msg.kwargs)
-                                else:
-                                    handler.fn(**msg.kwargs)
-                            else:
-                                if msg.args:
-                                    handler.fn(*msg.args)
-                                else:
-                                    handler.fn()
+                kwargs = msg.kwargs or {}
+                if handler.details_arg:
+                    if details is None:
+                        details = types.EventDetails(publication=msg.publication, publisher=msg.publisher, topic=msg.topic)
+                    kwargs = dict(kwargs)
+                    kwargs[handler.details_arg] = details
 
-                    except Exception as e:
-                        if self.debug_app:
-                            print("Failure while firing event handler {0} subscribed under '{1}' ({2}): {3}".format(handler.fn, handler.topic, msg.subscription, e))
+                try:
+                    handler.invoke(*args, **kwargs)
 
-                else:
-                    raise ProtocolError("EVENT received for non-subscribed subscription ID {0}".format(msg.subscription))
+                except Exception as e:
+                    if self.debug_app:
+                        print("Failure while firing event handler {0} subscribed under '{1}' ({2}): {3}".format(handler.fn, handler.topic, msg.subscription, e))
 
-            elif isinstance(msg, message.Published):
+        else:
+            raise ProtocolError("EVENT received for non-subscribed subscription ID {0}".format(msg.subscription))
 
-                if msg.request in self._publish_reqs:
-                    d, opts = self._publish_reqs.pop(msg.request)
-                    p = Publication(msg.publication)
-                    self._resolve_future(d, p)
-                else:
-                    raise ProtocolError("PUBLISHED received for non-pending request ID {0}".format(msg.request))
+    def _onPublished(self, msg):
+        """
+        Process a PUBLISHED message (session established).
+        """
+        if msg.request in self._publish_reqs:
+            d, opts = self._publish_reqs.pop(msg.request)
+            p = Publication(msg.publication)
+            self._resolve_future(d, p)
+        else:
+            raise ProtocolError("PUBLISHED received for non-pending request ID {0}".format(msg.request))
 
-            elif isinstance(msg, message.Subscribed):
+    def _onSubscribed(self, msg):
+        """
+        Process a SUBSCRIBED message (session established).
+        """
+        if msg.request in self._subscribe_reqs:
+            key, subscribers = self._subscribe_reqs.pop(msg.request)
+            del self._subscribe_reqs_keys[key]
+            self._subscription_keys[key] = msg.subscription
+            self._subscription_ids_keys[msg.subscription] = key
+            handlers = self._subscriptions.setdefault(msg.subscription, [])
+            for d, obj, fn, topic, options in subscribers:
+                self._resolve_future(d, self._add_handler(msg.subscription, handlers, obj, fn, topic, options))
+        else:
+            raise ProtocolError("SUBSCRIBED received for non-pending request ID {0}".format(msg.request))
 
-                if msg.request in self._subscribe_reqs:
-                    d, obj, fn, topic, options = self._subscribe_reqs.pop(msg.request)
-                    if options:
-                        self._subscriptions[msg.subscription] = Handler(obj, fn, topic, options.details_arg)
-                    else:
-                        self._subscriptions[msg.subscription] = Handler(obj, fn, topic)
-                    s = Subscription(self, msg.subscription)
-                    self._resolve_future(d, s)
-                else:
-                    raise ProtocolError("SUBSCRIBED received for non-pending request ID {0}".format(msg.request))
+    def _onUnsubscribed(self, msg):
+        """
+        Process an UNSUBSCRIBED message (session established).
+        """
+        if msg.request in self._unsubscribe_reqs:
+            d, subscription = self._unsubscribe_reqs.pop(msg.request)
+            if subscription.id in self._subscriptions and not self._subscriptions[subscription.id]:
+                del self._subscriptions[subscription.id]
+            subscription.active = False
+            self._resolve_future(d, None)
+        else:
+            raise ProtocolError("UNSUBSCRIBED received for non-pending request ID {0}".format(msg.request))
 
-            elif isinstance(msg, message.Unsubscribed):
+    def _onResult(self, msg):
+        """
+        Process a RESULT message (session established).
+        """
+        if msg.request in self._call_reqs:
 
-                if msg.request in self._unsubscribe_reqs:
-                    d, subscription = self._unsubscribe_reqs.pop(msg.request)
-                    if subscription.id in self._subscriptions:
-                        del self._subscriptions[subscription.id]
-                    subscription.active = False
-                    self._resolve_future(d, None)
-                else:
-                    raise ProtocolError("UNSUBSCRIBED received for non-pending request ID {0}".format(msg.request))
-
-            elif isinstance(msg, message.Result):
-
-                if msg.request in self._call_reqs:
-
-                    if msg.progress:
-
-                        # progressive result
-                        _, opts = self._call_reqs[msg.request]
-                        if opts.onProgress:
-                            try:
-                                if msg.kwargs:
-                                    if msg.args:
-                                        opts.onProgress(*msg.args, **msg.kwargs)
-                                    else:
-                                        opts.onProgress(**msg.kwargs)
-                                else:
-                                    if msg.args:
-                                        opts.onProgress(*msg.args)
-                                    else:
-                                        opts.onProgress()
-                            except Exception as e:
-                                # silently drop exceptions raised in progressive results handlers
-                                if self.debug:
-                                    print("Exception raised in progressive results handler: {0}".format(e))
-                        else:
-                            # silently ignore progressive results
-                            pass
-                    else:
+            if msg.progress:
 
-                        # final result
-                        d, opts = self._call_reqs.pop(msg.request)
+                # progressive result
+                _, opts = self._call_reqs[msg.request]
+                if opts.onProgress:
+                    try:
                         if msg.kwargs:
                             if msg.args:
-                                res = types.CallResult(*msg.args, **msg.kwargs)
+                                opts.onProgress(*msg.args, **msg.kwargs)
                             else:
-                                res = types.CallResult(**msg.kwargs)
-                            self._resolve_future(d, res)
+                                opts.onProgress(**msg.kwargs)
                         else:
                             if msg.args:
-                                if len(msg.args) > 1:
-                                    res = types.CallResult(*msg.args)
-                                    self._resolve_future(d, res)
-                                else:
-                                    self._resolve_future(d, msg.args[0])
+                                opts.onProgress(*msg.args)
                             else:
-                                self._resolve_future(d, None)
-                else:
-                    raise ProtocolError("RESULT received for non-pending request ID {0}".format(msg.request))
-
-            elif isinstance(msg, message.Invocation):
-
-                if msg.request in self._invocations:
-
-                    raise ProtocolError("INVOCATION received for request ID {0} already invoked".format(msg.request))
-
+                                opts.onProgress()
+                    except Exception as e:
+                        # silently drop exceptions raised in progressive results handlers
+                        if self.debug:
+                            print("Exception raised in progressive results handler: {0}".format(e))
                 else:
+                    # silently ignore progressive results
+                    pass
+            else:
 
-                    if msg.registration not in self._registrations:
-
-                        raise ProtocolError("INVOCATION received for non-registered registration ID {0}".format(msg.registration))
-
+                # final result
+                d, opts = self._call_reqs.pop(msg.request)
+                if msg.kwargs:
+                    if msg.args:
+                        res = types.CallResult(*msg.args, **msg.kwargs)
                     else:
-                        endpoint = self._registrations[msg.registration]
-
-                        if endpoint.options and endpoint.options.details_arg:
-
-                            if not msg.kwargs:
-                                msg.kwargs = {}
-
-                            if msg.receive_progress:
-                                def progress(*args, **kwargs):
-                                    progress_msg = message.Yield(msg.request, args=args, kwargs=kwargs, progress=True)
-                                    self._transport.send(progress_msg)
-                            else:
-                                progress = None
-
-                            msg.kwargs[endpoint.options.details_arg] = types.CallDetails(progress, caller=msg.caller, procedure=msg.procedure)
-
-                        if endpoint.obj:
-                            if msg.kwargs:
-                                if msg.args:
-                                    d = self._as_future(endpoint.fn, endpoint.obj, *msg.args, **msg.kwargs)
-                                else:
-                                    d = self._as_future(endpoint.fn, endpoint.obj, **msg.kwargs)
-                            else:
-                                if msg.args:
-                                    d = self._as_future(endpoint.fn, endpoint.obj, *msg.args)
-                                else:
-                                    d = self._as_future(endpoint.fn, endpoint.obj)
+                        res = types.CallResult(**msg.kwargs)
+                    self._resolve_future(d, res)
+                else:
+                    if msg.args:
+                        if len(msg.args) > 1:
+                            res = types.CallResult(*msg.args)
+                            self._resolve_future(d, res)
                         else:
-                            if msg.kwargs:
-                                if msg.args:
-                                    d = self._as_future(endpoint.fn, *msg.args, **msg.kwargs)
-                                else:
-                                    d = self._as_future(endpoint.fn, **msg.kwargs)
-                            else:
-                                if msg.args:
-                                    d = self._as_future(endpoint.fn, *msg.args)
-                                else:
-                                    d = self._as_future(endpoint.fn)
+                            self._resolve_future(d, msg.args[0])
+                    else:
+                        self._resolve_future(d, None)
+        else:
+            raise ProtocolError("RESULT received for non-pending request ID {0}".format(msg.request))
 
-                        def success(res):
-                            del self._invocations[msg.request]
+    def _onInvocation(self, msg):
+        """
+        Process an INVOCATION message (session established).
+        """
+        if msg.request in self._invocations:
 
-                            if isinstance(res, types.CallResult):
-                                reply = message.Yield(msg.request, args=res.results, kwargs=res.kwresults)
-                            else:
-                                reply = message.Yield(msg.request, args=[res])
-                            self._transport.send(reply)
-
-                        def error(err):
-                            if self.traceback_app:
-                                # if asked to marshal the traceback within the WAMP error message, extract it
-                                # noinspection PyCallingNonCallable
-                                tb = StringIO()
-                                err.printTraceback(file=tb)
-                                tb = tb.getvalue().splitlines()
-                            else:
-                                tb = None
+            raise ProtocolError("INVOCATION received for request ID {0} already invoked".format(msg.request))
 
-                            if self.debug_app:
-                                print("Failure while invoking procedure {0} registered under '{1}' ({2}):".format(endpoint.fn, endpoint.procedure, msg.registration))
-                                print(err)
+        else:
 
-                            del self._invocations[msg.request]
+            if msg.registration not in self._registrations:
 
-                            if hasattr(err, 'value'):
-                                exc = err.value
-                            else:
-                                exc = err
-                            reply = self._message_from_exception(message.Invocation.MESSAGE_TYPE, msg.request, exc, tb)
-                            self._transport.send(reply)
+                raise ProtocolError("INVOCATION received for non-registered registration ID {0}".format(msg.registration))
 
-                        self._invocations[msg.request] = d
+            else:
+                endpoint = self._registrations[msg.registration]
 
-                        self._add_future_callbacks(d, success, error)
+                if endpoint.options and endpoint.options.details_arg:
 
-            elif isinstance(msg, message.Interrupt):
+                    if not msg.kwargs:
+                        msg.kwargs = {}
 
-                if msg.request not in self._invocations:
-                    raise ProtocolError("INTERRUPT received for non-pending invocation {0}".format(msg.request))
-                else:
-                    # noinspection PyBroadException
-                    try:
-                        self._invocations[msg.request].cancel()
-                    except Exception:
-                        if self.debug:
-                            print("could not cancel call {0}".format(msg.request))
-                    finally:
-                        del self._invocations[msg.request]
-
-            elif isinstance(msg, message.Registered):
+                    if msg.receive_progress:
+                        def progress(*args, **kwargs):
+                            progress_msg = message.Yield(msg.request, args=args, kwargs=kwargs, progress=True)
+                            self._transport.send(progress_msg)
+                    else:
+                        progress = None
 
-                if msg.request in self._register_reqs:
-                    d, obj, fn, procedure, options = self._register_reqs.pop(msg.request)
-                    self._registrations[msg.registration] = Endpoint(obj, fn, procedure, options)
-                    r = Registration(self, msg.registration)
-                    self._resolve_future(d, r)
-                else:
-                    raise ProtocolError("REGISTERED received for non-pending request ID {0}".format(msg.request))
+                    msg.kwargs[endpoint.options.details_arg] = types.CallDetails(progress, caller=msg.caller, procedure=msg.procedure)
 
-            elif isinstance(msg, message.Unregistered):
+                d = self._as_future(endpoint.invoke, *(msg.args or ()), **(msg.kwargs or {}))
 
-                if msg.request in self._unregister_reqs:
-                    d, registration = self._unregister_reqs.pop(msg.request)
-                    if registration.id in self._registrations:
-                        del self._registrations[registration.id]
-                    registration.active = False
-                    self._resolve_future(d, None)
-                else:
-                    raise ProtocolError("UNREGISTERED received for non-pending request ID {0}".format(msg.request))
+                def success(res):
+                    del self._invocations[msg.request]
 
-            elif isinstance(msg, message.Error):
+                    if isinstance(res, types.CallResult):
+                        reply = message.Yield(msg.request, args=res.results, kwargs=res.kwresults)
+                    else:
+                        reply = message.Yield(msg.request, args=[res])
+                    self._transport.send(reply)
 
-                d = None
+                def error(err):
+                    if self.traceback_app:
+                        # if asked to marshal the traceback within the WAMP error message, extract it
+                        # noinspection PyCallingNonCallable
+                        tb = StringIO()
+                        err.printTraceback(file=tb)
+                        tb = tb.getvalue().splitlines()
+                    else:
+                        tb = None
 
-                # ERROR reply to PUBLISH
-                if msg.request_type == message.Publish.MESSAGE_TYPE and msg.request in self._publish_reqs:
-                    d = self._publish_reqs.pop(msg.request)[0]
+                    if self.debug_app:
+                        print("Failure while invoking procedure {0} registered under '{1}' ({2}):".format(endpoint.fn, endpoint.procedure, msg.registration))
+                        print(err)
 
-                # ERROR reply to SUBSCRIBE
-                elif msg.request_type == message.Subscribe.MESSAGE_TYPE and msg.request in self._subscribe_reqs:
-                    d = self._subscribe_reqs.pop(msg.request)[0]
+                    del self._invocations[msg.request]
 
-                # ERROR reply to UNSUBSCRIBE
-                elif msg.request_type == message.Unsubscribe.MESSAGE_TYPE and msg.request in self._unsubscribe_reqs:
-                    d = self._unsubscribe_reqs.pop(msg.request)[0]
+                    if hasattr(err, 'value'):
+                        exc = err.value
+                    else:
+                        exc = err
+                    reply = self._message_from_exception(message.Invocation.MESSAGE_TYPE, msg.request, exc, tb)
+                    self._transport.send(reply)
 
-                # ERROR reply to REGISTER
-                elif msg.request_type == message.Register.MESSAGE_TYPE and msg.request in self._register_reqs:
-                    d = self._register_reqs.pop(msg.request)[0]
+                self._invocations[msg.request] = d
 
-                # ERROR reply to UNREGISTER
-                elif msg.request_type == message.Unregister.MESSAGE_TYPE and msg.request in self._unregister_reqs:
-                    d = self._unregister_reqs.pop(msg.request)[0]
+                self._add_future_callbacks(d, success, error)
 
-                # ERROR reply to CALL
-                elif msg.request_type == message.Call.MESSAGE_TYPE and msg.request in self._call_reqs:
-                    d = self._call_reqs.pop(msg.request)[0]
+    def _onInterrupt(self, msg):
+        """
+        Process an INTERRUPT message (session established).
+        """
+        if msg.request not in self._invocations:
+            raise ProtocolError("INTERRUPT received for non-pending invocation {0}".format(msg.request))
+        else:
+            # noinspection PyBroadException
+            try:
+                self._invocations[msg.request].cancel()
+            except Exception:
+                if self.debug:
+                    print("could not cancel call {0}".format(msg.request))
+            finally:
+                del self._invocations[msg.request]
 
-                if d:
-                    self._reject_future(d, self._exception_from_message(msg))
-                else:
-                    raise ProtocolError("WampAppSession.onMessage(): ERROR received for non-pending request_type {0} and request ID {1}".format(msg.request_type, msg.request))
+    def _onRegistered(self, msg):
+        """
+        Process a REGISTERED message (session established).
+        """
+        if msg.request in self._register_reqs:
+            d, obj, fn, procedure, options = self._register_reqs.pop(msg.request)
+            self._registrations[msg.registration] = Endpoint(obj, fn, procedure, options)
+            r = Registration(self, msg.registration)
+            self._resolve_future(d, r)
+        else:
+            raise ProtocolError("REGISTERED received for non-pending request ID {0}".format(msg.request))
 
-            else:
+    def _onUnregistered(self, msg):
+        """
+        Process an UNREGISTERED message (session established).
+        """
+        if msg.request in self._unregister_reqs:
+            d, registration = self._unregister_reqs.pop(msg.request)
+            if registration.id in self._registrations:
+                del self._registrations[registration.id]
+            registration.active = False
+            self._resolve_future(d, None)
+        else:
+            raise ProtocolError("UNREGISTERED received for non-pending request ID {0}".format(msg.request))
 
-                raise ProtocolError("Unexpected message {0}".format(msg.__class__))
+    def _onError(self, msg):
+        """
+        Process an ERROR message (session established).
+        """
+        d = None
+
+        # ERROR reply to PUBLISH
+        if msg.request_type == message.Publish.MESSAGE_TYPE and msg.request in self._publish_reqs:
+            d = self._publish_reqs.pop(msg.request)[0]
+
+        # ERROR reply to SUBSCRIBE
+        elif msg.request_type == message.Subscribe.MESSAGE_TYPE and msg.request in self._subscribe_reqs:
+            key, subscribers = self._subscribe_reqs.pop(msg.request)
+            del self._subscribe_reqs_keys[key]
+            d = subscribers[0][0]
+            for subscriber in subscribers[1:]:
+                self._reject_future(subscriber[0], self._exception_from_message(msg))
+
+        # ERROR reply to UNSUBSCRIBE
+        elif msg.request_type == message.Unsubscribe.MESSAGE_TYPE and msg.request in self._unsubscribe_reqs:
+            d = self._unsubscribe_reqs.pop(msg.request)[0]
+
+        # ERROR reply to REGISTER
+        elif msg.request_type == message.Register.MESSAGE_TYPE and msg.request in self._register_reqs:
+            d = self._register_reqs.pop(msg.request)[0]
+
+        # ERROR reply to UNREGISTER
+        elif msg.request_type == message.Unregister.MESSAGE_TYPE and msg.request in self._unregister_reqs:
+            d = self._unregister_reqs.pop(msg.request)[0]
+
+        # ERROR reply to CALL
+        elif msg.request_type == message.Call.MESSAGE_TYPE and msg.request in self._call_reqs:
+            d = self._call_reqs.pop(msg.request)[0]
+
+        if d:
+            self._reject_future(d, self._exception_from_message(msg))
+        else:
+            raise ProtocolError("WampAppSession.onMessage(): ERROR received for non-pending request_type {0} and request ID {1}".format(msg.request_type, msg.request))
 
     # noinspection PyUnusedLocal
     def onClose(self, wasClean):
@@ -809,10 +837,27 @@ class ApplicationSession(BaseSession):
             raise exception.TransportLost()
 
         def _subscribe(obj, handler, topic, options):
+            d = self._create_future()
+
+            # handlers subscribing to the same topic (with the same matching
+            # method) share one subscription with the router
+            key = (topic, (options and options.match) or u'exact')
+
+            if key in self._subscription_keys:
+                subscription_id = self._subscription_keys[key]
+                s = self._add_handler(subscription_id, self._subscriptions[subscription_id], obj, handler, topic, options)
+                self._resolve_future(d, s)
+                return d
+
+            if key in self._subscribe_reqs_keys:
+                request = self._subscribe_reqs_keys[key]
+                self._subscribe_reqs[request][1].append((d, obj, handler, topic, options))
+                return d
+
             request = util.id()
 
-            d = self._create_future()
-            self._subscribe_reqs[request] = (d, obj, handler, topic, options)
+            self._subscribe_reqs[request] = (key, [(d, obj, handler, topic, options)])
+            self._subscribe_reqs_keys[key] = request
 
             if options is not None:
                 msg = message.Subscribe(request, topic, **options.options)
@@ -841,6 +886,19 @@ class ApplicationSession(BaseSession):
                         dl.append(_subscribe(handler, proc, uri, subopts))
             return self._gather_futures(dl, consume_exceptions=True)
 
+    def _add_handler(self, subscription_id, handlers, obj, fn, topic, options):
+        """
+        Add a handler to a subscription in place.
+
+        :returns: obj -- An instance of :class:`autobahn.wamp.protocol.Subscription` for the handler.
+        """
+        if options:
+            handler = Handler(obj, fn, topic, options.details_arg)
+        else:
+            handler = Handler(obj, fn, topic)
+        handlers.append(handler)
+        return Subscription(self, subscription_id, handler)
+
     def _unsubscribe(self, subscription):
         """
         Called from :meth:`autobahn.wamp.protocol.Subscription.unsubscribe`
@@ -852,6 +910,22 @@ class ApplicationSession(BaseSession):
         if not self._transport:
             raise exception.TransportLost()
 
+        handlers = self._subscriptions[subscription.id]
+        if subscription._handler in handlers:
+            handlers.remove(subscription._handler)
+
+        if handlers:
+            # other handlers are still using the subscription
+            subscription.active = False
+            d = self._create_future()
+            self._resolve_future(d, None)
+            return d
+
+        # last handler gone: unsubscribe with the router
+        key = self._subscription_ids_keys.pop(subscription.id, None)
+        if key is not None:
+            del self._subscription_keys[key]
+
         request = util.id()
 
         d = self._create_future()
@@ -26,6 +26,8 @@
 
 from __future__ import absolute_import
 
+import json
+import re
 import six
 import struct
 
@@ -80,14 +82,45 @@ class Serializer:
    Mapping of WAMP message type codes to WAMP message classes.
    """
 
-    def __init__(self, serializer):
+    BATCHED = False
+    """
+   Flag indicating if this serializer operates in batched mode, in which serialized
+   WAMP messages can be concatenated into one transport message.
+   """
+
+    LAZY_ENVELOPES = {
+        message.Event.MESSAGE_TYPE: 4,
+        message.Result.MESSAGE_TYPE: 3,
+        message.Invocation.MESSAGE_TYPE: 4
+    }
+    """
+   Mapping of WAMP message type codes to the number of leading elements (the envelope)
+   unserialized in lazy mode, for message types with lazily unserialized payloads.
+   """
+
+    def __init__(self, serializer, lazy=False):
         """
         Constructor.
 
         :param serializer: The object serializer to use for WAMP wire-level serialization.
         :type serializer: An object that implements :class:`autobahn.interfaces.IObjectSerializer`.
+        :param lazy: Flag to control whether to unserialize the application payload of
+           `EVENT`, `RESULT` and `INVOCATION` messages only on first access (see
+           :class:`autobahn.wamp.message.PayloadMessage`). The object serializer must
+           then provide `unserialize_lazy()` and `unserialize_rest()`.
+        :type lazy: bool
+
+        Messages unserialized keep their received bytes in their serialization cache
+        (see :func:`autobahn.wamp.interfaces.IMessage.serialize`), so that re-sending
+        an unmodified message (e.g. when forwarding it) with an equal object serializer
+        does not serialize it again. For batched payloads this requires the object
+        serializer to provide `split()`.
         """
+        if lazy and not hasattr(serializer, 'unserialize_lazy'):
+            raise Exception("object serializer {0} does not support lazy mode".format(serializer.__class__.__name__))
         self._serializer = serializer
+        self._lazy = lazy
+        self._split = getattr(serializer, 'split', None)
 
     def serialize(self, msg):
         """
@@ -103,37 +136,73 @@ class Serializer:
             if isBinary != self._serializer.BINARY:
                 raise ProtocolError("invalid serialization of WAMP message (binary {0}, but expected {1})".format(isBinary, self._serializer.BINARY))
 
-        try:
-            raw_msgs = self._serializer.unserialize(payload)
-        except Exception as e:
-            raise ProtocolError("invalid serialization of WAMP message ({0})".format(e))
+        if self._split is not None:
+            try:
+                chunks = self._split(payload)
+            except Exception as e:
+                raise ProtocolError("invalid serialization of WAMP message ({0})".format(e))
+        else:
+            chunks = [payload]
 
         msgs = []
+        for chunk in chunks:
+            chunk_msgs = self._unserialize(chunk)
 
-        for raw_msg in raw_msgs:
+            # remember the received serialization for pass-through re-sending
+            if len(chunk_msgs) == 1:
+                chunk_msgs[0]._serialized[self._serializer] = chunk
 
-            if type(raw_msg) != list:
-                raise ProtocolError("invalid type {0} for WAMP message".format(type(raw_msg)))
+            msgs.extend(chunk_msgs)
 
-            if len(raw_msg) == 0:
-                raise ProtocolError(u"missing message type in WAMP message")
+        return msgs
 
-            message_type = raw_msg[0]
+    def _unserialize(self, payload):
+        """
+        Unserialize WAMP messages from a byte string.
+        """
+        if self._lazy:
+            try:
+                raw_msgs = self._serializer.unserialize_lazy(payload, self.LAZY_ENVELOPES)
+            except Exception as e:
+                raise ProtocolError("invalid serialization of WAMP message ({0})".format(e))
+
+            msgs = []
+            for raw_msg, rest in raw_msgs:
+                msg = self._parse(raw_msg)
+                if rest is not None:
+                    msg.set_lazy_payload(message.LazyPayload(rest, self._serializer.unserialize_rest))
+                msgs.append(msg)
+            return msgs
 
-            if type(message_type) != int:
-                raise ProtocolError("invalid type {0} for WAMP message type".format(type(message_type)))
+        try:
+            raw_msgs = self._serializer.unserialize(payload)
+        except Exception as e:
+            raise ProtocolError("invalid serialization of WAMP message ({0})".format(e))
 
-            Klass = self.MESSAGE_TYPE_MAP.get(message_type)
+        return [self._parse(raw_msg) for raw_msg in raw_msgs]
 
-            if Klass is None:
-                raise ProtocolError("invalid WAMP message type {0}".format(message_type))
+    def _parse(self, raw_msg):
+        """
+        Parse an unserialized raw message into a WAMP message.
+        """
+        if type(raw_msg) != list:
+            raise ProtocolError("invalid type {0} for WAMP message".format(type(raw_msg)))
 
-            # this might again raise `ProtocolError` ..
-            msg = Klass.parse(raw_msg)
+        if len(raw_msg) == 0:
+            raise ProtocolError(u"missing message type in WAMP message")
 
-            msgs.append(msg)
+        message_type = raw_msg[0]
 
-        return msgs
+        if type(message_type) != int:
+            raise ProtocolError("invalid type {0} for WAMP message type".format(type(message_type)))
+
+        Klass = self.MESSAGE_TYPE_MAP.get(message_type)
+
+        if Klass is None:
+            raise ProtocolError("invalid WAMP message type {0}".format(message_type))
+
+        # this might again raise `ProtocolError` ..
+        return Klass.parse(raw_msg)
 
 
 ##
@@ -155,8 +224,6 @@ try:
 except ImportError:
     # fallback to stdlib implementation
     ##
-    import json
-
     _json = json
 
     _loads = json.loads
@@ -165,6 +232,10 @@ except ImportError:
         return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
 
 finally:
+    # for unserializing the envelope of WAMP messages in lazy mode
+    _raw_decode = json.JSONDecoder().raw_decode
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+
     class JsonObjectSerializer:
 
         JSON_MODULE = _json
@@ -183,6 +254,15 @@ finally:
             """
             self._batched = batched
 
+        def __eq__(self, other):
+            return self.__class__ == other.__class__ and self._batched == other._batched
+
+        def __ne__(self, other):
+            return not self.__eq__(other)
+
+        def __hash__(self):
+            return hash((self.__class__, self._batched))
+
         def serialize(self, obj):
             """
             Implements :func:`autobahn.wamp.interfaces.IObjectSerializer.serialize`
@@ -207,6 +287,86 @@ finally:
                 raise Exception("batch format error")
             return [_loads(data.decode('utf8')) for data in chunks]
 
+        def split(self, payload):
+            """
+            Split a byte string into the serializations of the individual objects
+            contained, without unserializing the objects.
+
+            :param payload: Serialized objects.
+            :type payload: bytes
+
+            :returns: list -- List of byte strings, each a serialization of one object.
+            """
+            if self._batched:
+                chunks = [data + b'\30' for data in payload.split(b'\30')[:-1]]
+                if len(chunks) == 0:
+                    raise Exception("batch format error")
+                return chunks
+            else:
+                return [payload]
+
+        def unserialize_lazy(self, payload, envelopes):
+            """
+            Unserialize objects from a byte string, but of lists starting with one of the
+            keys of `envelopes`, only unserialize that many leading elements.
+
+            :param payload: Objects to unserialize.
+            :type payload: bytes
+            :param envelopes: Mapping of first elements to the number of leading elements to unserialize.
+            :type envelopes: dict
+
+            :returns: list -- List of pairs ``(obj, rest)``, with `rest` the remaining elements of
+               a list still serialized (for :meth:`unserialize_rest`) or `None`.
+            """
+            if self._batched:
+                chunks = payload.split(b'\30')[:-1]
+            else:
+                chunks = [payload]
+            if len(chunks) == 0:
+                raise Exception("batch format error")
+            return [self._unserialize_head(data.decode('utf8'), envelopes) for data in chunks]
+
+        def _unserialize_head(self, s, envelopes):
+            i = _WHITESPACE.match(s, 0).end()
+            if s[i:i + 1] != u'[':
+                return _loads(s), None
+
+            i = _WHITESPACE.match(s, i + 1).end()
+            if s[i:i + 1] == u']':
+                return _loads(s), None
+
+            first, i = _raw_decode(s, i)
+            count = envelopes.get(first, None) if type(first) == int else None
+            if count is None:
+                return _loads(s), None
+
+            head = [first]
+            while True:
+                i = _WHITESPACE.match(s, i).end()
+                c = s[i:i + 1]
+                if c == u']':
+                    if s[i + 1:].strip():
+                        raise Exception("extra data after list")
+                    return head, None
+                if c != u',':
+                    raise Exception("expecting ',' delimiter at {0}".format(i))
+                if len(head) == count:
+                    return head, s[i + 1:]
+                i = _WHITESPACE.match(s, i + 1).end()
+                value, i = _raw_decode(s, i)
+                head.append(value)
+
+        def unserialize_rest(self, data):
+            """
+            Unserialize the remaining elements of a list returned from :meth:`unserialize_lazy`.
+
+            :param data: The remaining elements still serialized.
+            :type data: unicode
+
+            :returns: list -- The remaining elements.
+            """
+            return _loads(u'[' + data)
+
 
 IObjectSerializer.register(JsonObjectSerializer)
 
@@ -216,16 +376,20 @@ class JsonSerializer(Serializer):
     SERIALIZER_ID = "json"
     MIME_TYPE = "application/json"
 
-    def __init__(self, batched=False):
+    def __init__(self, batched=False, lazy=False):
         """
         Ctor.
 
         :param batched: Flag to control whether to put this serialized into batched mode.
         :type batched: bool
+        :param lazy: Flag to control whether to put this serializer into lazy mode
+           (see :class:`autobahn.wamp.serializer.Serializer`).
+        :type lazy: bool
         """
-        Serializer.__init__(self, JsonObjectSerializer(batched=batched))
+        Serializer.__init__(self, JsonObjectSerializer(batched=batched), lazy=lazy)
         if batched:
             self.SERIALIZER_ID = "json.batched"
+            self.BATCHED = True
 
 
 ISerializer.register(JsonSerializer)
@@ -262,6 +426,15 @@ else:
             """
             self._batched = batched
 
+        def __eq__(self, other):
+            return self.__class__ == other.__class__ and self._batched == other._batched
+
+        def __ne__(self, other):
+            return not self.__eq__(other)
+
+        def __hash__(self):
+            return hash((self.__class__, self._batched))
+
         def serialize(self, obj):
             """
             Implements :func:`autobahn.wamp.interfaces.IObjectSerializer.serialize`
@@ -304,6 +477,32 @@ else:
             else:
                 return [msgpack.unpackb(payload, encoding='utf-8')]
 
+        def split(self, payload):
+            """
+            Split a byte string into the serializations of the individual objects
+            contained, without unserializing the objects.
+
+            :param payload: Serialized objects.
+            :type payload: bytes
+
+            :returns: list -- List of byte strings, each a serialization of one object.
+            """
+            if self._batched:
+                chunks = []
+                N = len(payload)
+                i = 0
+                while i < N:
+                    if i + 4 > N:
+                        raise Exception("batch format error [1]")
+                    l = struct.unpack("!L", payload[i:i + 4])[0]
+                    if i + 4 + l > N:
+                        raise Exception("batch format error [2]")
+                    chunks.append(payload[i:i + 4 + l])
+                    i = i + 4 + l
+                return chunks
+            else:
+                return [payload]
+
     IObjectSerializer.register(MsgPackObjectSerializer)
 
     __all__.append('MsgPackObjectSerializer')
@@ -323,6 +522,7 @@ else:
             Serializer.__init__(self, MsgPackObjectSerializer(batched=batched))
             if batched:
                 self.SERIALIZER_ID = "msgpack.batched"
+                self.BATCHED = True
 
     ISerializer.register(MsgPackSerializer)
 
@@ -245,6 +245,41 @@ if os.environ.get('USE_TWISTED', False):
             subscription = yield handler.subscribe(on_event, u'com.myapp.topic1', options=types.SubscribeOptions(match=u'wildcard'))
             self.assertTrue(type(subscription.id) in (int, long))
 
+        @inlineCallbacks
+        def test_subscribe_shared(self):
+            handler = ApplicationSession()
+            transport = MockTransport(handler)
+
+            sent = []
+            send = transport.send
+
+            def record(msg):
+                sent.append(msg)
+                send(msg)
+            transport.send = record
+
+            events = []
+
+            def on_event1(*args):
+                events.append((1, args))
+
+            def on_event2(*args):
+                events.append((2, args))
+
+            subscription1 = yield handler.subscribe(on_event1, u'com.myapp.topic1')
+            subscription2 = yield handler.subscribe(on_event2, u'com.myapp.topic1')
+            self.assertEqual(subscription1.id, subscription2.id)
+
+            handler.onMessage(message.Event(subscription1.id, util.id(), args=[23]))
+            self.assertEqual(events, [(1, (23,)), (2, (23,))])
+
+            yield subscription1.unsubscribe()
+            self.assertFalse(subscription1.active)
+            self.assertTrue(subscription2.active)
+            yield subscription2.unsubscribe()
+
+            self.assertEqual([type(msg) for msg in sent], [message.Subscribe, message.Unsubscribe])
+
         @inlineCallbacks
         def test_unsubscribe(self):
             handler = ApplicationSession()
@@ -294,6 +329,41 @@ if os.environ.get('USE_TWISTED', False):
             res = yield handler.call(u'com.myapp.myproc1')
             self.assertEqual(res, 23)
 
+        @inlineCallbacks
+        def test_invoke_args(self):
+            handler = ApplicationSession()
+            MockTransport(handler)
+
+            class Calculator:
+                def add(self, a, b, c=0):
+                    return a + b + c
+
+            calc = Calculator()
+            yield handler.register(calc.add, u'com.myapp.myproc2')
+
+            res = yield handler.call(u'com.myapp.myproc2', 1, 2)
+            self.assertEqual(res, 3)
+
+            res = yield handler.call(u'com.myapp.myproc2', 1, 2, c=3)
+            self.assertEqual(res, 6)
+
+        @inlineCallbacks
+        def test_event(self):
+            handler = ApplicationSession()
+            MockTransport(handler)
+
+            events = []
+
+            def on_event(*args, **kwargs):
+                events.append((args, kwargs))
+
+            subscription = yield handler.subscribe(on_event, u'com.myapp.topic1', options=types.SubscribeOptions(details_arg='details'))
+
+            handler.onMessage(message.Event(subscription.id, util.id(), args=[1, 2]))
+            handler.onMessage(message.Event(subscription.id, util.id()))
+            self.assertEqual([args for args, kwargs in events], [(1, 2), ()])
+            self.assertTrue(all(isinstance(kwargs['details'], types.EventDetails) for args, kwargs in events))
+
         # ## variant 1: works
         # def test_publish1(self):
         #    d = self.handler.publish(u'de.myapp.topic1')
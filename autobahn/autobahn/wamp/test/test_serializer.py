@@ -32,6 +32,7 @@ import unittest
 from autobahn.wamp import message
 from autobahn.wamp import role
 from autobahn.wamp import serializer
+from autobahn.wamp.exception import ProtocolError
 
 
 def generate_test_messages():
@@ -125,6 +126,95 @@ class TestSerializer(unittest.TestCase):
                 msg.uncache()
                 self.assertFalse(ser._serializer in msg._serialized)
 
+    def test_passthrough(self):
+        msgs = generate_test_messages()
+        for ser in self.serializers:
+            # a batch of messages as received from the wire
+            payload = b''.join([ser.serialize(msg)[0] for msg in msgs])
+            for msg in msgs:
+                msg.uncache()
+
+            if ser._serializer._batched:
+                received = ser.unserialize(payload)
+            else:
+                received = [ser.unserialize(ser.serialize(msg)[0])[0] for msg in msgs]
+
+            for msg, msg2 in zip(msgs, received):
+                # the received serialization is cached and reused when re-sending
+                self.assertEqual(msg2._serialized[ser._serializer], ser.serialize(msg)[0])
+                self.assertTrue(ser.serialize(msg2)[0] is msg2._serialized[ser._serializer])
+
+                # also with a different, but equal object serializer
+                ser2 = ser.__class__(batched=ser._serializer._batched)
+                self.assertTrue(ser2.serialize(msg2)[0] is msg2._serialized[ser._serializer])
+
+    def test_passthrough_modified(self):
+        for ser in self.serializers:
+            payload, binary = ser.serialize(message.Event(123456, 789123, args=[1, 2, 3]))
+            msg = ser.unserialize(payload, binary)[0]
+
+            # setting the payload invalidates the cache
+            msg.args = [4]
+            self.assertEqual(msg._serialized, {})
+
+            # other modifications require an explicit uncache()
+            msg.publication = 111
+            msg.uncache()
+            self.assertEqual(ser.unserialize(*ser.serialize(msg))[0],
+                             message.Event(123456, 111, args=[4]))
+
+
+class TestLazySerializer(unittest.TestCase):
+
+    def setUp(self):
+        self.serializers = [
+            serializer.JsonSerializer(lazy=True),
+            serializer.JsonSerializer(batched=True, lazy=True)
+        ]
+
+    def test_roundtrip(self):
+        for msg in generate_test_messages():
+            for ser in self.serializers:
+                payload, binary = ser.serialize(msg)
+                msg2 = ser.unserialize(payload, binary)
+                self.assertEqual([msg], msg2)
+
+    def test_payload_unserialized_on_access(self):
+        msg = message.Event(123456, 789123, args=[1, 2, 3], kwargs={u'foo': 23})
+        for ser in self.serializers:
+            payload, binary = ser.serialize(msg)
+            msg.uncache()
+            msg2 = ser.unserialize(payload, binary)[0]
+
+            # envelope is unserialized, but payload is still pending
+            self.assertEqual(msg2.subscription, 123456)
+            self.assertEqual(msg2.publication, 789123)
+            self.assertTrue(msg2._payload is not None)
+
+            self.assertEqual(msg2.args, [1, 2, 3])
+            self.assertTrue(msg2._payload is None)
+            self.assertEqual(msg2.kwargs, {u'foo': 23})
+
+    def test_whitespace(self):
+        ser = serializer.JsonSerializer(lazy=True)
+        msg = ser.unserialize(b' [ 50 , 123456 , { } , [ 1 , 2 ] , { "a" : 1 } ] ', False)[0]
+        self.assertEqual(msg, message.Result(123456, args=[1, 2], kwargs={u'a': 1}))
+
+    def test_invalid_payload(self):
+        ser = serializer.JsonSerializer(lazy=True)
+        for payload in [b'[36, 1, 2, {}, {"a": 1}]',
+                        b'[36, 1, 2, {}, [1], []]',
+                        b'[36, 1, 2, {}, [1], {}, 3]',
+                        b'[36, 1, 2, {}, [1, ]']:
+
+            # envelope is fine, so this only raises on access of the payload
+            msg = ser.unserialize(payload, False)[0]
+            self.assertRaises(ProtocolError, getattr, msg, 'args')
+
+    def test_unsupported(self):
+        if hasattr(serializer, 'MsgPackObjectSerializer'):
+            self.assertRaises(Exception, serializer.Serializer, serializer.MsgPackObjectSerializer(), lazy=True)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,146 @@
+###############################################################################
+#
+# The MIT License (MIT)
+#
+# Copyright (c) Tavendo GmbH
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+###############################################################################
+
+from __future__ import absolute_import
+
+# from twisted.trial import unittest
+import unittest
+
+from autobahn.websocket import protocol
+from autobahn.wamp import message
+from autobahn.wamp import serializer
+from autobahn.wamp import websocket
+from autobahn.websocket.test.test_websocket_protocol import FakeFactory as FakeWebSocketFactory, \
+    FakeProtocol as FakeWebSocketProtocol, create_connecting_protocol, handshake_request
+
+
+class FakeFactory(websocket.WampWebSocketServerFactory, FakeWebSocketFactory):
+
+    def __init__(self):
+        websocket.WampWebSocketServerFactory.__init__(self, FakeSession)
+        FakeWebSocketFactory.__init__(self, protocols=self._protocols)
+
+
+class FakeSession:
+
+    def onOpen(self, transport):
+        pass
+
+    def onClose(self, wasClean):
+        pass
+
+
+class FakeProtocol(websocket.WampWebSocketServerProtocol, protocol.WebSocketServerProtocol):
+
+    def __init__(self, factory, ser):
+        self.factory = factory
+        self._serializer = ser
+        self.sent = []
+        self.closed = False
+        self._coalesceCall = None
+        self._coalesceLength = 0
+
+    def sendMessage(self, payload, isBinary=False):
+        self.sent.append((payload, isBinary))
+
+    def sendClose(self, code=None, reason=None):
+        self.closed = True
+
+
+class FakeWampProtocol(websocket.WampWebSocketServerProtocol, FakeWebSocketProtocol):
+    pass
+
+
+def create_protocol(ser, **options):
+    factory = FakeFactory()
+    factory.setBatchingOptions(**options)
+    proto = FakeProtocol(factory, ser)
+    proto.onOpen()
+    return proto
+
+
+class TestBatching(unittest.TestCase):
+
+    def test_batch_turn(self):
+        ser = serializer.JsonSerializer(batched=True)
+        proto = create_protocol(ser)
+        for i in range(3):
+            proto.send(message.Event(i, 1))
+        self.assertEqual(proto.sent, [])
+        self.assertEqual(proto.factory.calls[0].delay, 0)
+        proto.factory.runCalls()
+        self.assertEqual(len(proto.sent), 1)
+        payload, isBinary = proto.sent[0]
+        self.assertFalse(isBinary)
+        msgs = ser.unserialize(payload, isBinary)
+        self.assertEqual([msg.subscription for msg in msgs], [0, 1, 2])
+
+    def test_batch_limits(self):
+        proto = create_protocol(serializer.JsonSerializer(batched=True), maxDelay=0.01, maxMessages=2, maxSize=40)
+        proto.send(message.Event(1, 1))
+        proto.send(message.Event(2, 1))
+        self.assertEqual(len(proto.sent), 1)
+        self.assertEqual(proto.factory.calls, [])
+
+        proto.send(message.Event(3, 1, args=[u'x' * 40]))
+        self.assertEqual(len(proto.sent), 2)
+        proto.send(message.Event(4, 1))
+        self.assertEqual(proto.factory.calls[0].delay, 0.01)
+        proto.close()
+        self.assertEqual(len(proto.sent), 3)
+        self.assertTrue(proto.closed)
+        self.assertEqual(proto.factory.calls, [])
+
+    def test_not_batched(self):
+        proto = create_protocol(serializer.JsonSerializer())
+        proto.send(message.Event(1, 1))
+        self.assertEqual(proto.sent, [(b'[36,1,1,{}]', False)])
+
+        proto = create_protocol(serializer.JsonSerializer(batched=True), maxMessages=1)
+        proto.send(message.Event(1, 1))
+        self.assertEqual(proto.sent, [(b'[36,1,1,{}]\x18', False)])
+
+    def test_close_discards_batch(self):
+        proto = create_protocol(serializer.JsonSerializer(batched=True))
+        proto.send(message.Event(1, 1))
+        proto.onClose(False, None, None)
+        self.assertEqual(proto.factory.calls, [])
+        self.assertEqual(proto.sent, [])
+
+
+class TestHandshake(unittest.TestCase):
+
+    def test_handshake(self):
+        proto = create_connecting_protocol(FakeFactory(), FakeWampProtocol)
+        proto._dataReceived(handshake_request(extraHeaders=b'Sec-WebSocket-Protocol: wamp.2.json\r\n'))
+        self.assertEqual(proto.state, protocol.WebSocketProtocol.STATE_OPEN)
+        self.assertTrue(proto.transport.value().startswith(b'HTTP/1.1 101'))
+
+    def test_failed_handshake(self):
+        proto = create_connecting_protocol(FakeFactory(), FakeWampProtocol)
+        proto._dataReceived(handshake_request())
+        self.assertEqual(proto.state, protocol.WebSocketProtocol.STATE_CLOSED)
+        self.assertTrue(proto.transport.value().startswith(b'HTTP/1.1 400'))
@@ -26,6 +26,7 @@
 
 from __future__ import absolute_import
 
+import six
 import traceback
 
 from autobahn.websocket import protocol
@@ -44,6 +45,12 @@ class WampWebSocketProtocol:
     Base class for WAMP-over-WebSocket transport mixins.
     """
 
+    # outgoing WAMP messages batched into one WebSocket message (the batch
+    # is set up in onOpen, but flush() is also called on failed handshakes)
+    _batchPayloads = ()
+    _batchSize = 0
+    _batchCall = None
+
     def _bailout(self, code, reason=None):
         if self.factory.debug_wamp:
             print("Failing WAMP-over-WebSocket transport: code = {0}, reason = '{1}'".format(code, reason))
@@ -53,6 +60,11 @@ class WampWebSocketProtocol:
         """
         Callback from :func:`autobahn.websocket.interfaces.IWebSocketChannel.onOpen`
         """
+        # outgoing WAMP messages batched into one WebSocket message
+        self._batchPayloads = []
+        self._batchSize = 0
+        self._batchCall = None
+
         # WebSocket connection established. Now let the user WAMP session factory
         # create a new WAMP session and fire off session open callback.
         try:
@@ -69,6 +81,13 @@ class WampWebSocketProtocol:
         """
         Callback from :func:`autobahn.websocket.interfaces.IWebSocketChannel.onClose`
         """
+        # any outgoing batch can't be sent anymore
+        if self._batchCall is not None:
+            self._batchCall.cancel()
+            self._batchCall = None
+        self._batchPayloads = []
+        self._batchSize = 0
+
         # WAMP session might never have been established in the first place .. guard this!
         if hasattr(self, '_session') and self._session:
             # WebSocket connection lost - fire off the WAMP
@@ -119,10 +138,52 @@ class WampWebSocketProtocol:
                 # all exceptions raised from above should be serialization errors ..
                 raise SerializationError("Unable to serialize WAMP application payload ({0})".format(e))
             else:
-                self.sendMessage(payload, isBinary)
+                if getattr(self._serializer, 'BATCHED', False) and self.factory.batchMaxMessages != 1:
+                    self._batch(payload, isBinary)
+                else:
+                    self.sendMessage(payload, isBinary)
         else:
             raise TransportLost()
 
+    def _batch(self, payload, isBinary):
+        """
+        Add a WAMP message serialized in batched mode to the outgoing batch, sending
+        the batch when it is full.
+        """
+        if self._batchPayloads and self._batchSize + len(payload) > self.factory.batchMaxSize:
+            self.flush()
+
+        self._batchPayloads.append(payload)
+        self._batchSize += len(payload)
+        self._batchIsBinary = isBinary
+
+        if len(self._batchPayloads) >= self.factory.batchMaxMessages or self._batchSize >= self.factory.batchMaxSize:
+            self.flush()
+        elif self._batchCall is None:
+            self._batchCall = self.factory._callLater(self.factory.batchMaxDelay, self._onBatchDelay)
+
+    def _onBatchDelay(self):
+        self._batchCall = None
+        if self.isOpen():
+            self.flush()
+
+    def flush(self):
+        """
+        Send out the batch of WAMP messages not yet sent (if any), and any outgoing
+        WebSocket data buffered.
+
+        Overrides :func:`autobahn.websocket.interfaces.IWebSocketChannel.flush`
+        """
+        if self._batchCall is not None:
+            self._batchCall.cancel()
+            self._batchCall = None
+        if self._batchPayloads:
+            payload = b''.join(self._batchPayloads)
+            self._batchPayloads = []
+            self._batchSize = 0
+            self.sendMessage(payload, self._batchIsBinary)
+        protocol.WebSocketProtocol.flush(self)
+
     def isOpen(self):
         """
         Implements :func:`autobahn.wamp.interfaces.ITransport.isOpen`
@@ -134,6 +195,7 @@ class WampWebSocketProtocol:
         Implements :func:`autobahn.wamp.interfaces.ITransport.close`
         """
         if self.isOpen():
+            self.flush()
             self.sendClose(protocol.WebSocketProtocol.CLOSE_STATUS_CODE_NORMAL)
         else:
             raise TransportLost()
@@ -234,6 +296,11 @@ class WampWebSocketFactory:
 
         self.debug_wamp = debug_wamp
 
+        # outgoing batching (with batched serializers)
+        self.batchMaxDelay = 0
+        self.batchMaxMessages = 100
+        self.batchMaxSize = 65536
+
         if serializers is None:
             serializers = []
 
@@ -262,6 +329,37 @@ class WampWebSocketFactory:
 
         self._protocols = ["wamp.2.%s" % ser.SERIALIZER_ID for ser in serializers]
 
+    def setBatchingOptions(self, maxDelay=None, maxMessages=None, maxSize=None):
+        """
+        Set options for batching outgoing WAMP messages, which applies to connections
+        that negotiated a batched serializer (e.g. `wamp.2.json.batched`).
+
+        WAMP messages sent are collected and sent out as one WebSocket message when
+        the batch is full, or else after `maxDelay` seconds.
+
+        :param maxDelay: Maximum time in seconds a WAMP message is held back. With `0`,
+           messages are sent at the end of the current turn of the event loop (default: `0`).
+        :type maxDelay: float or None
+        :param maxMessages: Maximum number of WAMP messages in a batch, or `1` to disable
+           batching (default: `100`).
+        :type maxMessages: int or None
+        :param maxSize: Maximum size in octets of a batch (default: `65536`). A single
+           WAMP message larger than this is sent in a batch of its own.
+        :type maxSize: int or None
+        """
+        if maxDelay is not None and maxDelay != self.batchMaxDelay:
+            assert(type(maxDelay) == float or type(maxDelay) in six.integer_types)
+            assert(maxDelay >= 0)
+            self.batchMaxDelay = maxDelay
+
+        if maxMessages is not None and maxMessages != self.batchMaxMessages:
+            assert(type(maxMessages) in six.integer_types and maxMessages >= 1)
+            self.batchMaxMessages = maxMessages
+
+        if maxSize is not None and maxSize != self.batchMaxSize:
+            assert(type(maxSize) in six.integer_types and maxSize >= 1)
+            self.batchMaxSize = maxSize
+
 
 class WampWebSocketServerFactory(WampWebSocketFactory):
     """
@@ -37,11 +37,13 @@ __all__ = [
     "PerMessageCompressResponse",
     "PerMessageCompressResponseAccept",
     "PerMessageCompress",
+    "AdaptivePerMessageCompressPolicy",
     "PerMessageDeflateOffer",
     "PerMessageDeflateOfferAccept",
     "PerMessageDeflateResponse",
     "PerMessageDeflateResponseAccept",
     "PerMessageDeflate",
+    "PerMessageDeflateContextPool",
     "PERMESSAGE_COMPRESSION_EXTENSION"
 ]
 
@@ -107,3 +109,29 @@ else:
                     "PerMessageSnappyResponse",
                     "PerMessageSnappyResponseAccept",
                     "PerMessageSnappy"])
+
+
+# include "permessage-zstd" classes if Zstandard is available
+##
+try:
+    # noinspection PyPackageRequirements
+    import zstandard
+except ImportError:
+    zstandard = None
+else:
+    from autobahn.websocket.compress_zstd import *  # noqa
+
+    PMCE = {
+        'Offer': PerMessageZstdOffer,
+        'OfferAccept': PerMessageZstdOfferAccept,
+        'Response': PerMessageZstdResponse,
+        'ResponseAccept': PerMessageZstdResponseAccept,
+        'PMCE': PerMessageZstd
+    }
+    PERMESSAGE_COMPRESSION_EXTENSION[PerMessageZstdMixin.EXTENSION_NAME] = PMCE
+
+    __all__.extend(["PerMessageZstdOffer",
+                    "PerMessageZstdOfferAccept",
+                    "PerMessageZstdResponse",
+                    "PerMessageZstdResponseAccept",
+                    "PerMessageZstd"])
@@ -30,6 +30,7 @@ __all__ = (
     'PerMessageCompressResponse',
     'PerMessageCompressResponseAccept',
     'PerMessageCompress',
+    'AdaptivePerMessageCompressPolicy',
 )
 
 
@@ -61,3 +62,85 @@ class PerMessageCompress:
     """
     Base class for WebSocket compression negotiated parameters.
     """
+
+    def compressContextKey(self):
+        """
+        Get a key identifying the compression of outgoing messages, in case a
+        compressed message does not depend on any messages sent before (that is,
+        there is no context takeover for our side of the connection).
+
+        Outgoing messages compressed for one connection can then be sent unchanged
+        on any other connection having an equal key.
+
+        :returns: A hashable key or `None`, when messages are compressed using context
+                  takeover (the default).
+        """
+        return None
+
+    def close(self):
+        """
+        Release resources held for the connection (called when the connection is lost).
+        """
+
+
+class AdaptivePerMessageCompressPolicy:
+    """
+    Policy deciding, for each outgoing data message, whether to compress it, based on
+    the message size and on the recent compression ratio and CPU time of the connection.
+    Use as `perMessageCompressionPolicy` option of a WebSocket factory.
+
+    Messages that are small, or of a kind (text or binary) that recently did not compress
+    well, or any messages while compressing recently took too much CPU time, are sent
+    uncompressed. Every `probeInterval`-th message is compressed regardless (unless it is
+    too small), so that the recent ratio and CPU time can recover.
+    """
+
+    def __init__(self, minSize=128, maxRatio=0.9, maxTimePerOctet=0, probeInterval=16):
+        """
+        :param minSize: Do not compress messages with payloads smaller than this many octets.
+        :type minSize: int
+        :param maxRatio: Do not compress when the recent compression ratio (compressed size /
+           uncompressed size) for the kind of message is above this (or `0` to ignore ratios).
+        :type maxRatio: float
+        :param maxTimePerOctet: Do not compress when the recent CPU time per uncompressed octet
+           spent compressing is above this many seconds (or `0` to ignore CPU time).
+        :type maxTimePerOctet: float
+        :param probeInterval: Compress every this many messages regardless of ratio and CPU
+           time (or `0` to never probe).
+        :type probeInterval: int
+        """
+        self.minSize = minSize
+        self.maxRatio = maxRatio
+        self.maxTimePerOctet = maxTimePerOctet
+        self.probeInterval = probeInterval
+
+    def __call__(self, payload, isBinary, trafficStats):
+        """
+        Decide whether to compress an outgoing data message.
+
+        :param payload: The (uncompressed) message payload.
+        :type payload: bytes
+        :param isBinary: Flag indicating whether the message is binary.
+        :type isBinary: bool
+        :param trafficStats: Traffic statistics of the connection (including the message).
+        :type trafficStats: instance of :class:`autobahn.websocket.protocol.TrafficStats`
+
+        :returns: bool -- `True` to compress the message.
+        """
+        if len(payload) < self.minSize:
+            return False
+
+        if self.probeInterval > 0 and trafficStats.outgoingWebSocketMessages % self.probeInterval == 0:
+            return True
+
+        if self.maxRatio > 0:
+            ratio = trafficStats.recentCompressionRatio(isBinary)
+            if ratio is not None and ratio > self.maxRatio:
+                return False
+
+        if self.maxTimePerOctet > 0:
+            timePerOctet = trafficStats.recentCompressionTimePerOctet
+            if timePerOctet is not None and timePerOctet > self.maxTimePerOctet:
+                return False
+
+        return True
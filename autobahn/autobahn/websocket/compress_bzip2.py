@@ -27,6 +27,7 @@
 from __future__ import absolute_import
 
 import bz2
+import sys
 
 from autobahn.websocket.compress_base import PerMessageCompressOffer, \
     PerMessageCompressOfferAccept, \
@@ -43,6 +44,9 @@ __all__ = (
     'PerMessageBzip2',
 )
 
+# bz2 decompressors can limit their output only from Python 3.5 on
+_BOUNDED_DECOMPRESS = sys.version_info >= (3, 5)
+
 
 class PerMessageBzip2Mixin:
     """
@@ -410,6 +414,13 @@ class PerMessageBzip2(PerMessageCompress, PerMessageBzip2Mixin):
     def __repr__(self):
         return "PerMessageBzip2(isServer = %s, server_max_compress_level = %s, client_max_compress_level = %s)" % (self._isServer, self.server_max_compress_level, self.client_max_compress_level)
 
+    def compressContextKey(self):
+        # a new compressor is used for every message
+        if self._isServer:
+            return self.EXTENSION_NAME, self.server_max_compress_level
+        else:
+            return self.EXTENSION_NAME, self.client_max_compress_level
+
     def startCompressMessage(self):
         if self._isServer:
             if self._compressor is None:
@@ -434,8 +445,16 @@ class PerMessageBzip2(PerMessageCompress, PerMessageBzip2Mixin):
         if self._decompressor is None:
             self._decompressor = bz2.BZ2Decompressor()
 
-    def decompressMessageData(self, data):
-        return self._decompressor.decompress(data)
+    def decompressMessageData(self, data, maxLength=0):
+        # see PerMessageDeflate.decompressMessageData
+        if _BOUNDED_DECOMPRESS:
+            if self._decompressor.eof:
+                return b''
+            return self._decompressor.decompress(data, maxLength or -1)
+        elif data:
+            return self._decompressor.decompress(data)
+        else:
+            return b''
 
     def endDecompressMessage(self):
         self._decompressor = None
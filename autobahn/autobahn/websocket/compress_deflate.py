@@ -26,6 +26,8 @@
 
 from __future__ import absolute_import
 
+import json
+import sys
 import zlib
 
 from autobahn.websocket.compress_base import PerMessageCompressOffer, \
@@ -35,6 +37,7 @@ from autobahn.websocket.compress_base import PerMessageCompressOffer, \
     PerMessageCompress
 
 __all__ = (
+    'PerMessageDeflateContextPool',
     'PerMessageDeflateMixin',
     'PerMessageDeflateOffer',
     'PerMessageDeflateOfferAccept',
@@ -44,6 +47,95 @@ __all__ = (
 )
 
 
+class PerMessageDeflateContextPool:
+    """
+    Memory budget for the zlib contexts of all `permessage-deflate` connections
+    of a factory.
+
+    Decompression contexts for peers using context takeover must be kept between
+    messages and are always granted. Our compression context is only kept between
+    messages (context takeover) when the budget allows. Otherwise, the connection
+    compresses each message with a fresh context that is released right after the
+    message, which is indistinguishable for the peer. Contexts of connections without
+    context takeover are never kept between messages.
+
+    zlib contexts are not reused across connections: a stale window would allow a
+    peer to reference data of other connections.
+    """
+
+    def __init__(self, maxMemory=0):
+        """
+        :param maxMemory: Maximum (estimated) memory in octets for contexts kept between
+                          messages or `0` for unlimited.
+        :type maxMemory: int
+        """
+        self.maxMemory = maxMemory
+        self.reset()
+
+    def reset(self):
+        # estimated memory currently held by contexts kept between messages
+        self.memory = 0
+        self.peakMemory = 0
+
+        # requests to keep a compression context between messages granted / denied
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def compressorMemory(windowBits, memLevel):
+        # see zconf.h
+        return (1 << (windowBits + 2)) + (1 << (memLevel + 9))
+
+    @staticmethod
+    def decompressorMemory(windowBits):
+        # see zconf.h
+        return (1 << windowBits) + 7168
+
+    def acquire(self, size, required=False):
+        """
+        Account for a context to be kept between messages.
+
+        :param size: Estimated memory of the context in octets.
+        :type size: int
+        :param required: Iff `True`, always grant (and do not count as hit or miss).
+        :type required: bool
+
+        :returns: bool -- `True` iff the context may be kept.
+        """
+        if not required:
+            if 0 < self.maxMemory < self.memory + size:
+                self.misses += 1
+                return False
+            self.hits += 1
+        self.memory += size
+        self.peakMemory = max(self.peakMemory, self.memory)
+        return True
+
+    def release(self, size):
+        """
+        Account for a context no longer kept.
+
+        :param size: Estimated memory of the context in octets, as previously acquired.
+        :type size: int
+        """
+        self.memory -= size
+
+    def __json__(self):
+        if self.hits + self.misses > 0:
+            hitRate = float(self.hits) / float(self.hits + self.misses)
+        else:
+            hitRate = None
+        return {'maxMemory': self.maxMemory,
+                'memory': self.memory,
+                'peakMemory': self.peakMemory,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': hitRate}
+
+    def __str__(self):
+        return json.dumps(self.__json__())
+
+
 class PerMessageDeflateMixin:
     """
     Mixin class for this extension.
@@ -66,6 +158,44 @@ class PerMessageDeflateMixin:
    Higher values use more memory, but are faster and produce smaller output. The default is 8.
    """
 
+    @staticmethod
+    def getDictionaryId(dictionary):
+        """
+        Get the ID of a preset (preshared) zlib dictionary, which identifies the
+        dictionary during negotiation. This is the Adler-32 checksum of the
+        dictionary, as used by zlib itself.
+
+        :param dictionary: The dictionary content.
+        :type dictionary: bytes
+
+        :returns: int -- The dictionary ID.
+        """
+        return zlib.adler32(dictionary) & 0xffffffff
+
+    @staticmethod
+    def _checkDictionary(dictionary):
+        if type(dictionary) != bytes or len(dictionary) == 0:
+            raise Exception("invalid dictionary - must be non-empty bytes")
+        if sys.version_info < (3, 3):
+            raise Exception("preset dictionaries for permessage-deflate require Python 3.3 or later")
+
+    @classmethod
+    def _parseDictionaryId(cls, p, val):
+        try:
+            dictId = int(val) if val is not True else -1
+        except ValueError:
+            dictId = -1
+        if not 0 <= dictId <= 0xffffffff:
+            raise Exception("illegal extension parameter value '%s' for parameter '%s' of extension '%s'" % (val, p, cls.EXTENSION_NAME))
+        return dictId
+
+    @staticmethod
+    def _findDictionary(dictionaries, dictId):
+        for dictionary in dictionaries or []:
+            if PerMessageDeflateMixin.getDictionaryId(dictionary) == dictId:
+                return dictionary
+        return None
+
 
 class PerMessageDeflateOffer(PerMessageCompressOffer, PerMessageDeflateMixin):
     """
@@ -90,6 +220,7 @@ class PerMessageDeflateOffer(PerMessageCompressOffer, PerMessageDeflateMixin):
         # acceptNoContextTakeover = False # FIXME: this may change in draft
         requestMaxWindowBits = 0
         requestNoContextTakeover = False
+        dictionaryId = None
 
         # verify/parse client ("client-to-server direction") parameters of permessage-deflate offer
         for p in params:
@@ -148,20 +279,26 @@ class PerMessageDeflateOffer(PerMessageCompressOffer, PerMessageDeflateMixin):
                 else:
                     requestNoContextTakeover = True
 
+            elif p == 'dictionary_id':
+                dictionaryId = cls._parseDictionaryId(p, val)
+
             else:
                 raise Exception("illegal extension parameter '%s' for extension '%s'" % (p, cls.EXTENSION_NAME))
 
         offer = cls(acceptNoContextTakeover,
                     acceptMaxWindowBits,
                     requestNoContextTakeover,
-                    requestMaxWindowBits)
+                    requestMaxWindowBits,
+                    dictionaryId=dictionaryId)
         return offer
 
     def __init__(self,
                  acceptNoContextTakeover=True,
                  acceptMaxWindowBits=True,
                  requestNoContextTakeover=False,
-                 requestMaxWindowBits=0):
+                 requestMaxWindowBits=0,
+                 dictionary=None,
+                 dictionaryId=None):
         """
         Constructor.
 
@@ -173,6 +310,11 @@ class PerMessageDeflateOffer(PerMessageCompressOffer, PerMessageDeflateMixin):
         :type requestNoContextTakeover: bool
         :param requestMaxWindowBits: Iff non-zero, client requests given "max window size" - must be 8-15.
         :type requestMaxWindowBits: int
+        :param dictionary: Preset zlib dictionary to offer (non-standard `dictionary_id` parameter), or `None`.
+           Servers not supporting the parameter decline the offer, so offer without dictionary as well.
+        :type dictionary: bytes
+        :param dictionaryId: ID of the dictionary offered, when the dictionary itself is not known (parsed offers).
+        :type dictionaryId: int
         """
         if type(acceptNoContextTakeover) != bool:
             raise Exception("invalid type %s for acceptNoContextTakeover" % type(acceptNoContextTakeover))
@@ -194,6 +336,15 @@ class PerMessageDeflateOffer(PerMessageCompressOffer, PerMessageDeflateMixin):
 
         self.requestMaxWindowBits = requestMaxWindowBits
 
+        if dictionary is not None:
+            self._checkDictionary(dictionary)
+            if dictionaryId is not None and dictionaryId != self.getDictionaryId(dictionary):
+                raise Exception("invalid value %s for dictionaryId - does not match dictionary" % dictionaryId)
+            dictionaryId = self.getDictionaryId(dictionary)
+
+        self.dictionary = dictionary
+        self.dictionaryId = dictionaryId
+
     def getExtensionString(self):
         """
         Returns the WebSocket extension configuration string as sent to the server.
@@ -209,6 +360,8 @@ class PerMessageDeflateOffer(PerMessageCompressOffer, PerMessageDeflateMixin):
             pmceString += "; server_no_context_takeover"
         if self.requestMaxWindowBits != 0:
             pmceString += "; server_max_window_bits=%d" % self.requestMaxWindowBits
+        if self.dictionaryId is not None:
+            pmceString += "; dictionary_id=%d" % self.dictionaryId
         return pmceString
 
     def __json__(self):
@@ -221,7 +374,8 @@ class PerMessageDeflateOffer(PerMessageCompressOffer, PerMessageDeflateMixin):
                 'acceptNoContextTakeover': self.acceptNoContextTakeover,
                 'acceptMaxWindowBits': self.acceptMaxWindowBits,
                 'requestNoContextTakeover': self.requestNoContextTakeover,
-                'requestMaxWindowBits': self.requestMaxWindowBits}
+                'requestMaxWindowBits': self.requestMaxWindowBits,
+                'dictionaryId': self.dictionaryId}
 
     def __repr__(self):
         """
@@ -229,7 +383,7 @@ class PerMessageDeflateOffer(PerMessageCompressOffer, PerMessageDeflateMixin):
 
         :returns: str -- Python string representation.
         """
-        return "PerMessageDeflateOffer(acceptNoContextTakeover = %s, acceptMaxWindowBits = %s, requestNoContextTakeover = %s, requestMaxWindowBits = %s)" % (self.acceptNoContextTakeover, self.acceptMaxWindowBits, self.requestNoContextTakeover, self.requestMaxWindowBits)
+        return "PerMessageDeflateOffer(acceptNoContextTakeover = %s, acceptMaxWindowBits = %s, requestNoContextTakeover = %s, requestMaxWindowBits = %s, dictionaryId = %s)" % (self.acceptNoContextTakeover, self.acceptMaxWindowBits, self.requestNoContextTakeover, self.requestMaxWindowBits, self.dictionaryId)
 
 
 class PerMessageDeflateOfferAccept(PerMessageCompressOfferAccept, PerMessageDeflateMixin):
@@ -244,7 +398,8 @@ class PerMessageDeflateOfferAccept(PerMessageCompressOfferAccept, PerMessageDefl
                  requestMaxWindowBits=0,
                  noContextTakeover=None,
                  windowBits=None,
-                 memLevel=None):
+                 memLevel=None,
+                 dictionaries=None):
         """
         Constructor.
 
@@ -260,6 +415,9 @@ class PerMessageDeflateOfferAccept(PerMessageCompressOfferAccept, PerMessageDefl
         :type windowBits: int
         :param memLevel: Set server ("server-to-client direction") memory level.
         :type memLevel: int
+        :param dictionaries: Preset zlib dictionaries known to the server. When the client offered one of these,
+           it is used in both directions. Otherwise, messages are compressed without dictionary.
+        :type dictionaries: list of bytes
         """
         if not isinstance(offer, PerMessageDeflateOffer):
             raise Exception("invalid type %s for offer" % type(offer))
@@ -306,6 +464,11 @@ class PerMessageDeflateOfferAccept(PerMessageCompressOfferAccept, PerMessageDefl
 
         self.memLevel = memLevel
 
+        if offer.dictionaryId is not None:
+            self.dictionary = self._findDictionary(dictionaries, offer.dictionaryId)
+        else:
+            self.dictionary = None
+
     def getExtensionString(self):
         """
         Returns the WebSocket extension configuration string as sent to the server.
@@ -321,6 +484,8 @@ class PerMessageDeflateOfferAccept(PerMessageCompressOfferAccept, PerMessageDefl
             pmceString += "; client_no_context_takeover"
         if self.requestMaxWindowBits != 0:
             pmceString += "; client_max_window_bits=%d" % self.requestMaxWindowBits
+        if self.dictionary is not None:
+            pmceString += "; dictionary_id=%d" % self.offer.dictionaryId
         return pmceString
 
     def __json__(self):
@@ -335,7 +500,8 @@ class PerMessageDeflateOfferAccept(PerMessageCompressOfferAccept, PerMessageDefl
                 'requestMaxWindowBits': self.requestMaxWindowBits,
                 'noContextTakeover': self.noContextTakeover,
                 'windowBits': self.windowBits,
-                'memLevel': self.memLevel}
+                'memLevel': self.memLevel,
+                'dictionaryId': self.offer.dictionaryId if self.dictionary is not None else None}
 
     def __repr__(self):
         """
@@ -365,6 +531,7 @@ class PerMessageDeflateResponse(PerMessageCompressResponse, PerMessageDeflateMix
         client_no_context_takeover = False
         server_max_window_bits = 0
         server_no_context_takeover = False
+        dictionary_id = None
 
         for p in params:
 
@@ -409,24 +576,30 @@ class PerMessageDeflateResponse(PerMessageCompressResponse, PerMessageDeflateMix
                 else:
                     server_no_context_takeover = True
 
+            elif p == 'dictionary_id':
+                dictionary_id = cls._parseDictionaryId(p, val)
+
             else:
                 raise Exception("illegal extension parameter '%s' for extension '%s'" % (p, cls.EXTENSION_NAME))
 
         response = cls(client_max_window_bits,
                        client_no_context_takeover,
                        server_max_window_bits,
-                       server_no_context_takeover)
+                       server_no_context_takeover,
+                       dictionary_id)
         return response
 
     def __init__(self,
                  client_max_window_bits,
                  client_no_context_takeover,
                  server_max_window_bits,
-                 server_no_context_takeover):
+                 server_no_context_takeover,
+                 dictionary_id=None):
         self.client_max_window_bits = client_max_window_bits
         self.client_no_context_takeover = client_no_context_takeover
         self.server_max_window_bits = server_max_window_bits
         self.server_no_context_takeover = server_no_context_takeover
+        self.dictionary_id = dictionary_id
 
     def __json__(self):
         """
@@ -438,7 +611,8 @@ class PerMessageDeflateResponse(PerMessageCompressResponse, PerMessageDeflateMix
                 'client_max_window_bits': self.client_max_window_bits,
                 'client_no_context_takeover': self.client_no_context_takeover,
                 'server_max_window_bits': self.server_max_window_bits,
-                'server_no_context_takeover': self.server_no_context_takeover}
+                'server_no_context_takeover': self.server_no_context_takeover,
+                'dictionary_id': self.dictionary_id}
 
     def __repr__(self):
         """
@@ -446,7 +620,7 @@ class PerMessageDeflateResponse(PerMessageCompressResponse, PerMessageDeflateMix
 
         :returns: str -- Python string representation.
         """
-        return "PerMessageDeflateResponse(client_max_window_bits = %s, client_no_context_takeover = %s, server_max_window_bits = %s, server_no_context_takeover = %s)" % (self.client_max_window_bits, self.client_no_context_takeover, self.server_max_window_bits, self.server_no_context_takeover)
+        return "PerMessageDeflateResponse(client_max_window_bits = %s, client_no_context_takeover = %s, server_max_window_bits = %s, server_no_context_takeover = %s, dictionary_id = %s)" % (self.client_max_window_bits, self.client_no_context_takeover, self.server_max_window_bits, self.server_no_context_takeover, self.dictionary_id)
 
 
 class PerMessageDeflateResponseAccept(PerMessageCompressResponseAccept, PerMessageDeflateMixin):
@@ -459,7 +633,8 @@ class PerMessageDeflateResponseAccept(PerMessageCompressResponseAccept, PerMessa
                  response,
                  noContextTakeover=None,
                  windowBits=None,
-                 memLevel=None):
+                 memLevel=None,
+                 dictionaries=None):
         """
         Constructor.
 
@@ -471,6 +646,9 @@ class PerMessageDeflateResponseAccept(PerMessageCompressResponseAccept, PerMessa
         :type windowBits: int
         :param memLevel: Set client ("client-to-server direction") memory level.
         :type memLevel: int
+        :param dictionaries: Preset zlib dictionaries known to the client. When the server selected a
+           dictionary, it must be one of these.
+        :type dictionaries: list of bytes
         """
         if not isinstance(response, PerMessageDeflateResponse):
             raise Exception("invalid type %s for response" % type(response))
@@ -501,6 +679,13 @@ class PerMessageDeflateResponseAccept(PerMessageCompressResponseAccept, PerMessa
 
         self.memLevel = memLevel
 
+        if response.dictionary_id is not None:
+            self.dictionary = self._findDictionary(dictionaries, response.dictionary_id)
+            if self.dictionary is None:
+                raise Exception("invalid value %s for dictionary_id - dictionary unknown to client" % response.dictionary_id)
+        else:
+            self.dictionary = None
+
     def __json__(self):
         """
         Returns a JSON serializable object representation.
@@ -538,7 +723,8 @@ class PerMessageDeflate(PerMessageCompress, PerMessageDeflateMixin):
                    accept.noContextTakeover if accept.noContextTakeover is not None else accept.response.client_no_context_takeover,
                    accept.response.server_max_window_bits,
                    accept.windowBits if accept.windowBits is not None else accept.response.client_max_window_bits,
-                   accept.memLevel)
+                   accept.memLevel,
+                   accept.dictionary)
         return pmce
 
     @classmethod
@@ -549,7 +735,8 @@ class PerMessageDeflate(PerMessageCompress, PerMessageDeflateMixin):
                    accept.requestNoContextTakeover,
                    accept.windowBits if accept.windowBits is not None else accept.offer.requestMaxWindowBits,
                    accept.requestMaxWindowBits,
-                   accept.memLevel)
+                   accept.memLevel,
+                   accept.dictionary)
         return pmce
 
     def __init__(self,
@@ -558,7 +745,8 @@ class PerMessageDeflate(PerMessageCompress, PerMessageDeflateMixin):
                  client_no_context_takeover,
                  server_max_window_bits,
                  client_max_window_bits,
-                 mem_level):
+                 mem_level,
+                 dictionary=None):
         self._isServer = isServer
 
         self.server_no_context_takeover = server_no_context_takeover
@@ -569,9 +757,19 @@ class PerMessageDeflate(PerMessageCompress, PerMessageDeflateMixin):
 
         self.mem_level = mem_level if mem_level else self.DEFAULT_MEM_LEVEL
 
+        # preset dictionary (used in both directions) and its (negotiated) ID
+        self.dictionary = dictionary
+        self._dictionaryId = self.getDictionaryId(dictionary) if dictionary is not None else None
+
         self._compressor = None
         self._decompressor = None
 
+        # shared memory budget (an instance of PerMessageDeflateContextPool) and
+        # the memory accounted there for contexts we keep between messages
+        self.pool = None
+        self._compressorMemory = 0
+        self._decompressorMemory = 0
+
     def __json__(self):
         return {'extension': self.EXTENSION_NAME,
                 'isServer': self._isServer,
@@ -579,41 +777,94 @@ class PerMessageDeflate(PerMessageCompress, PerMessageDeflateMixin):
                 'client_no_context_takeover': self.client_no_context_takeover,
                 'server_max_window_bits': self.server_max_window_bits,
                 'client_max_window_bits': self.client_max_window_bits,
-                'mem_level': self.mem_level}
+                'mem_level': self.mem_level,
+                'dictionary_id': self._dictionaryId}
 
     def __repr__(self):
         return "PerMessageDeflate(isServer = %s, server_no_context_takeover = %s, client_no_context_takeover = %s, server_max_window_bits = %s, client_max_window_bits = %s, mem_level = %s)" % (self._isServer, self.server_no_context_takeover, self.client_no_context_takeover, self.server_max_window_bits, self.client_max_window_bits, self.mem_level)
 
+    def compressContextKey(self):
+        if self._isServer:
+            if self.server_no_context_takeover:
+                return self.EXTENSION_NAME, self.server_max_window_bits, self.mem_level, self._dictionaryId
+        else:
+            if self.client_no_context_takeover:
+                return self.EXTENSION_NAME, self.client_max_window_bits, self.mem_level, self._dictionaryId
+        return None
+
     def startCompressMessage(self):
         # compressobj([level[, method[, wbits[, memlevel[, strategy]]]]])
         # http://bugs.python.org/issue19278
         # http://hg.python.org/cpython/rev/c54c8e71b79a
         if self._isServer:
-            if self._compressor is None or self.server_no_context_takeover:
-                self._compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -self.server_max_window_bits, self.mem_level)
+            noContextTakeover, windowBits = self.server_no_context_takeover, self.server_max_window_bits
         else:
-            if self._compressor is None or self.client_no_context_takeover:
-                self._compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -self.client_max_window_bits, self.mem_level)
+            noContextTakeover, windowBits = self.client_no_context_takeover, self.client_max_window_bits
+
+        if self._compressor is None:
+            if self.dictionary is not None:
+                self._compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -windowBits, self.mem_level,
+                                                    zlib.Z_DEFAULT_STRATEGY, self.dictionary)
+            else:
+                self._compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -windowBits, self.mem_level)
+
+            # keep the compressor between messages (context takeover) only
+            # when the memory budget allows
+            if not noContextTakeover:
+                size = PerMessageDeflateContextPool.compressorMemory(windowBits, self.mem_level)
+                if self.pool is None or self.pool.acquire(size):
+                    self._compressorMemory = size
 
     def compressMessageData(self, data):
         return self._compressor.compress(data)
 
     def endCompressMessage(self):
         data = self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        if not self._compressorMemory:
+            self._compressor = None
         return data[:-4]
 
     def startDecompressMessage(self):
         if self._isServer:
-            if self._decompressor is None or self.client_no_context_takeover:
-                self._decompressor = zlib.decompressobj(-self.client_max_window_bits)
+            noContextTakeover, windowBits = self.client_no_context_takeover, self.client_max_window_bits
         else:
-            if self._decompressor is None or self.server_no_context_takeover:
-                self._decompressor = zlib.decompressobj(-self.server_max_window_bits)
+            noContextTakeover, windowBits = self.server_no_context_takeover, self.server_max_window_bits
 
-    def decompressMessageData(self, data):
-        return self._decompressor.decompress(data)
+        if self._decompressor is None:
+            if self.dictionary is not None:
+                self._decompressor = zlib.decompressobj(-windowBits, self.dictionary)
+            else:
+                self._decompressor = zlib.decompressobj(-windowBits)
+
+            # with context takeover by the peer, the decompressor must be
+            # kept between messages
+            if not noContextTakeover:
+                self._decompressorMemory = PerMessageDeflateContextPool.decompressorMemory(windowBits)
+                if self.pool is not None:
+                    self.pool.acquire(self._decompressorMemory, required=True)
+
+    def decompressMessageData(self, data, maxLength=0):
+        """
+        Decompress message data, returning at most `maxLength` octets (`0` for
+        unlimited). Compressed input not yet processed is kept, and the
+        remaining output is returned by subsequent calls with empty `data`.
+        An empty result means all input has been processed.
+        """
+        if self._decompressor.unconsumed_tail:
+            data = self._decompressor.unconsumed_tail + data
+        return self._decompressor.decompress(data, maxLength)
 
     def endDecompressMessage(self):
         # Eat stripped LEN and NLEN field of a non-compressed block added
         # for Z_SYNC_FLUSH.
         self._decompressor.decompress(b'\x00\x00\xff\xff')
+        if not self._decompressorMemory:
+            self._decompressor = None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.release(self._compressorMemory + self._decompressorMemory)
+        self._compressorMemory = 0
+        self._decompressorMemory = 0
+        self._compressor = None
+        self._decompressor = None
@@ -0,0 +1,656 @@
+###############################################################################
+#
+# The MIT License (MIT)
+#
+# Copyright (c) Tavendo GmbH
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+###############################################################################
+
+from __future__ import absolute_import
+
+import zstandard
+
+from autobahn.websocket.compress_base import PerMessageCompressOffer, \
+    PerMessageCompressOfferAccept, \
+    PerMessageCompressResponse, \
+    PerMessageCompressResponseAccept, \
+    PerMessageCompress
+
+__all__ = (
+    'PerMessageZstdMixin',
+    'PerMessageZstdOffer',
+    'PerMessageZstdOfferAccept',
+    'PerMessageZstdResponse',
+    'PerMessageZstdResponseAccept',
+    'PerMessageZstd',
+)
+
+
+class PerMessageZstdMixin:
+    """
+    Mixin class for this extension.
+    """
+
+    EXTENSION_NAME = "permessage-zstd"
+    """
+   Name of this WebSocket extension.
+   """
+
+    COMPRESSION_LEVEL_PERMISSIBLE_VALUES = list(range(1, zstandard.MAX_COMPRESSION_LEVEL + 1))
+    """
+   Permissible value for compression level parameter.
+   Higher values are slower, but produce smaller output. The default is 3.
+   """
+
+    @staticmethod
+    def getDictionaryId(dictionary):
+        """
+        Get the ID of a preshared (trained) zstd dictionary, which identifies the
+        dictionary during negotiation.
+
+        :param dictionary: The dictionary content.
+        :type dictionary: bytes
+
+        :returns: int -- The dictionary ID.
+        """
+        dictId = zstandard.ZstdCompressionDict(dictionary).dict_id()
+        if dictId == 0:
+            raise Exception("invalid dictionary - dictionary has no ID (use a trained zstd dictionary)")
+        return dictId
+
+    @classmethod
+    def _parseDictionaryId(cls, p, val):
+        try:
+            dictId = int(val) if val is not True else 0
+        except ValueError:
+            dictId = 0
+        if dictId <= 0:
+            raise Exception("illegal extension parameter value '%s' for parameter '%s' of extension '%s'" % (val, p, cls.EXTENSION_NAME))
+        return dictId
+
+    @staticmethod
+    def _findDictionary(dictionaries, dictId):
+        for dictionary in dictionaries or []:
+            if PerMessageZstdMixin.getDictionaryId(dictionary) == dictId:
+                return dictionary
+        return None
+
+
+class PerMessageZstdOffer(PerMessageCompressOffer, PerMessageZstdMixin):
+    """
+    Set of extension parameters for `permessage-zstd` WebSocket extension
+    offered by a client to a server.
+    """
+
+    @classmethod
+    def parse(cls, params):
+        """
+        Parses a WebSocket extension offer for `permessage-zstd` provided by a client to a server.
+
+        :param params: Output from :func:`autobahn.websocket.WebSocketProtocol._parseExtensionsHeader`.
+        :type params: list
+
+        :returns: object -- A new instance of :class:`autobahn.compress.PerMessageZstdOffer`.
+        """
+        # extension parameter defaults
+        ##
+        acceptNoContextTakeover = False
+        requestNoContextTakeover = False
+        dictionaryId = None
+
+        ##
+        # verify/parse client ("client-to-server direction") parameters of permessage-zstd offer
+        ##
+        for p in params:
+
+            if len(params[p]) > 1:
+                raise Exception("multiple occurrence of extension parameter '%s' for extension '%s'" % (p, cls.EXTENSION_NAME))
+
+            val = params[p][0]
+
+            if p == 'client_no_context_takeover':
+                # noinspection PySimplifyBooleanCheck
+                if val is not True:
+                    raise Exception("illegal extension parameter value '%s' for parameter '%s' of extension '%s'" % (val, p, cls.EXTENSION_NAME))
+                else:
+                    acceptNoContextTakeover = True
+
+            elif p == 'server_no_context_takeover':
+                # noinspection PySimplifyBooleanCheck
+                if val is not True:
+                    raise Exception("illegal extension parameter value '%s' for parameter '%s' of extension '%s'" % (val, p, cls.EXTENSION_NAME))
+                else:
+                    requestNoContextTakeover = True
+
+            elif p == 'dictionary_id':
+                dictionaryId = cls._parseDictionaryId(p, val)
+
+            else:
+                raise Exception("illegal extension parameter '%s' for extension '%s'" % (p, cls.EXTENSION_NAME))
+
+        offer = cls(acceptNoContextTakeover,
+                    requestNoContextTakeover,
+                    dictionaryId=dictionaryId)
+        return offer
+
+    def __init__(self,
+                 acceptNoContextTakeover=True,
+                 requestNoContextTakeover=False,
+                 dictionary=None,
+                 dictionaryId=None):
+        """
+        Constructor.
+
+        :param acceptNoContextTakeover: Iff true, client accepts "no context takeover" feature.
+        :type acceptNoContextTakeover: bool
+        :param requestNoContextTakeover: Iff true, client request "no context takeover" feature.
+        :type requestNoContextTakeover: bool
+        :param dictionary: Preshared (trained) zstd dictionary to offer, or `None`.
+        :type dictionary: bytes
+        :param dictionaryId: ID of the dictionary offered, when the dictionary itself is not known (parsed offers).
+        :type dictionaryId: int
+        """
+        if type(acceptNoContextTakeover) != bool:
+            raise Exception("invalid type %s for acceptNoContextTakeover" % type(acceptNoContextTakeover))
+
+        self.acceptNoContextTakeover = acceptNoContextTakeover
+
+        if type(requestNoContextTakeover) != bool:
+            raise Exception("invalid type %s for requestNoContextTakeover" % type(requestNoContextTakeover))
+
+        self.requestNoContextTakeover = requestNoContextTakeover
+
+        if dictionary is not None:
+            if type(dictionary) != bytes:
+                raise Exception("invalid type %s for dictionary" % type(dictionary))
+            if dictionaryId is not None and dictionaryId != self.getDictionaryId(dictionary):
+                raise Exception("invalid value %s for dictionaryId - does not match dictionary" % dictionaryId)
+            dictionaryId = self.getDictionaryId(dictionary)
+
+        self.dictionary = dictionary
+        self.dictionaryId = dictionaryId
+
+    def getExtensionString(self):
+        """
+        Returns the WebSocket extension configuration string as sent to the server.
+
+        :returns: str -- PMCE configuration string.
+        """
+        pmceString = self.EXTENSION_NAME
+        if self.acceptNoContextTakeover:
+            pmceString += "; client_no_context_takeover"
+        if self.requestNoContextTakeover:
+            pmceString += "; server_no_context_takeover"
+        if self.dictionaryId is not None:
+            pmceString += "; dictionary_id=%d" % self.dictionaryId
+        return pmceString
+
+    def __json__(self):
+        """
+        Returns a JSON serializable object representation.
+
+        :returns: object -- JSON serializable representation.
+        """
+        return {'extension': self.EXTENSION_NAME,
+                'acceptNoContextTakeover': self.acceptNoContextTakeover,
+                'requestNoContextTakeover': self.requestNoContextTakeover,
+                'dictionaryId': self.dictionaryId}
+
+    def __repr__(self):
+        """
+        Returns Python object representation that can be eval'ed to reconstruct the object.
+
+        :returns: str -- Python string representation.
+        """
+        return "PerMessageZstdOffer(acceptNoContextTakeover = %s, requestNoContextTakeover = %s, dictionaryId = %s)" % (self.acceptNoContextTakeover, self.requestNoContextTakeover, self.dictionaryId)
+
+
+class PerMessageZstdOfferAccept(PerMessageCompressOfferAccept, PerMessageZstdMixin):
+    """
+    Set of parameters with which to accept an `permessage-zstd` offer
+    from a client by a server.
+    """
+
+    def __init__(self,
+                 offer,
+                 requestNoContextTakeover=False,
+                 noContextTakeover=None,
+                 dictionaries=None,
+                 compressionLevel=None):
+        """
+        Constructor.
+
+        :param offer: The offer being accepted.
+        :type offer: Instance of :class:`autobahn.compress.PerMessageZstdOffer`.
+        :param requestNoContextTakeover: Iff true, server request "no context takeover" feature.
+        :type requestNoContextTakeover: bool
+        :param noContextTakeover: Override server ("server-to-client direction") context takeover (this must be compatible with offer).
+        :type noContextTakeover: bool
+        :param dictionaries: Preshared (trained) zstd dictionaries known to the server. When the client offered
+           one of these, it is used in both directions. Otherwise, messages are compressed without dictionary.
+        :type dictionaries: list of bytes
+        :param compressionLevel: Override server ("server-to-client direction") compression level.
+        :type compressionLevel: int
+        """
+        if not isinstance(offer, PerMessageZstdOffer):
+            raise Exception("invalid type %s for offer" % type(offer))
+
+        self.offer = offer
+
+        if type(requestNoContextTakeover) != bool:
+            raise Exception("invalid type %s for requestNoContextTakeover" % type(requestNoContextTakeover))
+
+        if requestNoContextTakeover and not offer.acceptNoContextTakeover:
+            raise Exception("invalid value %s for requestNoContextTakeover - feature unsupported by client" % requestNoContextTakeover)
+
+        self.requestNoContextTakeover = requestNoContextTakeover
+
+        if noContextTakeover is not None:
+            if type(noContextTakeover) != bool:
+                raise Exception("invalid type %s for noContextTakeover" % type(noContextTakeover))
+
+            if offer.requestNoContextTakeover and not noContextTakeover:
+                raise Exception("invalid value %s for noContextTakeover - client requested feature" % noContextTakeover)
+
+        self.noContextTakeover = noContextTakeover
+
+        if offer.dictionaryId is not None:
+            self.dictionary = self._findDictionary(dictionaries, offer.dictionaryId)
+        else:
+            self.dictionary = None
+
+        if compressionLevel is not None and compressionLevel not in self.COMPRESSION_LEVEL_PERMISSIBLE_VALUES:
+            raise Exception("invalid value %s for compressionLevel - permissible values %s" % (compressionLevel, self.COMPRESSION_LEVEL_PERMISSIBLE_VALUES))
+
+        self.compressionLevel = compressionLevel
+
+    def getExtensionString(self):
+        """
+        Returns the WebSocket extension configuration string as sent to the server.
+
+        :returns: str -- PMCE configuration string.
+        """
+        pmceString = self.EXTENSION_NAME
+        if self.offer.requestNoContextTakeover:
+            pmceString += "; server_no_context_takeover"
+        if self.requestNoContextTakeover:
+            pmceString += "; client_no_context_takeover"
+        if self.dictionary is not None:
+            pmceString += "; dictionary_id=%d" % self.offer.dictionaryId
+        return pmceString
+
+    def __json__(self):
+        """
+        Returns a JSON serializable object representation.
+
+        :returns: object -- JSON serializable representation.
+        """
+        return {'extension': self.EXTENSION_NAME,
+                'offer': self.offer.__json__(),
+                'requestNoContextTakeover': self.requestNoContextTakeover,
+                'noContextTakeover': self.noContextTakeover,
+                'dictionaryId': self.offer.dictionaryId if self.dictionary is not None else None,
+                'compressionLevel': self.compressionLevel}
+
+    def __repr__(self):
+        """
+        Returns Python object representation that can be eval'ed to reconstruct the object.
+
+        :returns: str -- Python string representation.
+        """
+        return "PerMessageZstdAccept(offer = %s, requestNoContextTakeover = %s, noContextTakeover = %s, compressionLevel = %s)" % (self.offer.__repr__(), self.requestNoContextTakeover, self.noContextTakeover, self.compressionLevel)
+
+
+class PerMessageZstdResponse(PerMessageCompressResponse, PerMessageZstdMixin):
+    """
+    Set of parameters for `permessage-zstd` responded by server.
+    """
+
+    @classmethod
+    def parse(cls, params):
+        """
+        Parses a WebSocket extension response for `permessage-zstd` provided by a server to a client.
+
+        :param params: Output from :func:`autobahn.websocket.WebSocketProtocol._parseExtensionsHeader`.
+        :type params: list
+
+        :returns: object -- A new instance of :class:`autobahn.compress.PerMessageZstdResponse`.
+        """
+        client_no_context_takeover = False
+        server_no_context_takeover = False
+        dictionary_id = None
+
+        for p in params:
+
+            if len(params[p]) > 1:
+                raise Exception("multiple occurrence of extension parameter '%s' for extension '%s'" % (p, cls.EXTENSION_NAME))
+
+            val = params[p][0]
+
+            if p == 'client_no_context_takeover':
+                # noinspection PySimplifyBooleanCheck
+                if val is not True:
+                    raise Exception("illegal extension parameter value '%s' for parameter '%s' of extension '%s'" % (val, p, cls.EXTENSION_NAME))
+                else:
+                    client_no_context_takeover = True
+
+            elif p == 'server_no_context_takeover':
+                # noinspection PySimplifyBooleanCheck
+                if val is not True:
+                    raise Exception("illegal extension parameter value '%s' for parameter '%s' of extension '%s'" % (val, p, cls.EXTENSION_NAME))
+                else:
+                    server_no_context_takeover = True
+
+            elif p == 'dictionary_id':
+                dictionary_id = cls._parseDictionaryId(p, val)
+
+            else:
+                raise Exception("illegal extension parameter '%s' for extension '%s'" % (p, cls.EXTENSION_NAME))
+
+        response = cls(client_no_context_takeover,
+                       server_no_context_takeover,
+                       dictionary_id)
+        return response
+
+    def __init__(self,
+                 client_no_context_takeover,
+                 server_no_context_takeover,
+                 dictionary_id=None):
+        self.client_no_context_takeover = client_no_context_takeover
+        self.server_no_context_takeover = server_no_context_takeover
+        self.dictionary_id = dictionary_id
+
+    def __json__(self):
+        """
+        Returns a JSON serializable object representation.
+
+        :returns: object -- JSON serializable representation.
+        """
+        return {'extension': self.EXTENSION_NAME,
+                'client_no_context_takeover': self.client_no_context_takeover,
+                'server_no_context_takeover': self.server_no_context_takeover,
+                'dictionary_id': self.dictionary_id}
+
+    def __repr__(self):
+        """
+        Returns Python object representation that can be eval'ed to reconstruct the object.
+
+        :returns: str -- Python string representation.
+        """
+        return "PerMessageZstdResponse(client_no_context_takeover = %s, server_no_context_takeover = %s, dictionary_id = %s)" % (self.client_no_context_takeover, self.server_no_context_takeover, self.dictionary_id)
+
+
+class PerMessageZstdResponseAccept(PerMessageCompressResponseAccept, PerMessageZstdMixin):
+    """
+    Set of parameters with which to accept an `permessage-zstd` response
+    from a server by a client.
+    """
+
+    def __init__(self,
+                 response,
+                 noContextTakeover=None,
+                 dictionaries=None,
+                 compressionLevel=None):
+        """
+        Constructor.
+
+        :param response: The response being accepted.
+        :type response: Instance of :class:`autobahn.compress.PerMessageZstdResponse`.
+        :param noContextTakeover: Override client ("client-to-server direction") context takeover (this must be compatible with response).
+        :type noContextTakeover: bool
+        :param dictionaries: Preshared (trained) zstd dictionaries known to the client. When the server selected a
+           dictionary, it must be one of these.
+        :type dictionaries: list of bytes
+        :param compressionLevel: Override client ("client-to-server direction") compression level.
+        :type compressionLevel: int
+        """
+        if not isinstance(response, PerMessageZstdResponse):
+            raise Exception("invalid type %s for response" % type(response))
+
+        self.response = response
+
+        if noContextTakeover is not None:
+            if type(noContextTakeover) != bool:
+                raise Exception("invalid type %s for noContextTakeover" % type(noContextTakeover))
+
+            if response.client_no_context_takeover and not noContextTakeover:
+                raise Exception("invalid value %s for noContextTakeover - server requested feature" % noContextTakeover)
+
+        self.noContextTakeover = noContextTakeover
+
+        if response.dictionary_id is not None:
+            self.dictionary = self._findDictionary(dictionaries, response.dictionary_id)
+            if self.dictionary is None:
+                raise Exception("invalid value %s for dictionary_id - dictionary unknown to client" % response.dictionary_id)
+        else:
+            self.dictionary = None
+
+        if compressionLevel is not None and compressionLevel not in self.COMPRESSION_LEVEL_PERMISSIBLE_VALUES:
+            raise Exception("invalid value %s for compressionLevel - permissible values %s" % (compressionLevel, self.COMPRESSION_LEVEL_PERMISSIBLE_VALUES))
+
+        self.compressionLevel = compressionLevel
+
+    def __json__(self):
+        """
+        Returns a JSON serializable object representation.
+
+        :returns: object -- JSON serializable representation.
+        """
+        return {'extension': self.EXTENSION_NAME,
+                'response': self.response.__json__(),
+                'noContextTakeover': self.noContextTakeover,
+                'compressionLevel': self.compressionLevel}
+
+    def __repr__(self):
+        """
+        Returns Python object representation that can be eval'ed to reconstruct the object.
+
+        :returns: str -- Python string representation.
+        """
+        return "PerMessageZstdResponseAccept(response = %s, noContextTakeover = %s, compressionLevel = %s)" % (self.response.__repr__(), self.noContextTakeover, self.compressionLevel)
+
+
+class PerMessageZstd(PerMessageCompress, PerMessageZstdMixin):
+    """
+    `permessage-zstd` WebSocket extension processor.
+
+    With context takeover, each direction is a single zstd frame that never ends, and
+    every message is flushed as a complete block. Otherwise, each message is a zstd
+    frame of its own. In both cases, a negotiated preshared dictionary primes the
+    (de)compression context.
+    """
+
+    DEFAULT_COMPRESS_LEVEL = 3
+
+    DECOMPRESS_INPUT_SIZE = 128
+    """
+   Compressed octets fed to the decompressor at a time when decompressing with an
+   output limit. zstd cannot stop decompressing at an output limit, and a block of a
+   few octets can inflate to 128 KiB, so this bounds the output buffered beyond the
+   limit to about 4 MiB.
+   """
+
+    @classmethod
+    def createFromResponseAccept(cls, isServer, accept):
+        pmce = cls(isServer,
+                   accept.response.server_no_context_takeover,
+                   accept.noContextTakeover if accept.noContextTakeover is not None else accept.response.client_no_context_takeover,
+                   accept.dictionary,
+                   accept.compressionLevel if accept.compressionLevel is not None else cls.DEFAULT_COMPRESS_LEVEL)
+        return pmce
+
+    @classmethod
+    def createFromOfferAccept(cls, isServer, accept):
+        pmce = cls(isServer,
+                   accept.noContextTakeover if accept.noContextTakeover is not None else accept.offer.requestNoContextTakeover,
+                   accept.requestNoContextTakeover,
+                   accept.dictionary,
+                   accept.compressionLevel if accept.compressionLevel is not None else cls.DEFAULT_COMPRESS_LEVEL)
+        return pmce
+
+    def __init__(self,
+                 isServer,
+                 server_no_context_takeover,
+                 client_no_context_takeover,
+                 dictionary=None,
+                 compressionLevel=DEFAULT_COMPRESS_LEVEL):
+        self._isServer = isServer
+        self.server_no_context_takeover = server_no_context_takeover
+        self.client_no_context_takeover = client_no_context_takeover
+        self.dictionary = dictionary
+        self.compressionLevel = compressionLevel
+
+        if dictionary is not None:
+            self._dictionary = zstandard.ZstdCompressionDict(dictionary)
+        else:
+            self._dictionary = None
+
+        self._compressor = None
+        self._decompressor = None
+
+        # compressed octets not yet fed to the decompressor (from position), and
+        # decompressed octets not yet returned (from position)
+        self._unconsumed = b''
+        self._unconsumedPos = 0
+        self._pending = b''
+        self._pendingPos = 0
+
+    def __json__(self):
+        return {'extension': self.EXTENSION_NAME,
+                'server_no_context_takeover': self.server_no_context_takeover,
+                'client_no_context_takeover': self.client_no_context_takeover,
+                'dictionary_id': self._dictionary.dict_id() if self._dictionary is not None else None,
+                'compression_level': self.compressionLevel}
+
+    def __repr__(self):
+        return "PerMessageZstd(isServer = %s, server_no_context_takeover = %s, client_no_context_takeover = %s, compressionLevel = %s)" % (self._isServer, self.server_no_context_takeover, self.client_no_context_takeover, self.compressionLevel)
+
+    def _noCompressContextTakeover(self):
+        if self._isServer:
+            return self.server_no_context_takeover
+        else:
+            return self.client_no_context_takeover
+
+    def _noDecompressContextTakeover(self):
+        if self._isServer:
+            return self.client_no_context_takeover
+        else:
+            return self.server_no_context_takeover
+
+    def compressContextKey(self):
+        if self._noCompressContextTakeover():
+            return (self.EXTENSION_NAME,
+                    self._dictionary.dict_id() if self._dictionary is not None else None,
+                    self.compressionLevel)
+        return None
+
+    def startCompressMessage(self):
+        if self._compressor is None or self._noCompressContextTakeover():
+            self._compressor = zstandard.ZstdCompressor(level=self.compressionLevel,
+                                                        dict_data=self._dictionary).compressobj()
+
+    def compressMessageData(self, data):
+        return self._compressor.compress(data)
+
+    def endCompressMessage(self):
+        if self._noCompressContextTakeover():
+            data = self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+            self._compressor = None
+        else:
+            data = self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return data
+
+    def startDecompressMessage(self):
+        if self._decompressor is None or self._noDecompressContextTakeover():
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=self._dictionary).decompressobj()
+
+    def decompressMessageData(self, data, maxLength=0):
+        """
+        Decompress message data, returning at most `maxLength` octets (`0` for
+        unlimited). Compressed input not yet processed is kept, and the
+        remaining output is returned by subsequent calls with empty `data`.
+        An empty result means all input has been processed.
+        """
+        if data:
+            if self._unconsumedPos < len(self._unconsumed):
+                self._unconsumed = self._unconsumed[self._unconsumedPos:] + data
+            else:
+                self._unconsumed = data
+            self._unconsumedPos = 0
+
+        if maxLength and len(self._pending) - self._pendingPos >= maxLength:
+            start = self._pendingPos
+            self._pendingPos += maxLength
+            return self._pending[start:self._pendingPos]
+
+        if self._pendingPos < len(self._pending):
+            chunks = [self._pending[self._pendingPos:]]
+            length = len(chunks[0])
+        else:
+            chunks = []
+            length = 0
+
+        if not maxLength:
+            if self._unconsumedPos < len(self._unconsumed):
+                chunks.append(self._decompressor.decompress(self._unconsumed[self._unconsumedPos:]))
+                self._unconsumedPos = len(self._unconsumed)
+        else:
+            # feed input in small steps until the output limit is reached
+            end = len(self._unconsumed)
+            while length < maxLength and self._unconsumedPos < end:
+                step = self._unconsumedPos + self.DECOMPRESS_INPUT_SIZE
+                chunk = self._decompressor.decompress(self._unconsumed[self._unconsumedPos:step])
+                self._unconsumedPos = step
+                if chunk:
+                    chunks.append(chunk)
+                    length += len(chunk)
+
+        if self._unconsumedPos >= len(self._unconsumed):
+            self._unconsumed = b''
+            self._unconsumedPos = 0
+
+        if len(chunks) == 1:
+            data = chunks[0]
+        else:
+            data = b''.join(chunks)
+
+        if maxLength and len(data) > maxLength:
+            self._pending = data
+            self._pendingPos = maxLength
+            return data[:maxLength]
+        else:
+            self._pending = b''
+            self._pendingPos = 0
+            return data
+
+    def endDecompressMessage(self):
+        self._unconsumed = b''
+        self._unconsumedPos = 0
+        self._pending = b''
+        self._pendingPos = 0
+        if self._noDecompressContextTakeover():
+            self._decompressor = None
+
+    def close(self):
+        self._compressor = None
+        self._decompressor = None
+        self._unconsumed = b''
+        self._pending = b''
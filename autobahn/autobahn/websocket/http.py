@@ -171,6 +171,8 @@ UNORDERED_COLLECTION = (425, "Unordered Collection (RFC 3648)",
                         "Defined in drafts of 'WebDAV Advanced Collections Protocol', but not present in 'Web Distributed Authoring and Versioning (WebDAV) Ordered Collections Protocol'.")
 UPGRADE_REQUIRED = (426, "Upgrade Required (RFC 2817)",
                     "The client should switch to a different protocol such as TLS/1.0.")
+REQUEST_HEADER_FIELDS_TOO_LARGE = (431, "Request Header Fields Too Large (RFC 6585)",
+                                   "The server is unwilling to process the request because either an individual header field, or all the header fields collectively, are too large.")
 NO_RESPONSE = (444, "No Response",
                "A Nginx HTTP server extension. The server returns no information to the client and closes the connection (useful as a deterrent for malware).")
 RETRY_WITH = (449, "Retry With",
@@ -194,6 +194,38 @@ class IWebSocketChannel(object):
         :type payload: bytes
         """
 
+    @abc.abstractmethod
+    def onWritePaused(self):
+        """
+        Callback fired when the transport buffers more outgoing octets than the
+        ``writeBufferHighWatermark`` protocol option. Applications should stop sending
+        until :func:`onWriteResumed` fires. A default implementation does nothing.
+        """
+
+    @abc.abstractmethod
+    def onWriteResumed(self):
+        """
+        Callback fired when, after writing was paused, the transport write buffer has
+        drained to no more than the ``writeBufferLowWatermark`` protocol option.
+        A default implementation does nothing.
+        """
+
+    @abc.abstractmethod
+    def drain(self):
+        """
+        Wait for writing to be resumed (see :func:`onWriteResumed`).
+
+        :returns: A Deferred/Future that fires when writing is not (or no longer) paused.
+        :rtype: obj
+        """
+
+    @abc.abstractmethod
+    def flush(self):
+        """
+        Write out all outgoing frames currently buffered for write coalescing (see the
+        ``writeCoalesceDelay`` protocol option) to the transport right away.
+        """
+
 
 class IWebSocketChannelFrameApi(IWebSocketChannel):
     """
@@ -34,7 +34,10 @@ import random
 import os
 import pickle
 import copy
+import heapq
 import json
+import math
+import time
 import six
 
 from pprint import pformat
@@ -46,7 +49,7 @@ from autobahn.websocket.interfaces import IWebSocketChannel, \
     IWebSocketChannelFrameApi, \
     IWebSocketChannelStreamingApi
 
-from autobahn.util import Stopwatch, newid, wildcards2patterns
+from autobahn.util import Stopwatch, newid, wildcards2patterns, cputime
 from autobahn.websocket.utf8validator import Utf8Validator
 from autobahn.websocket.xormasker import XorMaskerNull, createXorMasker
 from autobahn.websocket.compress import *  # noqa
@@ -180,6 +183,12 @@ def parseWsUrl(url):
 
 class TrafficStats:
 
+    RECENT_WEIGHT = 0.2
+    """
+   Weight of the last compressed message in the recent compression ratios and CPU times
+   (exponentially weighted moving averages).
+   """
+
     def __init__(self):
         self.reset()
 
@@ -204,6 +213,65 @@ class TrafficStats:
         self.preopenOutgoingOctetsWireLevel = 0
         self.preopenIncomingOctetsWireLevel = 0
 
+        # outgoing data messages compressed / sent uncompressed as decided by
+        # the compression policy, and the CPU time spent compressing
+        self.outgoingCompressedMessages = 0
+        self.outgoingCompressionSkipped = 0
+        self.outgoingCompressionTime = 0.
+
+        # recent compression ratios for text and binary messages, and CPU
+        # seconds per uncompressed octet (None when nothing compressed yet)
+        self.recentTextCompressionRatio = None
+        self.recentBinaryCompressionRatio = None
+        self.recentCompressionTimePerOctet = None
+
+    def trackCompression(self, isBinary, uncompressedLen, compressedLen, cpuTime=None):
+        """
+        Track an outgoing data message that was compressed.
+
+        :param isBinary: Flag indicating whether the message is binary.
+        :type isBinary: bool
+        :param uncompressedLen: Message payload length before compression.
+        :type uncompressedLen: int
+        :param compressedLen: Message payload length after compression.
+        :type compressedLen: int
+        :param cpuTime: CPU time in seconds spent compressing or `None` when not measured.
+        :type cpuTime: float or None
+        """
+        self.outgoingCompressedMessages += 1
+        if uncompressedLen == 0:
+            return
+
+        def recent(average, value):
+            if average is None:
+                return value
+            return average + TrafficStats.RECENT_WEIGHT * (value - average)
+
+        ratio = float(compressedLen) / float(uncompressedLen)
+        if isBinary:
+            self.recentBinaryCompressionRatio = recent(self.recentBinaryCompressionRatio, ratio)
+        else:
+            self.recentTextCompressionRatio = recent(self.recentTextCompressionRatio, ratio)
+
+        if cpuTime is not None:
+            self.outgoingCompressionTime += cpuTime
+            self.recentCompressionTimePerOctet = recent(self.recentCompressionTimePerOctet, cpuTime / uncompressedLen)
+
+    def recentCompressionRatio(self, isBinary):
+        """
+        Get the recent compression ratio (compressed size / uncompressed size) of outgoing
+        text or binary messages.
+
+        :param isBinary: Get the ratio for binary (instead of text) messages.
+        :type isBinary: bool
+
+        :returns: float -- The ratio or `None`, when no such message was compressed yet.
+        """
+        if isBinary:
+            return self.recentBinaryCompressionRatio
+        else:
+            return self.recentTextCompressionRatio
+
     def __json__(self):
 
         # compression ratio = compressed size / uncompressed size
@@ -236,6 +304,12 @@ class TrafficStats:
                 'outgoingWebSocketFrames': self.outgoingWebSocketFrames,
                 'outgoingWebSocketMessages': self.outgoingWebSocketMessages,
                 'preopenOutgoingOctetsWireLevel': self.preopenOutgoingOctetsWireLevel,
+                'outgoingCompressedMessages': self.outgoingCompressedMessages,
+                'outgoingCompressionSkipped': self.outgoingCompressionSkipped,
+                'outgoingCompressionTime': self.outgoingCompressionTime,
+                'recentTextCompressionRatio': self.recentTextCompressionRatio,
+                'recentBinaryCompressionRatio': self.recentBinaryCompressionRatio,
+                'recentCompressionTimePerOctet': self.recentCompressionTimePerOctet,
 
                 'incomingOctetsWireLevel': self.incomingOctetsWireLevel,
                 'incomingOctetsWebSocketLevel': self.incomingOctetsWebSocketLevel,
@@ -279,6 +353,159 @@ class FrameHeader:
         self.mask = mask
 
 
+class ReceiveBuffer:
+    """
+    Buffer for incoming octets, kept as a list of received chunks plus a
+    read cursor into the first chunk. Appending never copies, and consuming
+    a chunk as a whole hands out the very object that was received.
+
+    FOR INTERNAL USE ONLY!
+    """
+
+    def __init__(self):
+        self._chunks = deque()
+        self._offset = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def append(self, data):
+        """
+        Append received octets to the end of the buffer.
+
+        :param data: Octets received.
+        :type data: bytes
+        """
+        if data:
+            self._chunks.append(data)
+            self._length += len(data)
+
+    def peek(self, n):
+        """
+        Get the first (up to) ``n`` buffered octets without consuming them.
+
+        :param n: Number of octets to get.
+        :type n: int
+
+        :returns: bytes -- The octets.
+        """
+        n = min(n, self._length)
+        if n == 0:
+            return b''
+        first = self._chunks[0]
+        if len(first) - self._offset >= n:
+            return first[self._offset:self._offset + n]
+        parts = []
+        offset = self._offset
+        for chunk in self._chunks:
+            part = chunk[offset:offset + n]
+            parts.append(part)
+            n -= len(part)
+            offset = 0
+            if n == 0:
+                break
+        return b''.join(parts)
+
+    def read(self, n):
+        """
+        Consume and get the first (up to) ``n`` buffered octets.
+
+        :param n: Number of octets to consume.
+        :type n: int
+
+        :returns: bytes -- The octets consumed.
+        """
+        n = min(n, self._length)
+        if n == 0:
+            return b''
+        self._length -= n
+        first = self._chunks[0]
+        avail = len(first) - self._offset
+        if n == avail and self._offset == 0:
+            # whole chunk: zero-copy
+            self._chunks.popleft()
+            return first
+        if n < avail:
+            data = first[self._offset:self._offset + n]
+            self._offset += n
+            return data
+        parts = []
+        while n > 0:
+            chunk = self._chunks[0]
+            avail = len(chunk) - self._offset
+            if n >= avail:
+                parts.append(chunk[self._offset:] if self._offset else chunk)
+                self._chunks.popleft()
+                self._offset = 0
+                n -= avail
+            else:
+                parts.append(chunk[self._offset:self._offset + n])
+                self._offset += n
+                n = 0
+        return b''.join(parts)
+
+    def skip(self, n):
+        """
+        Consume and discard the first (up to) ``n`` buffered octets.
+
+        :param n: Number of octets to discard.
+        :type n: int
+        """
+        n = min(n, self._length)
+        self._length -= n
+        while n > 0:
+            avail = len(self._chunks[0]) - self._offset
+            if n >= avail:
+                self._chunks.popleft()
+                self._offset = 0
+                n -= avail
+            else:
+                self._offset += n
+                n = 0
+
+    def find(self, sub, start=0):
+        """
+        Find an octet sequence within the buffered octets (without consuming
+        anything). Only the octets from ``start`` onwards are looked at, and the
+        chunk holding ``start`` is located from the end of the buffer. Resuming a
+        search where it stopped (as while the opening handshake trickles in) thus
+        only costs the octets received since.
+
+        :param sub: The octet sequence to find.
+        :type sub: bytes
+        :param start: Index (relative to the read cursor) where to start searching.
+        :type start: int
+
+        :returns: int -- Index of the sequence relative to the read cursor or -1.
+        """
+        if start >= self._length:
+            return -1
+
+        # walk back from the end to the chunk holding start (the position of
+        # the first chunk ends up at minus the read cursor offset)
+        parts = []
+        pos = self._length
+        for chunk in reversed(self._chunks):
+            if pos <= start:
+                break
+            pos -= len(chunk)
+            parts.append(chunk)
+
+        if len(parts) == 1:
+            i = parts[0].find(sub, start - pos)
+            if i >= 0:
+                return pos + i
+            return -1
+
+        parts.reverse()
+        parts[0] = parts[0][start - pos:]
+        i = b''.join(parts).find(sub)
+        if i >= 0:
+            return start + i
+        return -1
+
+
 class ConnectionRequest:
     """
     Thin-wrapper for WebSocket connection request information provided in
@@ -533,6 +760,18 @@ class WebSocketProtocol:
     _QUEUED_WRITE_DELAY = 0.00001
     """
    For synched/chopped writes, this is the reactor reentry delay in seconds.
+   """
+
+    _DECOMPRESS_CHUNK_SIZE = 65536
+    """
+   Incoming compressed frame payload is decompressed and handed to the
+   application in chunks of at most this many octets.
+   """
+
+    _WRITE_BUFFER_POLL_INTERVAL = 0.05
+    """
+   While writing is paused (see `writeBufferHighWatermark`), check the transport
+   write buffer for having drained every this many seconds.
    """
 
     MESSAGE_TYPE_TEXT = 1
@@ -622,6 +861,8 @@ class WebSocketProtocol:
                            'applyMask',
                            'maxFramePayloadSize',
                            'maxMessagePayloadSize',
+                           'maxHandshakeHeaderSize',
+                           'maxHandshakeHeaderCount',
                            'autoFragmentSize',
                            'failByDrop',
                            'echoCloseCodeReason',
@@ -630,7 +871,15 @@ class WebSocketProtocol:
                            'tcpNoDelay',
                            'autoPingInterval',
                            'autoPingTimeout',
-                           'autoPingSize']
+                           'autoPingSize',
+                           'writeBufferHighWatermark',
+                           'writeBufferLowWatermark',
+                           'writeCoalesceDelay',
+                           'writeCoalesceSize',
+                           'receiveQueueHighWatermark',
+                           'receiveQueueLowWatermark',
+                           'asyncReceiveQueueSize',
+                           'perMessageCompressionPolicy']
     """
    Configuration attributes common to servers and clients.
    """
@@ -753,6 +1002,20 @@ class WebSocketProtocol:
         if self.debug:
             self.factory._log("WebSocketProtocol.onPong")
 
+    def onWritePaused(self):
+        """
+        Implements :func:`autobahn.websocket.interfaces.IWebSocketChannel.onWritePaused`
+        """
+        if self.debug:
+            self.factory._log("WebSocketProtocol.onWritePaused")
+
+    def onWriteResumed(self):
+        """
+        Implements :func:`autobahn.websocket.interfaces.IWebSocketChannel.onWriteResumed`
+        """
+        if self.debug:
+            self.factory._log("WebSocketProtocol.onWriteResumed")
+
     def onClose(self, wasClean, code, reason):
         """
         Implements :func:`autobahn.websocket.interfaces.IWebSocketChannel.onClose`
@@ -837,7 +1100,7 @@ class WebSocketProtocol:
                 # When we are a client, the server should drop the TCP
                 # If that doesn't happen, we do. And that will set wasClean = False.
                 if self.serverConnectionDropTimeout > 0:
-                    self.serverConnectionDropTimeoutCall = self.factory._callLater(self.serverConnectionDropTimeout, self.onServerConnectionDropTimeout)
+                    self.serverConnectionDropTimeoutCall = self.factory._scheduleTimer(self.serverConnectionDropTimeout, self.onServerConnectionDropTimeout)
 
         elif self.state == WebSocketProtocol.STATE_OPEN:
             # The peer initiates a closing handshake, so we reply
@@ -961,6 +1224,11 @@ class WebSocketProtocol:
             if self.debugCodePaths:
                 self.factory._log("dropping connection")
             self.droppedByMe = True
+
+            # write out coalesced octets before closing
+            if not abort:
+                self.flush()
+
             self.state = WebSocketProtocol.STATE_CLOSED
 
             self._closeConnection(abort)
@@ -1107,7 +1375,13 @@ class WebSocketProtocol:
         else:
             self.state = WebSocketProtocol.STATE_CONNECTING
         self.send_state = WebSocketProtocol.SEND_STATE_GROUND
-        self.data = b""
+
+        # incoming octets not yet consumed
+        self.data = ReceiveBuffer()
+
+        # octets of an incomplete HTTP header (in the opening handshake) already
+        # scanned for the end of the header
+        self._headerScanned = 0
 
         # for chopped/synched sends, we need to queue to maintain
         # ordering when recalling the reactor to actually "force"
@@ -1115,6 +1389,34 @@ class WebSocketProtocol:
         self.send_queue = deque()
         self.triggered = False
 
+        # broadcast groups this connection is a member of
+        self._broadcastGroups = set()
+
+        # write side flow control: writing is paused while the transport
+        # buffers more than writeBufferHighWatermark outgoing octets
+        self.writePaused = False
+        self._writeBufferPollCall = None
+        self._drainWaiters = []
+
+        # the transport asked us to stop writing, since its own write buffer
+        # is full (see _pauseTransportWriting())
+        self._transportPaused = False
+
+        # registered (Twisted style) producer
+        self._producer = None
+        self._producerStreaming = False
+        self._pullCall = None
+
+        # octets handed to sendData() or sendDataSequence() in any state
+        # (e.g. to tell whether a producer wrote anything)
+        self._sentOctets = 0
+
+        # write coalescing: outgoing octets buffered for up to writeCoalesceDelay
+        # seconds (or writeCoalesceSize octets) and then written at once
+        self._coalesceBuffer = []
+        self._coalesceLength = 0
+        self._coalesceCall = None
+
         # incremental UTF8 validator
         self.utf8validator = Utf8Validator()
 
@@ -1178,7 +1480,7 @@ class WebSocketProtocol:
 
         # set opening handshake timeout handler
         if self.openHandshakeTimeout > 0:
-            self.openHandshakeTimeoutCall = self.factory._callLater(self.openHandshakeTimeout, self.onOpenHandshakeTimeout)
+            self.openHandshakeTimeoutCall = self.factory._scheduleTimer(self.openHandshakeTimeout, self.onOpenHandshakeTimeout)
 
         self.autoPingTimeoutCall = None
         self.autoPingPending = None
@@ -1212,6 +1514,37 @@ class WebSocketProtocol:
             self.autoPingTimeoutCall.cancel()
             self.autoPingTimeoutCall = None
 
+        # leave all broadcast groups
+        #
+        for group in list(self._broadcastGroups):
+            group.remove(self)
+
+        # release compression resources
+        #
+        if self._perMessageCompress is not None:
+            self._perMessageCompress.close()
+
+        # discard coalesced writes
+        #
+        if self._coalesceCall:
+            self._coalesceCall.cancel()
+            self._coalesceCall = None
+        self._coalesceBuffer = []
+        self._coalesceLength = 0
+
+        # stop watching the write buffer, and don't leave anyone
+        # waiting for it to drain
+        #
+        if self._writeBufferPollCall:
+            self._writeBufferPollCall.cancel()
+            self._writeBufferPollCall = None
+        self.writePaused = False
+        self._transportPaused = False
+        drainWaiters, self._drainWaiters = self._drainWaiters, []
+        for d in drainWaiters:
+            self._resolve_future(d, None)
+        self.unregisterProducer()
+
         self.state = WebSocketProtocol.STATE_CLOSED
         if self.wasServingFlashSocketPolicyFile:
             if self.debug:
@@ -1289,7 +1622,7 @@ class WebSocketProtocol:
 
         if self.logOctets:
             self.logRxOctets(data)
-        self.data += data
+        self.data.append(data)
         self.consumeData()
 
     def consumeData(self):
@@ -1354,6 +1687,54 @@ class WebSocketProtocol:
         """
         raise Exception("must implement handshake (client or server) in derived class")
 
+    def _findEndOfHeader(self):
+        """
+        Find the end of the HTTP header (request or status line and headers) in the
+        received data. The search resumes where it stopped for data received earlier,
+        so a header trickling in is scanned only once.
+
+        Modes: Hybi, Hixie
+
+        :returns: int -- Index of the empty line terminating the header, or `-1` when
+           the header is not yet complete.
+        """
+        end_of_header = self.data.find(b"\x0d\x0a\x0d\x0a", max(0, self._headerScanned - 3))
+        if end_of_header >= 0:
+            self._headerScanned = 0
+        else:
+            self._headerScanned = len(self.data)
+        return end_of_header
+
+    def _httpHeaderTooLarge(self, end_of_header, http_headers_cnt=None):
+        """
+        Check a (possibly incomplete) HTTP header against the maximum size and number of
+        headers configured.
+
+        Modes: Hybi, Hixie
+
+        :param end_of_header: Index of the empty line terminating the header, or `-1` when incomplete.
+        :type end_of_header: int
+        :param http_headers_cnt: Headers count (as returned by :func:`parseHttpHeader`), if parsed already.
+        :type http_headers_cnt: dict or None
+
+        :returns: str -- The reason why the header is not acceptable or `None`.
+        """
+        if self.maxHandshakeHeaderSize > 0:
+            if end_of_header >= 0:
+                size = end_of_header + 4
+            else:
+                # an incomplete header is longer than what we have so far
+                size = len(self.data) + 1
+            if size > self.maxHandshakeHeaderSize:
+                return "HTTP header too large (more than %d octets)" % self.maxHandshakeHeaderSize
+
+        if self.maxHandshakeHeaderCount > 0 and http_headers_cnt is not None:
+            count = sum(http_headers_cnt.values())
+            if count > self.maxHandshakeHeaderCount:
+                return "too many HTTP headers (%d, maximum %d)" % (count, self.maxHandshakeHeaderCount)
+
+        return None
+
     def _trigger(self):
         """
         Trigger sending stuff from send queue (which is only used for chopped/synched writes).
@@ -1385,6 +1766,9 @@ class WebSocketProtocol:
 
                 if self.logOctets:
                     self.logTxOctets(e[0], e[1])
+
+                if self.writeBufferHighWatermark > 0 and not self.writePaused:
+                    self._checkWriteBuffer()
             else:
                 if self.debugCodePaths:
                     self.factory._log("skipped delayed write, since connection is closed")
@@ -1408,7 +1792,9 @@ class WebSocketProtocol:
 
         Modes: Hybi, Hixie
         """
+        self._sentOctets += len(data)
         if chopsize and chopsize > 0:
+            self.flush()
             i = 0
             n = len(data)
             done = False
@@ -1422,10 +1808,14 @@ class WebSocketProtocol:
             self._trigger()
         else:
             if sync or len(self.send_queue) > 0:
+                self.flush()
                 self.send_queue.append((data, sync))
                 self._trigger()
             else:
-                self.transport.write(data)
+                if self._coalesceLength > 0 or (self.writeCoalesceDelay > 0 and self.state == WebSocketProtocol.STATE_OPEN):
+                    self._coalesce([data])
+                else:
+                    self.transport.write(data)
 
                 if self.state == WebSocketProtocol.STATE_OPEN:
                     self.trafficStats.outgoingOctetsWireLevel += len(data)
@@ -1435,15 +1825,265 @@ class WebSocketProtocol:
                 if self.logOctets:
                     self.logTxOctets(data, False)
 
+                if self.writeBufferHighWatermark > 0 and not self.writePaused:
+                    self._checkWriteBuffer()
+
+    def sendDataSequence(self, data, sync=False, chopsize=None):
+        """
+        Like :meth:`sendData`, but takes a list of octet strings, which are
+        handed to the transport as is (vectored write via Twisted
+        ``writeSequence`` or asyncio ``writelines``), instead of being
+        joined first. This avoids copying e.g. a large frame payload just to
+        prepend the frame header.
+
+        Chopped or synched writes (or writes while the send queue is not
+        yet drained) fall back to :meth:`sendData` on the joined octets.
+
+        Modes: Hybi, Hixie
+        """
+        if (chopsize and chopsize > 0) or sync or len(self.send_queue) > 0:
+            self.sendData(b''.join(data), sync, chopsize)
+        else:
+            self._sentOctets += sum(len(d) for d in data)
+            if self._coalesceLength > 0 or (self.writeCoalesceDelay > 0 and self.state == WebSocketProtocol.STATE_OPEN):
+                self._coalesce(data)
+            else:
+                self._writeSequence(data)
+
+            if self.state == WebSocketProtocol.STATE_OPEN:
+                self.trafficStats.outgoingOctetsWireLevel += sum(len(d) for d in data)
+            elif self.state == WebSocketProtocol.STATE_CONNECTING or self.state == WebSocketProtocol.STATE_PROXY_CONNECTING:
+                self.trafficStats.preopenOutgoingOctetsWireLevel += sum(len(d) for d in data)
+
+            if self.logOctets:
+                self.logTxOctets(b''.join(data), False)
+
+            if self.writeBufferHighWatermark > 0 and not self.writePaused:
+                self._checkWriteBuffer()
+
+    def _coalesce(self, data):
+        """
+        Buffer outgoing octets (a list of octet strings) for a coalesced write,
+        which happens after ``writeCoalesceDelay`` seconds, when more than
+        ``writeCoalesceSize`` octets are buffered or on :meth:`flush`.
+
+        Modes: Hybi, Hixie
+        """
+        self._coalesceBuffer.extend(data)
+        self._coalesceLength += sum(len(d) for d in data)
+
+        if self.writeCoalesceSize > 0 and self._coalesceLength >= self.writeCoalesceSize:
+            self.flush()
+        elif self._coalesceCall is None:
+            self._coalesceCall = self.factory._callLater(self.writeCoalesceDelay, self._onCoalesceDelay)
+
+    def _onCoalesceDelay(self):
+        """
+        Write out coalesced octets when the coalescing delay has passed.
+
+        Modes: Hybi, Hixie
+        """
+        self._coalesceCall = None
+        self.flush()
+
+    def flush(self):
+        """
+        Implements :func:`autobahn.websocket.interfaces.IWebSocketChannel.flush`
+        """
+        if self._coalesceCall:
+            self._coalesceCall.cancel()
+            self._coalesceCall = None
+
+        if self._coalesceLength > 0:
+            data, self._coalesceBuffer = self._coalesceBuffer, []
+            self._coalesceLength = 0
+
+            if self.state != WebSocketProtocol.STATE_CLOSED:
+                self._writeSequence(data)
+
+                if self.writeBufferHighWatermark > 0 and not self.writePaused:
+                    self._checkWriteBuffer()
+
+    def _checkWriteBuffer(self):
+        """
+        Pause writing when the transport buffers more outgoing octets than
+        the high watermark, and watch the buffer for draining below the
+        low watermark.
+
+        Modes: Hybi, Hixie
+        """
+        if self._getWriteBufferSize() > self.writeBufferHighWatermark:
+            self._pauseWriting()
+            self._writeBufferPollCall = self.factory._callLater(WebSocketProtocol._WRITE_BUFFER_POLL_INTERVAL, self._pollWriteBuffer)
+
+    def _pollWriteBuffer(self):
+        """
+        Resume writing when the transport write buffer has drained below the
+        low watermark, or else check again later.
+
+        Modes: Hybi, Hixie
+        """
+        self._writeBufferPollCall = None
+        if self.state == WebSocketProtocol.STATE_CLOSED or not self.writePaused:
+            return
+        if self._getWriteBufferSize() <= self.writeBufferLowWatermark:
+            self._resumeWriting()
+        else:
+            self._writeBufferPollCall = self.factory._callLater(WebSocketProtocol._WRITE_BUFFER_POLL_INTERVAL, self._pollWriteBuffer)
+
+    def _pauseWriting(self):
+        """
+        Enter paused writing state and notify the application.
+
+        Modes: Hybi, Hixie
+        """
+        if not self.writePaused:
+            if self.debugCodePaths:
+                self.factory._log("pausing writes (%d octets buffered)" % self._getWriteBufferSize())
+            self.writePaused = True
+            self._pauseProducer()
+            self._onWritePaused()
+
+    def _resumeWriting(self):
+        """
+        Leave paused writing state, notify the application and fire
+        everything waiting on :meth:`drain`.
+
+        Modes: Hybi, Hixie
+        """
+        if self.writePaused:
+            if self.debugCodePaths:
+                self.factory._log("resuming writes (%d octets buffered)" % self._getWriteBufferSize())
+            self.writePaused = False
+            if self._writeBufferPollCall:
+                self._writeBufferPollCall.cancel()
+                self._writeBufferPollCall = None
+            self._resumeProducer()
+            self._onWriteResumed()
+            self._resolveDrainWaiters()
+
+    def _pauseTransportWriting(self):
+        """
+        Called by the adapters when the transport asks to stop writing, since
+        its own write buffer is full. Enter paused writing state when write
+        flow control is enabled (see ``writeBufferHighWatermark``), or else
+        only pause a registered producer (and make :meth:`drain` wait).
+
+        Modes: Hybi, Hixie
+        """
+        self._transportPaused = True
+        if self.writeBufferHighWatermark > 0:
+            self._pauseWriting()
+        else:
+            self._pauseProducer()
+
+    def _resumeTransportWriting(self):
+        """
+        Called by the adapters when the transport's write buffer has drained.
+
+        Modes: Hybi, Hixie
+        """
+        self._transportPaused = False
+        if self.writeBufferHighWatermark > 0:
+            self._resumeWriting()
+        elif not self.writePaused:
+            self._resumeProducer()
+            self._resolveDrainWaiters()
+
+    def _resolveDrainWaiters(self):
+        drainWaiters, self._drainWaiters = self._drainWaiters, []
+        for d in drainWaiters:
+            self._resolve_future(d, None)
+
+    def drain(self):
+        """
+        Implements :func:`autobahn.websocket.interfaces.IWebSocketChannel.drain`
+        """
+        d = self._create_future()
+        if self.writePaused or self._transportPaused:
+            self._drainWaiters.append(d)
+        else:
+            self._resolve_future(d, None)
+        return d
+
+    def registerProducer(self, producer, streaming):
+        """
+        Register a (Twisted style) producer with this protocol.
+
+        A streaming (push) producer is paused and resumed as writing is paused
+        and resumed (by the transport, or see `writeBufferHighWatermark`). A
+        non-streaming (pull) producer is asked to produce repeatedly while
+        writing is not paused, and when it did not write anything, asked again
+        after a short delay.
+
+        Modes: Hybi, Hixie
+
+        :param producer: A push or pull producer.
+        :type producer: object
+        :param streaming: Producer type.
+        :type streaming: bool
+        """
+        if self._producer is not None:
+            raise Exception("cannot register producer %s, since producer %s is already registered" % (producer, self._producer))
+        self._producer = producer
+        self._producerStreaming = streaming
+        if streaming:
+            if self.writePaused or self._transportPaused:
+                producer.pauseProducing()
+        else:
+            self._pullProducer()
+
+    def unregisterProducer(self):
+        """
+        Unregister a producer previously registered with :meth:`registerProducer`.
+        """
+        self._producer = None
+        if self._pullCall is not None:
+            self._pullCall.cancel()
+            self._pullCall = None
+
+    def _pauseProducer(self):
+        if self._producer is not None and self._producerStreaming:
+            self._producer.pauseProducing()
+
+    def _resumeProducer(self):
+        if self._producer is not None:
+            if self._producerStreaming:
+                self._producer.resumeProducing()
+            else:
+                self._pullProducer()
+
+    def _pullProducer(self):
+        if self._pullCall is not None:
+            self._pullCall.cancel()
+            self._pullCall = None
+        if self._producer is None or self._producerStreaming or self.writePaused or self._transportPaused or \
+           self.state == WebSocketProtocol.STATE_CLOSED:
+            return
+        producer = self._producer
+        before = self._sentOctets
+        producer.resumeProducing()
+        if self._producer is not producer or self._pullCall is not None:
+            # unregistered or pulled again from within resumeProducing()
+            return
+        if self._sentOctets > before:
+            self._pullCall = self.factory._callLater(0, self._pullProducer)
+        else:
+            self._pullCall = self.factory._callLater(WebSocketProtocol._WRITE_BUFFER_POLL_INTERVAL, self._pullProducer)
+
     def sendPreparedMessage(self, preparedMsg):
         """
         Implements :func:`autobahn.websocket.interfaces.IWebSocketChannel.sendPreparedMessage`
         """
         if self.websocket_version != 0:
             if self._perMessageCompress is None or preparedMsg.doNotCompress:
-                self.sendData(preparedMsg.payloadHybi)
+                self.sendDataSequence(preparedMsg.framesHybi)
             else:
-                self.sendMessage(preparedMsg.payload, preparedMsg.binary)
+                frames = preparedMsg.getCompressedFramesHybi(self._perMessageCompress)
+                if frames is not None:
+                    self.sendDataSequence(frames)
+                else:
+                    self.sendMessage(preparedMsg.payload, preparedMsg.binary)
         else:
             self.sendData(preparedMsg.payloadHixie)
 
@@ -1472,9 +2112,11 @@ class WebSocketProtocol:
         if not self.inside_message:
             if buffered_len >= 2:
 
+                head = self.data.peek(2)
+
                 # new message
                 #
-                if self.data[0] == b'\x00':
+                if head[0:1] == b'\x00':
 
                     self.inside_message = True
 
@@ -1485,16 +2127,16 @@ class WebSocketProtocol:
                     else:
                         self.utf8validateIncomingCurrentMessage = False
 
-                    self.data = self.data[1:]
+                    self.data.skip(1)
                     if self.trackedTimings:
                         self.trackedTimings.track("onMessageBegin")
                     self._onMessageBegin(False)
 
                 # Hixie close from peer received
                 #
-                elif self.data[0] == b'\xff' and self.data[1] == b'\x00':
+                elif head == b'\xff\x00':
                     self.onCloseFrame(None, None)
-                    self.data = self.data[2:]
+                    self.data.skip(2)
                     # stop receiving/processing after having received close!
                     return False
 
@@ -1509,11 +2151,10 @@ class WebSocketProtocol:
 
         end_index = self.data.find(b'\xff')
         if end_index > 0:
-            payload = self.data[:end_index]
-            self.data = self.data[end_index + 1:]
+            payload = self.data.read(end_index)
+            self.data.skip(1)
         else:
-            payload = self.data
-            self.data = b''
+            payload = self.data.read(len(self.data))
 
         # incrementally validate UTF-8 payload
         #
@@ -1547,24 +2188,18 @@ class WebSocketProtocol:
             #
             if buffered_len >= 2:
 
+                b0, b1 = struct.unpack("!BB", self.data.peek(2))
+
                 # FIN, RSV, OPCODE
                 #
-                if six.PY3:
-                    b = self.data[0]
-                else:
-                    b = ord(self.data[0])
-                frame_fin = (b & 0x80) != 0
-                frame_rsv = (b & 0x70) >> 4
-                frame_opcode = b & 0x0f
+                frame_fin = (b0 & 0x80) != 0
+                frame_rsv = (b0 & 0x70) >> 4
+                frame_opcode = b0 & 0x0f
 
                 # MASK, PAYLOAD LEN 1
                 #
-                if six.PY3:
-                    b = self.data[1]
-                else:
-                    b = ord(self.data[1])
-                frame_masked = (b & 0x80) != 0
-                frame_payload_len1 = b & 0x7f
+                frame_masked = (b1 & 0x80) != 0
+                frame_payload_len1 = b1 & 0x7f
 
                 # MUST be 0 when no extension defining
                 # the semantics of RSV has been negotiated
@@ -1670,6 +2305,10 @@ class WebSocketProtocol:
                 #
                 if buffered_len >= frame_header_len:
 
+                    # consume complete frame header
+                    #
+                    header = self.data.read(frame_header_len)
+
                     # minimum frame header length (already consumed)
                     #
                     i = 2
@@ -1677,13 +2316,13 @@ class WebSocketProtocol:
                     # extract extended payload length
                     #
                     if frame_payload_len1 == 126:
-                        frame_payload_len = struct.unpack("!H", self.data[i:i + 2])[0]
+                        frame_payload_len = struct.unpack("!H", header[i:i + 2])[0]
                         if frame_payload_len < 126:
                             if self.protocolViolation("invalid data frame length (not using minimal length encoding)"):
                                 return False
                         i += 2
                     elif frame_payload_len1 == 127:
-                        frame_payload_len = struct.unpack("!Q", self.data[i:i + 8])[0]
+                        frame_payload_len = struct.unpack("!Q", header[i:i + 8])[0]
                         if frame_payload_len > 0x7FFFFFFFFFFFFFFF:  # 2**63
                             if self.protocolViolation("invalid data frame length (>2^63)"):
                                 return False
@@ -1698,7 +2337,7 @@ class WebSocketProtocol:
                     #
                     frame_mask = None
                     if frame_masked:
-                        frame_mask = self.data[i:i + 4]
+                        frame_mask = header[i:i + 4]
                         i += 4
 
                     if frame_masked and frame_payload_len > 0 and self.applyMask:
@@ -1706,10 +2345,6 @@ class WebSocketProtocol:
                     else:
                         self.current_frame_masker = XorMaskerNull()
 
-                    # remember rest (payload of current frame after header and everything thereafter)
-                    #
-                    self.data = self.data[i:]
-
                     # ok, got complete frame header
                     #
                     self.current_frame = FrameHeader(frame_opcode,
@@ -1735,17 +2370,12 @@ class WebSocketProtocol:
         #
         else:
 
-            # cut out rest of frame payload
+            # consume (rest of) frame payload, as far as buffered. this does
+            # not copy when the payload covers received chunks as a whole
             #
             rest = self.current_frame.length - self.current_frame_masker.pointer()
-            if buffered_len >= rest:
-                data = self.data[:rest]
-                length = rest
-                self.data = self.data[rest:]
-            else:
-                data = self.data
-                length = buffered_len
-                self.data = b''
+            data = self.data.read(rest)
+            length = len(data)
 
             if length > 0:
                 # unmask payload
@@ -1797,6 +2427,7 @@ class WebSocketProtocol:
                 if self._perMessageCompress is not None and self.current_frame.rsv == 4:
                     self._isMessageCompressed = True
                     self._perMessageCompress.startDecompressMessage()
+                    self._uncompressedMessageLength = 0
                 else:
                     self._isMessageCompressed = False
 
@@ -1818,6 +2449,7 @@ class WebSocketProtocol:
                 #
                 self._onMessageBegin(self.current_frame.opcode == WebSocketProtocol.MESSAGE_TYPE_BINARY)
 
+            self._uncompressedFrameLength = 0
             self._onMessageFrameBegin(self.current_frame.length)
 
     def onFrameData(self, payload):
@@ -1829,33 +2461,64 @@ class WebSocketProtocol:
         if self.current_frame.opcode > 7:
             self.control_frame_data.append(payload)
         else:
-            # decompress frame payload
+            # decompress frame payload: this is done in bounded chunks,
+            # and payload size limits are enforced on the uncompressed
+            # size, so a small compressed frame cannot blow up memory
             #
             if self._isMessageCompressed:
                 compressedLen = len(payload)
                 if self.debug:
                     self.factory._log("RX compressed [%d]: %s" % (compressedLen, binascii.b2a_hex(payload)))
 
-                payload = self._perMessageCompress.decompressMessageData(payload)
-                uncompressedLen = len(payload)
-            else:
-                l = len(payload)
-                compressedLen = l
-                uncompressedLen = l
+                if self.state == WebSocketProtocol.STATE_OPEN:
+                    self.trafficStats.incomingOctetsWebSocketLevel += compressedLen
 
-            if self.state == WebSocketProtocol.STATE_OPEN:
-                self.trafficStats.incomingOctetsWebSocketLevel += compressedLen
-                self.trafficStats.incomingOctetsAppLevel += uncompressedLen
+                chunk = self._perMessageCompress.decompressMessageData(payload, WebSocketProtocol._DECOMPRESS_CHUNK_SIZE)
+                while chunk:
+                    uncompressedLen = len(chunk)
+                    self._uncompressedFrameLength += uncompressedLen
+                    self._uncompressedMessageLength += uncompressedLen
 
-            # incrementally validate UTF-8 payload
-            #
-            if self.utf8validateIncomingCurrentMessage:
-                self.utf8validateLast = self.utf8validator.validate(payload)
-                if not self.utf8validateLast[0]:
-                    if self.invalidPayload("encountered invalid UTF-8 while processing text message at payload octet index %d" % self.utf8validateLast[3]):
+                    if 0 < self.maxMessagePayloadSize < self._uncompressedMessageLength:
+                        self.wasMaxMessagePayloadSizeExceeded = True
+                        self.failConnection(WebSocketProtocol.CLOSE_STATUS_CODE_MESSAGE_TOO_BIG, "message exceeds payload limit of %d octets" % self.maxMessagePayloadSize)
                         return False
 
-            self._onMessageFrameData(payload)
+                    if 0 < self.maxFramePayloadSize < self._uncompressedFrameLength:
+                        self.wasMaxFramePayloadSizeExceeded = True
+                        self.failConnection(WebSocketProtocol.CLOSE_STATUS_CODE_POLICY_VIOLATION, "frame exceeds payload limit of %d octets" % self.maxFramePayloadSize)
+                        return False
+
+                    if self.state == WebSocketProtocol.STATE_OPEN:
+                        self.trafficStats.incomingOctetsAppLevel += uncompressedLen
+
+                    if self._onFrameDataPayload(chunk) is False:
+                        return False
+
+                    chunk = self._perMessageCompress.decompressMessageData(b'', WebSocketProtocol._DECOMPRESS_CHUNK_SIZE)
+            else:
+                if self.state == WebSocketProtocol.STATE_OPEN:
+                    l = len(payload)
+                    self.trafficStats.incomingOctetsWebSocketLevel += l
+                    self.trafficStats.incomingOctetsAppLevel += l
+
+                return self._onFrameDataPayload(payload)
+
+    def _onFrameDataPayload(self, payload):
+        """
+        (Uncompressed) data received within frame of data message.
+
+        Modes: Hybi
+        """
+        # incrementally validate UTF-8 payload
+        #
+        if self.utf8validateIncomingCurrentMessage:
+            self.utf8validateLast = self.utf8validator.validate(payload)
+            if not self.utf8validateLast[0]:
+                if self.invalidPayload("encountered invalid UTF-8 while processing text message at payload octet index %d" % self.utf8validateLast[3]):
+                    return False
+
+        self._onMessageFrameData(payload)
 
     def onFrameEnd(self):
         """
@@ -1950,7 +2613,7 @@ class WebSocketProtocol:
                         self.autoPingTimeoutCall = None
 
                         if self.autoPingInterval:
-                            self.autoPingPendingCall = self.factory._callLater(self.autoPingInterval, self._sendAutoPing)
+                            self.autoPingPendingCall = self.factory._scheduleTimer(self.autoPingInterval, self._sendAutoPing)
                     else:
                         if self.debugCodePaths:
                             self.factory._log("Auto ping/pong: received non-pending pong")
@@ -2049,10 +2712,13 @@ class WebSocketProtocol:
         else:
             raise Exception("invalid payload length")
 
+        # frame header (the payload is not copied into the header, but
+        # handed to the transport separately)
+        #
         if six.PY3:
-            raw = b''.join([b0.to_bytes(1, 'big'), b1.to_bytes(1, 'big'), el, mv, plm])
+            header = b''.join([b0.to_bytes(1, 'big'), b1.to_bytes(1, 'big'), el, mv])
         else:
-            raw = b''.join([chr(b0), chr(b1), el, mv, plm])
+            header = b''.join([chr(b0), chr(b1), el, mv])
 
         if opcode in [0, 1, 2]:
             self.trafficStats.outgoingWebSocketFrames += 1
@@ -2063,7 +2729,15 @@ class WebSocketProtocol:
 
         # send frame octets
         #
-        self.sendData(raw, sync, chopsize)
+        if len(plm) > 0:
+            self.sendDataSequence([header, plm], sync, chopsize)
+        else:
+            self.sendData(header, sync, chopsize)
+
+        # control frames are not delayed by write coalescing
+        #
+        if opcode > 7 and self._coalesceLength > 0:
+            self.flush()
 
     def sendPing(self, payload=None):
         """
@@ -2095,7 +2769,7 @@ class WebSocketProtocol:
         if self.autoPingTimeout:
             if self.debugCodePaths:
                 self.factory._log("Auto ping/pong: expecting ping in {0} seconds for auto-ping/pong".format(self.autoPingTimeout))
-            self.autoPingTimeoutCall = self.factory._callLater(self.autoPingTimeout, self.onAutoPingTimeout)
+            self.autoPingTimeoutCall = self.factory._scheduleTimer(self.autoPingTimeout, self.onAutoPingTimeout)
 
     def sendPong(self, payload=None):
         """
@@ -2159,7 +2833,7 @@ class WebSocketProtocol:
 
             # drop connection when timeout on receiving close handshake reply
             if self.closedByMe and self.closeHandshakeTimeout > 0:
-                self.closeHandshakeTimeoutCall = self.factory._callLater(self.closeHandshakeTimeout, self.onCloseHandshakeTimeout)
+                self.closeHandshakeTimeoutCall = self.factory._scheduleTimer(self.closeHandshakeTimeout, self.onCloseHandshakeTimeout)
 
         else:
             raise Exception("logic error")
@@ -2435,7 +3109,7 @@ class WebSocketProtocol:
 
         Modes: Hixie
         """
-        self.sendData(b'\x00' + payload + b'\xff', sync=sync)
+        self.sendDataSequence([b'\x00', payload, b'\xff'], sync=sync)
 
     def sendMessageHybi(self,
                         payload,
@@ -2457,14 +3131,24 @@ class WebSocketProtocol:
 
         self.trafficStats.outgoingWebSocketMessages += 1
 
+        # let the compression policy (if any) decide whether to compress
+        #
+        sendCompressed = self._perMessageCompress is not None and not doNotCompress
+        if sendCompressed and self.perMessageCompressionPolicy is not None:
+            sendCompressed = self.perMessageCompressionPolicy(payload, isBinary, self.trafficStats)
+            if not sendCompressed:
+                self.trafficStats.outgoingCompressionSkipped += 1
+
         # setup compressor
         #
-        if self._perMessageCompress is not None and not doNotCompress:
-            sendCompressed = True
+        if sendCompressed:
+            if self.perMessageCompressionPolicy is not None:
+                started = cputime()
 
             self._perMessageCompress.startCompressMessage()
 
-            self.trafficStats.outgoingOctetsAppLevel += len(payload)
+            l = len(payload)
+            self.trafficStats.outgoingOctetsAppLevel += l
 
             payload1 = self._perMessageCompress.compressMessageData(payload)
             payload2 = self._perMessageCompress.endCompressMessage()
@@ -2472,6 +3156,11 @@ class WebSocketProtocol:
 
             self.trafficStats.outgoingOctetsWebSocketLevel += len(payload)
 
+            if self.perMessageCompressionPolicy is not None:
+                self.trafficStats.trackCompression(isBinary, l, len(payload), cputime() - started)
+            else:
+                self.trafficStats.trackCompression(isBinary, l, len(payload))
+
         else:
             sendCompressed = False
             l = len(payload)
@@ -2581,9 +3270,14 @@ class PreparedMessage:
         if not doNotCompress:
             # we need to store original payload for compressed WS
             # connections (cannot compress/frame in advanced when
-            # compression is on, and context takeover is off)
+            # compression is on, and context takeover is on)
             self.payload = payload
             self.binary = isBinary
+            self.masked = applyMask
+
+            # pre-compressed frames for WS connections without context
+            # takeover, by compression key (e.g. window bits and mem level)
+            self.compressedHybi = {}
         self.doNotCompress = doNotCompress
 
         # store pre-framed octets to be sent to Hixie-76 peers
@@ -2597,16 +3291,21 @@ class PreparedMessage:
             # silently filter out .. probably do something else:
             # base64?
             # dunno
-            self.payloadHixie = ''
+            self.payloadHixie = b''
         else:
-            self.payloadHixie = '\x00' + payload + '\xff'
+            self.payloadHixie = b'\x00' + payload + b'\xff'
 
     def _initHybi(self, payload, binary, masked):
+        self.framesHybi = self._frameHybi(payload, binary, masked)
+
+    def _frameHybi(self, payload, binary, masked, compressed=False):
         l = len(payload)
 
         # first byte
         #
         b0 = ((1 << 7) | 2) if binary else ((1 << 7) | 1)
+        if compressed:
+            b0 |= 4 << 4
 
         # second byte, payload len bytes and mask
         #
@@ -2636,54 +3335,499 @@ class PreparedMessage:
         else:
             raise Exception("invalid payload length")
 
-        # raw WS message (single frame)
+        # raw WS message (single frame): frame header and (masked) payload
+        # are kept separately and sent using a vectored write
         #
         if six.PY3:
-            self.payloadHybi = b''.join([b0.to_bytes(1, 'big'), b1.to_bytes(1, 'big'), el, mask, plm])
+            header = b''.join([b0.to_bytes(1, 'big'), b1.to_bytes(1, 'big'), el, mask])
         else:
-            self.payloadHybi = b''.join([chr(b0), chr(b1), el, mask, plm])
-
-
-class WebSocketFactory:
-    """
-    Mixin for
-    :class:`autobahn.websocket.protocol.WebSocketClientFactory` and
-    :class:`autobahn.websocket.protocol.WebSocketServerFactory`.
-    """
+            header = b''.join([chr(b0), chr(b1), el, mask])
+        if l == 0:
+            return [header]
+        else:
+            return [header, plm]
 
-    def prepareMessage(self, payload, isBinary=False, doNotCompress=False):
+    def getCompressedFramesHybi(self, pmce):
         """
-        Prepare a WebSocket message. This can be later sent on multiple
-        instances of :class:`autobahn.websocket.WebSocketProtocol` using
-        :meth:`autobahn.websocket.WebSocketProtocol.sendPreparedMessage`.
+        Get the message compressed and framed for a WebSocket connection that
+        negotiated compression. The message is compressed only once for all
+        connections having the same compression parameters and no context takeover.
 
-        By doing so, you can avoid the (small) overhead of framing the
-        *same* payload into WebSocket messages multiple times when that
-        same payload is to be sent out on multiple connections.
+        :param pmce: The negotiated compression of the connection.
+        :type pmce: Instance of :class:`autobahn.websocket.compress.PerMessageCompress`.
 
-        :param payload: The message payload.
-        :type payload: bytes
-        :param isBinary: `True` iff payload is binary, else the payload must be UTF-8 encoded text.
-        :type isBinary: bool
-        :param doNotCompress: Iff `True`, never compress this message. This only applies to
-                              Hybi-Mode and only when WebSocket compression has been negotiated on
-                              the WebSocket connection. Use when you know the payload
-                              incompressible (e.g. encrypted or already compressed).
-        :type doNotCompress: bool
+        :returns: list -- The frame octets, or `None` when the connection compresses
+                          with context takeover, and hence the message needs to be
+                          compressed specifically for the connection.
+        """
+        key = pmce.compressContextKey()
+        if key is None:
+            return None
+        if key not in self.compressedHybi:
+            pmce.startCompressMessage()
+            data = b''.join([pmce.compressMessageData(self.payload), pmce.endCompressMessage()])
+            self.compressedHybi[key] = self._frameHybi(data, self.binary, self.masked, True)
+        return self.compressedHybi[key]
 
-        :returns: obj -- An instance of :class:`autobahn.websocket.protocol.PreparedMessage`.
+    @property
+    def payloadHybi(self):
         """
-        applyMask = not self.isServer
-        return PreparedMessage(payload, isBinary, applyMask, doNotCompress)
+        The raw WS message (single frame) as one octet string.
+        """
+        return b''.join(self.framesHybi)
 
 
-class WebSocketServerProtocol(WebSocketProtocol):
+class BroadcastStats:
     """
-    Protocol base class for WebSocket servers.
+    Send statistics of a :class:`autobahn.websocket.protocol.BroadcastGroup`.
     """
 
-    CONFIG_ATTRS = WebSocketProtocol.CONFIG_ATTRS_COMMON + WebSocketProtocol.CONFIG_ATTRS_SERVER
-
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # number of messages sent to the group
+        self.messages = 0
+
+        # number of times a message was sent to a member
+        self.delivered = 0
+
+        # number of times a member was skipped because its transport
+        # had too many outgoing octets buffered already
+        self.skipped = 0
+
+        # number of octets written to members (wire level)
+        self.octets = 0
+
+        # number of compressed variants of messages created
+        self.compressed = 0
+
+    def __json__(self):
+        return {'messages': self.messages,
+                'delivered': self.delivered,
+                'skipped': self.skipped,
+                'octets': self.octets,
+                'compressed': self.compressed}
+
+    def __str__(self):
+        return json.dumps(self.__json__())
+
+
+class BroadcastGroup:
+    """
+    A set of WebSocket connections to which messages are sent as a whole.
+
+    A message sent to the group is framed only once. For members that
+    negotiated WebSocket compression without context takeover, the message is
+    compressed only once per set of compression parameters. Members whose
+    transport has more than `maxBufferSize` outgoing octets buffered, or has
+    paused writing since its own write buffer is full, are skipped (the message
+    is dropped for those). Twisted transports only tell the latter.
+
+    Use :meth:`autobahn.websocket.protocol.WebSocketServerFactory.getBroadcastGroup`
+    to get a group.
+    """
+
+    def __init__(self, factory, name, maxBufferSize=None):
+        """
+        Ctor.
+
+        :param factory: The WebSocket server factory the group belongs to.
+        :type factory: obj
+        :param name: The name of the group.
+        :type name: str
+        :param maxBufferSize: Skip members with more outgoing octets buffered on
+                              their transport than this (default: `None` for never skip).
+        :type maxBufferSize: int
+        """
+        self.factory = factory
+        self.name = name
+        self.maxBufferSize = maxBufferSize
+        self.members = set()
+        self.stats = BroadcastStats()
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, proto):
+        return proto in self.members
+
+    def add(self, proto):
+        """
+        Add a WebSocket connection to the group. Connections are removed
+        automatically when lost.
+
+        :param proto: The connection to add.
+        :type proto: Instance of :class:`autobahn.websocket.protocol.WebSocketServerProtocol`.
+        """
+        self.members.add(proto)
+        proto._broadcastGroups.add(self)
+
+    def remove(self, proto):
+        """
+        Remove a WebSocket connection from the group (if a member).
+
+        :param proto: The connection to remove.
+        :type proto: Instance of :class:`autobahn.websocket.protocol.WebSocketServerProtocol`.
+        """
+        self.members.discard(proto)
+        proto._broadcastGroups.discard(self)
+
+    def sendMessage(self, payload, isBinary=False, doNotCompress=False):
+        """
+        Send a WebSocket message to all members of the group.
+
+        For parameters, see :meth:`autobahn.websocket.protocol.WebSocketFactory.prepareMessage`.
+
+        :returns: int -- The number of members the message was sent to.
+        """
+        preparedMsg = self.factory.prepareMessage(payload, isBinary, doNotCompress)
+        return self.sendPreparedMessage(preparedMsg)
+
+    def sendPreparedMessage(self, preparedMsg):
+        """
+        Send a prepared WebSocket message to all members of the group.
+
+        :param preparedMsg: The message to send.
+        :type preparedMsg: Instance of :class:`autobahn.websocket.protocol.PreparedMessage`.
+
+        :returns: int -- The number of members the message was sent to.
+        """
+        self.stats.messages += 1
+
+        octetsHybi = None
+        octetsHixie = len(preparedMsg.payloadHixie)
+
+        delivered = 0
+        for proto in list(self.members):
+            if proto.state != WebSocketProtocol.STATE_OPEN:
+                continue
+
+            if self.maxBufferSize is not None and (proto._transportPaused or proto._getWriteBufferSize() > self.maxBufferSize):
+                self.stats.skipped += 1
+                continue
+
+            if proto.websocket_version == 0:
+                proto.sendData(preparedMsg.payloadHixie)
+                self.stats.octets += octetsHixie
+
+            elif proto._perMessageCompress is None or preparedMsg.doNotCompress:
+                proto.sendDataSequence(preparedMsg.framesHybi)
+                if octetsHybi is None:
+                    octetsHybi = sum(len(f) for f in preparedMsg.framesHybi)
+                self.stats.octets += octetsHybi
+
+            else:
+                variants = len(preparedMsg.compressedHybi)
+                frames = preparedMsg.getCompressedFramesHybi(proto._perMessageCompress)
+                if frames is None:
+                    # compressing with context takeover: the compressed
+                    # message is specific to the connection
+                    proto.sendMessage(preparedMsg.payload, preparedMsg.binary)
+                else:
+                    proto.sendDataSequence(frames)
+                    self.stats.octets += sum(len(f) for f in frames)
+                    self.stats.compressed += len(preparedMsg.compressedHybi) - variants
+
+            delivered += 1
+
+        self.stats.delivered += delivered
+        return delivered
+
+
+class HandshakeAdmission:
+    """
+    Admission control for opening handshakes on a WebSocket server.
+
+    Limits the number of opening handshakes in flight (connections accepted, but
+    not yet open) and, with a token bucket, the rate of new connections, either
+    for all peers together or per peer address. A connection arriving when no
+    token is available is deferred until one is, or rejected when that would take
+    longer than `maxDelay` seconds.
+
+    Use :meth:`autobahn.websocket.protocol.WebSocketServerFactory.setProtocolOptions`
+    to configure the admission control of a factory.
+    """
+
+    MAX_PEER_BUCKETS = 10000
+    """
+   Maximum number of per-peer token buckets kept.
+   """
+
+    def __init__(self, clock=None):
+        """
+        Ctor.
+
+        :param clock: Function returning the current time in seconds (default: `time.time`).
+        :type clock: callable
+        """
+        self.clock = clock or time.time
+
+        self.maxInFlight = 0
+        self.rate = 0
+        self.burst = 10
+        self.perPeer = False
+        self.maxDelay = 1
+
+        # opening handshakes currently in flight
+        self.inFlight = 0
+
+        # connections admitted (including deferred ones), deferred and rejected
+        self.accepted = 0
+        self.deferred = 0
+        self.rejected = 0
+
+        # token buckets: key -> (tokens, time of last update)
+        self._buckets = {}
+
+    def admit(self, peer):
+        """
+        Decide on admitting a new connection. An admitted connection must be
+        released using :meth:`release` when its opening handshake is done.
+
+        :param peer: The peer of the connection.
+        :type peer: str
+
+        :returns: tuple -- `(delay, retryAfter)` where `delay` is the number of seconds
+           to defer the opening handshake (`0` for none) or `None` when the connection is
+           rejected. `retryAfter` is the number of seconds the peer should wait before
+           retrying after a rejection.
+        """
+        if self.maxInFlight > 0 and self.inFlight >= self.maxInFlight:
+            self.rejected += 1
+            return (None, 1)
+
+        delay = 0
+        if self.rate > 0:
+            if self.perPeer:
+                # strip the port from "tcp4:127.0.0.1:8080" style peers
+                key = peer.rsplit(':', 1)[0]
+            else:
+                key = None
+            delay = self._takeToken(key)
+            if delay > self.maxDelay:
+                self.rejected += 1
+                return (None, max(1, int(math.ceil(delay))))
+
+        self.inFlight += 1
+        self.accepted += 1
+        if delay > 0:
+            self.deferred += 1
+        return (delay, None)
+
+    def release(self):
+        """
+        Release a connection admitted before, when its opening handshake is done.
+        """
+        self.inFlight -= 1
+
+    def _takeToken(self, key):
+        """
+        Take a token from a bucket, reserving a future one if the bucket is empty.
+
+        :returns: float -- The number of seconds until the token becomes available. When
+           this is more than `maxDelay`, no token is taken.
+        """
+        now = self.clock()
+        if key in self._buckets:
+            (tokens, last) = self._buckets[key]
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+        else:
+            if len(self._buckets) >= self.MAX_PEER_BUCKETS:
+                self._pruneBuckets(now)
+            tokens = self.burst
+
+        delay = max(0, (1 - tokens) / float(self.rate))
+        if delay > self.maxDelay:
+            self._buckets[key] = (tokens, now)
+        else:
+            self._buckets[key] = (tokens - 1, now)
+        return delay
+
+    def _pruneBuckets(self, now):
+        """
+        Drop buckets which have filled up again (and hence are equivalent to a new one).
+        """
+        for key, (tokens, last) in list(self._buckets.items()):
+            if tokens + (now - last) * self.rate >= self.burst:
+                del self._buckets[key]
+        if len(self._buckets) >= self.MAX_PEER_BUCKETS:
+            self._buckets.clear()
+
+
+class TimerWheelCall:
+    """
+    A call scheduled on a :class:`autobahn.websocket.protocol.TimerWheel`.
+    """
+
+    def __init__(self, wheel, tick, fun):
+        self.wheel = wheel
+        self.tick = tick
+        self.fun = fun
+
+    def cancel(self):
+        """
+        Cancel the call. Does nothing if the call was already run or canceled.
+        """
+        if self.wheel is not None:
+            self.wheel._cancel(self)
+            self.wheel = None
+
+
+class TimerWheel:
+    """
+    Timers shared by all connections of a factory, used for the opening and closing
+    handshake timeouts and automatic ping/pong.
+
+    Calls are bucketed by deadline into ticks of `resolution` seconds, and only one
+    timer of the networking framework is pending at any time, for the earliest tick.
+    All calls due in a tick (e.g. the automatic pings of many connections) are run
+    in one go. A call runs at most `resolution` seconds late, but never early.
+    """
+
+    def __init__(self, factory, resolution, clock=None):
+        """
+        Ctor.
+
+        :param factory: The factory to schedule timers and log with.
+        :type factory: obj
+        :param resolution: Length of a tick in seconds.
+        :type resolution: float
+        :param clock: Function returning the current time in seconds (default: `time.time`).
+        :type clock: callable
+        """
+        self.factory = factory
+        self.resolution = resolution
+        self.clock = clock or time.time
+
+        # calls by tick, and a heap of the ticks with calls
+        self._slots = {}
+        self._ticks = []
+
+        # timer of the networking framework, and the tick it is for
+        self._call = None
+        self._callTick = None
+
+    def __len__(self):
+        return sum(len(slot) for slot in self._slots.values())
+
+    def callLater(self, delay, fun):
+        """
+        Schedule a call.
+
+        :param delay: Delay in seconds.
+        :type delay: float
+        :param fun: The function to call (without arguments).
+        :type fun: callable
+
+        :returns: obj -- An instance of :class:`autobahn.websocket.protocol.TimerWheelCall`.
+        """
+        tick = int(math.ceil((self.clock() + delay) / self.resolution))
+        call = TimerWheelCall(self, tick, fun)
+        if tick not in self._slots:
+            self._slots[tick] = set()
+            heapq.heappush(self._ticks, tick)
+        self._slots[tick].add(call)
+
+        if self._callTick is None or tick < self._callTick:
+            self._schedule(tick)
+        return call
+
+    def _cancel(self, call):
+        slot = self._slots.get(call.tick, None)
+        if slot is not None:
+            slot.discard(call)
+            if not slot:
+                # the tick stays on the heap, and is skipped when due
+                del self._slots[call.tick]
+
+    def _schedule(self, tick):
+        if self._call is not None:
+            self._call.cancel()
+        delay = max(0, tick * self.resolution - self.clock())
+        self._call = self.factory._callLater(delay, self._onTick)
+        self._callTick = tick
+
+    def _onTick(self):
+        now = max(self._callTick, int(math.floor(self.clock() / self.resolution)))
+        self._call = None
+        self._callTick = None
+
+        while self._ticks and self._ticks[0] <= now:
+            tick = heapq.heappop(self._ticks)
+            for call in self._slots.pop(tick, ()):
+                call.wheel = None
+                try:
+                    call.fun()
+                except Exception as e:
+                    self.factory._log("exception in timer call: %s" % e)
+
+        # drop canceled ticks from the top of the heap
+        while self._ticks and self._ticks[0] not in self._slots:
+            heapq.heappop(self._ticks)
+
+        # calls run might have scheduled further calls meanwhile
+        if self._ticks and (self._callTick is None or self._ticks[0] < self._callTick):
+            self._schedule(self._ticks[0])
+
+
+class WebSocketFactory:
+    """
+    Mixin for
+    :class:`autobahn.websocket.protocol.WebSocketClientFactory` and
+    :class:`autobahn.websocket.protocol.WebSocketServerFactory`.
+    """
+
+    def _scheduleTimer(self, delay, fun):
+        """
+        Schedule a connection timer (handshake timeouts and automatic ping/pong),
+        on the timer wheel shared by all connections if enabled (see option
+        `timerWheelResolution`), or else directly with the networking framework.
+        """
+        if self.timerWheelResolution > 0:
+            if self.timerWheel is None or self.timerWheel.resolution != self.timerWheelResolution:
+                self.timerWheel = TimerWheel(self, self.timerWheelResolution)
+            return self.timerWheel.callLater(delay, fun)
+        else:
+            return self._callLater(delay, fun)
+
+    def prepareMessage(self, payload, isBinary=False, doNotCompress=False):
+        """
+        Prepare a WebSocket message. This can be later sent on multiple
+        instances of :class:`autobahn.websocket.WebSocketProtocol` using
+        :meth:`autobahn.websocket.WebSocketProtocol.sendPreparedMessage`.
+
+        By doing so, you can avoid the (small) overhead of framing the
+        *same* payload into WebSocket messages multiple times when that
+        same payload is to be sent out on multiple connections.
+
+        On connections that negotiated WebSocket compression without context
+        takeover, the message is also compressed only once per set of compression
+        parameters.
+
+        :param payload: The message payload.
+        :type payload: bytes
+        :param isBinary: `True` iff payload is binary, else the payload must be UTF-8 encoded text.
+        :type isBinary: bool
+        :param doNotCompress: Iff `True`, never compress this message. This only applies to
+                              Hybi-Mode and only when WebSocket compression has been negotiated on
+                              the WebSocket connection. Use when you know the payload
+                              incompressible (e.g. encrypted or already compressed).
+        :type doNotCompress: bool
+
+        :returns: obj -- An instance of :class:`autobahn.websocket.protocol.PreparedMessage`.
+        """
+        applyMask = not self.isServer
+        return PreparedMessage(payload, isBinary, applyMask, doNotCompress)
+
+
+class WebSocketServerProtocol(WebSocketProtocol):
+    """
+    Protocol base class for WebSocket servers.
+    """
+
+    CONFIG_ATTRS = WebSocketProtocol.CONFIG_ATTRS_COMMON + WebSocketProtocol.CONFIG_ATTRS_SERVER
+
     def onConnect(self, request):
         """
         Callback fired during WebSocket opening handshake when new WebSocket client
@@ -2716,6 +3860,24 @@ class WebSocketServerProtocol(WebSocketProtocol):
         if self.debug:
             self.factory._log("connection accepted from peer %s" % self.peer)
 
+        # admission control: the opening handshake might be deferred or rejected
+        #
+        self._admissionCall = None
+        self._admissionRetryAfter = None
+        self._handshakeInFlight = False
+
+        (delay, retryAfter) = self.factory.handshakeAdmission.admit(self.peer)
+        if delay is None:
+            if self.debug:
+                self.factory._log("rejecting connection from peer %s (retry after %d s)" % (self.peer, retryAfter))
+            self._admissionRetryAfter = retryAfter
+        else:
+            self._handshakeInFlight = True
+            if delay > 0:
+                if self.debug:
+                    self.factory._log("deferring opening handshake from peer %s for %s s" % (self.peer, delay))
+                self._admissionCall = self.factory._callLater(delay, self._onAdmission)
+
     def _connectionLost(self, reason):
         """
         Called by network framework when established transport connection from client
@@ -2728,6 +3890,27 @@ class WebSocketServerProtocol(WebSocketProtocol):
         if self.debug:
             self.factory._log("connection from %s lost" % self.peer)
 
+        if self._admissionCall is not None:
+            self._admissionCall.cancel()
+            self._admissionCall = None
+        self._releaseHandshake()
+
+    def _onAdmission(self):
+        """
+        Called when a deferred opening handshake may proceed.
+        """
+        self._admissionCall = None
+        if self.state == WebSocketProtocol.STATE_CONNECTING and len(self.data) > 0:
+            self.consumeData()
+
+    def _releaseHandshake(self):
+        """
+        Release the opening handshake slot taken from the factory's admission control.
+        """
+        if self._handshakeInFlight:
+            self._handshakeInFlight = False
+            self.factory.handshakeAdmission.release()
+
     def processProxyConnect(self):
         raise Exception("Autobahn isn't a proxy server")
 
@@ -2741,12 +3924,26 @@ class WebSocketServerProtocol(WebSocketProtocol):
         """
         Process WebSocket opening handshake request from client.
         """
+        # connections not admitted are rejected right away, and deferred ones wait,
+        # without looking at the request
+        #
+        if self._admissionRetryAfter is not None:
+            return self.failHandshake("server overloaded, retry later",
+                                      http.SERVICE_UNAVAILABLE[0],
+                                      [("Retry-After", str(self._admissionRetryAfter))])
+        if self._admissionCall is not None:
+            return
+
         # only proceed when we have fully received the HTTP request line and all headers
         #
-        end_of_header = self.data.find(b"\x0d\x0a\x0d\x0a")
+        end_of_header = self._findEndOfHeader()
+        reason = self._httpHeaderTooLarge(end_of_header)
+        if reason:
+            return self.failHandshake(reason, http.REQUEST_HEADER_FIELDS_TOO_LARGE[0])
+
         if end_of_header >= 0:
 
-            self.http_request_data = self.data[:end_of_header + 4]
+            self.http_request_data = self.data.peek(end_of_header + 4)
             if self.debug:
                 self.factory._log("received HTTP request:\n\n%s\n\n" % self.http_request_data)
 
@@ -2754,6 +3951,10 @@ class WebSocketServerProtocol(WebSocketProtocol):
             #
             (self.http_status_line, self.http_headers, http_headers_cnt) = parseHttpHeader(self.http_request_data)
 
+            reason = self._httpHeaderTooLarge(end_of_header, http_headers_cnt)
+            if reason:
+                return self.failHandshake(reason, http.REQUEST_HEADER_FIELDS_TOO_LARGE[0])
+
             # validate WebSocket opening handshake client request
             #
             if self.debug:
@@ -3017,16 +4218,16 @@ class WebSocketServerProtocol(WebSocketProtocol):
                 if len(self.data) < end_of_header + 4 + 8:
                     return
                 else:
-                    key3 = self.data[end_of_header + 4:end_of_header + 4 + 8]
+                    key3 = self.data.peek(end_of_header + 4 + 8)[end_of_header + 4:]
                     if self.debug:
                         self.factory._log("received HTTP request body containing key3 for Hixie-76: %s" % key3)
 
             # Ok, got complete HS input, remember rest (if any)
             #
             if self.websocket_version == 0:
-                self.data = self.data[end_of_header + 4 + 8:]
+                self.data.skip(end_of_header + 4 + 8)
             else:
-                self.data = self.data[end_of_header + 4:]
+                self.data.skip(end_of_header + 4)
 
             # store WS key
             #
@@ -3137,6 +4338,8 @@ class WebSocketServerProtocol(WebSocketProtocol):
             if accept is not None:
                 PMCE = PERMESSAGE_COMPRESSION_EXTENSION[accept.EXTENSION_NAME]
                 self._perMessageCompress = PMCE['PMCE'].createFromOfferAccept(self.factory.isServer, accept)
+                if isinstance(self._perMessageCompress, PerMessageDeflate):
+                    self._perMessageCompress.pool = self.factory.perMessageCompressionPool
                 self.websocket_extensions_in_use.append(self._perMessageCompress)
                 extensionResponse.append(accept.getExtensionString())
             else:
@@ -3145,35 +4348,10 @@ class WebSocketServerProtocol(WebSocketProtocol):
 
         # build response to complete WebSocket handshake
         #
-        response = "HTTP/1.1 %d Switching Protocols\x0d\x0a" % http.SWITCHING_PROTOCOLS[0]
-
-        if self.factory.server is not None and self.factory.server != "":
-            response += "Server: %s\x0d\x0a" % self.factory.server
-
-        response += "Upgrade: WebSocket\x0d\x0a"
-        response += "Connection: Upgrade\x0d\x0a"
-
-        # optional, user supplied additional HTTP headers
-        #
-        # headers from factory, headers from onConnect
-        for headers_source in (self.factory.headers.items(), headers.items()):
-            for uh in headers_source:
-                if isinstance(uh[1], six.string_types):
-                    header_values = [uh[1]]
-                else:
-                    try:
-                        header_values = iter(uh[1])
-                    except TypeError:
-                        header_values = [uh[1]]
-
-                for header_value in header_values:
-                    response += "%s: %s\x0d\x0a" % (uh[0], header_value)
-
-        if self.websocket_protocol_in_use is not None:
-            response += "Sec-WebSocket-Protocol: %s\x0d\x0a" % str(self.websocket_protocol_in_use)
-
         if self.websocket_version == 0:
 
+            response = self._buildHandshakeResponse(headers)
+
             if self.websocket_origin:
                 # browser client provide the header, and expect it to be echo'ed
                 response += "Sec-WebSocket-Origin: %s\x0d\x0a" % str(self.websocket_origin)
@@ -3220,15 +4398,11 @@ class WebSocketServerProtocol(WebSocketProtocol):
             sha1.update(key.encode('utf8') + WebSocketProtocol._WS_MAGIC)
             sec_websocket_accept = base64.b64encode(sha1.digest())
 
-            response += "Sec-WebSocket-Accept: %s\x0d\x0a" % sec_websocket_accept.decode()
-
-            # agreed extensions
+            # everything but the accept value only depends on the negotiated
+            # subprotocol, extensions and headers, and is taken from a template
             #
-            if len(extensionResponse) > 0:
-                response += "Sec-WebSocket-Extensions: %s\x0d\x0a" % ', '.join(extensionResponse)
-
-            # end of HTTP response headers
-            response += "\x0d\x0a"
+            (response_head, response_tail) = self._getHandshakeResponseTemplate(headers, extensionResponse)
+            response = response_head + sec_websocket_accept.decode() + response_tail
             response_body = None
 
         # send out opening handshake response
@@ -3249,6 +4423,7 @@ class WebSocketServerProtocol(WebSocketProtocol):
         # opening handshake completed, move WebSocket connection into OPEN state
         #
         self.state = WebSocketProtocol.STATE_OPEN
+        self._releaseHandshake()
 
         # cancel any opening HS timer if present
         #
@@ -3267,7 +4442,7 @@ class WebSocketServerProtocol(WebSocketProtocol):
         # automatic ping/pong
         #
         if self.autoPingInterval:
-            self.autoPingPendingCall = self.factory._callLater(self.autoPingInterval, self._sendAutoPing)
+            self.autoPingPendingCall = self.factory._scheduleTimer(self.autoPingInterval, self._sendAutoPing)
 
         # fire handler on derived class
         #
@@ -3280,6 +4455,105 @@ class WebSocketServerProtocol(WebSocketProtocol):
         if len(self.data) > 0:
             self.consumeData()
 
+    def _buildHandshakeResponse(self, headers):
+        """
+        Build the start of the HTTP response completing the opening handshake: status line,
+        server, upgrade and user supplied headers and the subprotocol in use.
+
+        :param headers: Additional HTTP headers returned from `onConnect`.
+        :type headers: dict
+
+        :returns: str -- The response built.
+        """
+        response = "HTTP/1.1 %d Switching Protocols\x0d\x0a" % http.SWITCHING_PROTOCOLS[0]
+
+        if self.factory.server is not None and self.factory.server != "":
+            response += "Server: %s\x0d\x0a" % self.factory.server
+
+        response += "Upgrade: WebSocket\x0d\x0a"
+        response += "Connection: Upgrade\x0d\x0a"
+
+        # optional, user supplied additional HTTP headers
+        #
+        # headers from factory, headers from onConnect
+        for headers_source in (self.factory.headers.items(), headers.items()):
+            for uh in headers_source:
+                for header_value in self._headerValues(uh[1]):
+                    response += "%s: %s\x0d\x0a" % (uh[0], header_value)
+
+        if self.websocket_protocol_in_use is not None:
+            response += "Sec-WebSocket-Protocol: %s\x0d\x0a" % str(self.websocket_protocol_in_use)
+
+        return response
+
+    @staticmethod
+    def _headerValues(value):
+        """
+        Get the list of values for a user supplied HTTP header, which might be given as
+        a single value or an iterable of values.
+        """
+        if isinstance(value, six.string_types):
+            return [value]
+        try:
+            return list(value)
+        except TypeError:
+            return [value]
+
+    def _getHandshakeResponseTemplate(self, headers, extensionResponse):
+        """
+        Get the HTTP response completing a Hybi opening handshake, split around the value
+        of the `Sec-WebSocket-Accept` header, which is the only part that differs between
+        connections negotiating the same subprotocol, extensions and additional headers.
+
+        Templates are cached on the factory.
+
+        :param headers: Additional HTTP headers returned from `onConnect`.
+        :type headers: dict
+        :param extensionResponse: Extension strings of the extensions accepted.
+        :type extensionResponse: list of str
+
+        :returns: tuple -- The response before and after the accept value.
+        """
+        factory = self.factory
+
+        # fast path: no subprotocol, extensions or headers from onConnect
+        #
+        if self.websocket_protocol_in_use is None and not extensionResponse and not headers:
+            if factory._handshakeResponseDefault is None:
+                factory._handshakeResponseDefault = self._buildHandshakeResponseTemplate(headers, extensionResponse)
+            return factory._handshakeResponseDefault
+
+        key = (self.websocket_protocol_in_use,
+               tuple(extensionResponse),
+               tuple([(name, tuple([str(v) for v in self._headerValues(value)])) for (name, value) in sorted(headers.items())]))
+
+        template = factory._handshakeResponseTemplates.get(key, None)
+        if template is None:
+            template = self._buildHandshakeResponseTemplate(headers, extensionResponse)
+            if len(factory._handshakeResponseTemplates) >= factory.MAX_HANDSHAKE_RESPONSE_TEMPLATES:
+                factory._handshakeResponseTemplates.clear()
+            factory._handshakeResponseTemplates[key] = template
+        return template
+
+    def _buildHandshakeResponseTemplate(self, headers, extensionResponse):
+        """
+        Build a template as returned by :meth:`_getHandshakeResponseTemplate`.
+        """
+        head = self._buildHandshakeResponse(headers)
+        head += "Sec-WebSocket-Accept: "
+
+        tail = "\x0d\x0a"
+
+        # agreed extensions
+        #
+        if len(extensionResponse) > 0:
+            tail += "Sec-WebSocket-Extensions: %s\x0d\x0a" % ', '.join(extensionResponse)
+
+        # end of HTTP response headers
+        tail += "\x0d\x0a"
+
+        return (head, tail)
+
     def failHandshake(self, reason, code=http.BAD_REQUEST[0], responseHeaders=None):
         """
         During opening handshake the client request was invalid, we send a HTTP
@@ -3386,6 +4660,11 @@ class WebSocketServerFactory(WebSocketFactory):
     isServer = True
     """
    Flag indicating if this factory is client- or server-side.
+   """
+
+    MAX_HANDSHAKE_RESPONSE_TEMPLATES = 64
+    """
+   Maximum number of opening handshake response templates cached.
    """
 
     def __init__(self,
@@ -3431,6 +4710,14 @@ class WebSocketServerFactory(WebSocketFactory):
         #
         self.setSessionParameters(url, protocols, server, headers, externalPort)
 
+        # memory budget for zlib contexts of permessage-deflate connections
+        #
+        self.perMessageCompressionPool = PerMessageDeflateContextPool()
+
+        # admission control (and counters) for opening handshakes
+        #
+        self.handshakeAdmission = HandshakeAdmission()
+
         # default WebSocket protocol options
         #
         self.resetProtocolOptions()
@@ -3439,6 +4726,39 @@ class WebSocketServerFactory(WebSocketFactory):
         #
         self.countConnections = 0
 
+        # broadcast groups by name
+        #
+        self.broadcastGroups = {}
+
+    def getBroadcastGroup(self, name, maxBufferSize=None):
+        """
+        Get a broadcast group, creating the group if it does not yet exist.
+
+        :param name: The name of the group.
+        :type name: str
+        :param maxBufferSize: When creating the group, skip members with more outgoing
+                              octets buffered on their transport than this (default: `None`
+                              for never skip).
+        :type maxBufferSize: int
+
+        :returns: obj -- An instance of :class:`autobahn.websocket.protocol.BroadcastGroup`.
+        """
+        if name not in self.broadcastGroups:
+            self.broadcastGroups[name] = BroadcastGroup(self, name, maxBufferSize)
+        return self.broadcastGroups[name]
+
+    def removeBroadcastGroup(self, name):
+        """
+        Remove a broadcast group and all its members.
+
+        :param name: The name of the group.
+        :type name: str
+        """
+        group = self.broadcastGroups.pop(name, None)
+        if group is not None:
+            for proto in list(group.members):
+                group.remove(proto)
+
     def setSessionParameters(self,
                              url=None,
                              protocols=None,
@@ -3484,6 +4804,12 @@ class WebSocketServerFactory(WebSocketFactory):
         else:
             self.externalPort = None
 
+        # opening handshake response templates, which depend on the
+        # server and headers set here
+        #
+        self._handshakeResponseDefault = None
+        self._handshakeResponseTemplates = {}
+
     def resetProtocolOptions(self):
         """
         Reset all WebSocket protocol options to defaults.
@@ -3497,6 +4823,8 @@ class WebSocketServerFactory(WebSocketFactory):
         self.applyMask = True
         self.maxFramePayloadSize = 0
         self.maxMessagePayloadSize = 0
+        self.maxHandshakeHeaderSize = 65536
+        self.maxHandshakeHeaderCount = 100
         self.autoFragmentSize = 0
         self.failByDrop = True
         self.echoCloseCodeReason = False
@@ -3508,9 +4836,19 @@ class WebSocketServerFactory(WebSocketFactory):
      <allow-access-from domain="*" to-ports="*" />
 </cross-domain-policy>\x00'''
 
+        # admission control of opening handshakes
+        #
+        self.handshakeAdmission.maxInFlight = 0
+        self.handshakeAdmission.rate = 0
+        self.handshakeAdmission.burst = 10
+        self.handshakeAdmission.perPeer = False
+        self.handshakeAdmission.maxDelay = 1
+
         # permessage-XXX extension
         #
         self.perMessageCompressionAccept = lambda _: None
+        self.perMessageCompressionPool.maxMemory = 0
+        self.perMessageCompressionPolicy = None
 
         # automatic ping/pong ("heartbeating")
         #
@@ -3518,6 +4856,24 @@ class WebSocketServerFactory(WebSocketFactory):
         self.autoPingTimeout = 0
         self.autoPingSize = 4
 
+        # shared timers for handshake timeouts and automatic ping/pong
+        #
+        self.timerWheelResolution = 0
+        self.timerWheel = None
+
+        # write side flow control
+        #
+        self.writeBufferHighWatermark = 0
+        self.writeBufferLowWatermark = 0
+        self.writeCoalesceDelay = 0
+        self.writeCoalesceSize = 0
+
+        # read side flow control
+        #
+        self.receiveQueueHighWatermark = 0
+        self.receiveQueueLowWatermark = 0
+        self.asyncReceiveQueueSize = 0
+
         # check WebSocket origin against this list
         self.allowedOrigins = ["*"]
         self.allowedOriginsPatterns = wildcards2patterns(self.allowedOrigins)
@@ -3532,6 +4888,8 @@ class WebSocketServerFactory(WebSocketFactory):
                            applyMask=None,
                            maxFramePayloadSize=None,
                            maxMessagePayloadSize=None,
+                           maxHandshakeHeaderSize=None,
+                           maxHandshakeHeaderCount=None,
                            autoFragmentSize=None,
                            failByDrop=None,
                            echoCloseCodeReason=None,
@@ -3539,12 +4897,27 @@ class WebSocketServerFactory(WebSocketFactory):
                            closeHandshakeTimeout=None,
                            tcpNoDelay=None,
                            perMessageCompressionAccept=None,
+                           perMessageCompressionMemoryLimit=None,
+                           perMessageCompressionPolicy=None,
                            autoPingInterval=None,
                            autoPingTimeout=None,
                            autoPingSize=None,
+                           timerWheelResolution=None,
+                           writeBufferHighWatermark=None,
+                           writeBufferLowWatermark=None,
+                           writeCoalesceDelay=None,
+                           writeCoalesceSize=None,
+                           receiveQueueHighWatermark=None,
+                           receiveQueueLowWatermark=None,
+                           asyncReceiveQueueSize=None,
                            serveFlashSocketPolicy=None,
                            flashSocketPolicy=None,
-                           allowedOrigins=None):
+                           allowedOrigins=None,
+                           maxOpenHandshakes=None,
+                           handshakeRateLimit=None,
+                           handshakeRateBurst=None,
+                           handshakeRateLimitPerPeer=None,
+                           handshakeMaxDelay=None):
         """
         Set WebSocket protocol options used as defaults for new protocol instances.
 
@@ -3566,6 +4939,12 @@ class WebSocketServerFactory(WebSocketFactory):
         :type maxFramePayloadSize: int or None
         :param maxMessagePayloadSize: Maximum message payload size (after reassembly of fragmented messages) that will be accepted when receiving or `0` for unlimited (default: `0`).
         :type maxMessagePayloadSize: int or None
+        :param maxHandshakeHeaderSize: Maximum size of the HTTP header (request or status line and headers) in the opening
+           handshake that will be accepted, or `0` for unlimited (default: `65536`).
+        :type maxHandshakeHeaderSize: int or None
+        :param maxHandshakeHeaderCount: Maximum number of HTTP headers in the opening handshake that will be accepted,
+           or `0` for unlimited (default: `100`).
+        :type maxHandshakeHeaderCount: int or None
         :param autoFragmentSize: Automatic fragmentation of outgoing data messages (when using the message-based API) into frames with payload length `<=` this size or `0` for no auto-fragmentation (default: `0`).
         :type autoFragmentSize: int or None
         :param failByDrop: Fail connections by dropping the TCP connection without performing closing handshake (default: `True`).
@@ -3580,6 +4959,15 @@ class WebSocketServerFactory(WebSocketFactory):
         :type tcpNoDelay: bool or None
         :param perMessageCompressionAccept: Acceptor function for offers.
         :type perMessageCompressionAccept: callable or None
+        :param perMessageCompressionMemoryLimit: Maximum (estimated) memory in octets for zlib contexts kept between
+           messages by all `permessage-deflate` connections of this factory, or `0` for unlimited. Beyond the limit,
+           outgoing messages are compressed without context takeover. (default: `0`).
+        :type perMessageCompressionMemoryLimit: int or None
+        :param perMessageCompressionPolicy: Policy deciding whether to compress an outgoing message, called with the
+           message payload, the binary flag and the :class:`autobahn.websocket.protocol.TrafficStats` of the connection.
+           Must return `True` to compress, e.g. :class:`autobahn.websocket.compress.AdaptivePerMessageCompressPolicy`.
+           Set to `None` to compress all messages. (default: `None`).
+        :type perMessageCompressionPolicy: callable or None
         :param autoPingInterval: Automatically send WebSocket pings every given seconds. When the peer does not respond
            in `autoPingTimeout`, drop the connection. Set to `0` to disable. (default: `0`).
         :type autoPingInterval: float or None
@@ -3588,6 +4976,36 @@ class WebSocketServerFactory(WebSocketFactory):
         :type autoPingTimeout: float or None
         :param autoPingSize: Payload size for automatic pings/pongs. Must be an integer from `[4, 125]`. (default: `4`).
         :type autoPingSize: int or None
+        :param timerWheelResolution: When non-zero, handshake timeouts and automatic ping/pong of all connections
+           are run from a timer wheel shared by the factory, in batches per tick of this many seconds. Timers then
+           run up to one tick late (default: `0` for a separate timer per connection and timeout).
+        :type timerWheelResolution: float or None
+        :param writeBufferHighWatermark: Pause writing (see `onWritePaused`) when the transport buffers more than this many
+           outgoing octets. Set to `0` to disable, in which case registered producers and `drain` still follow the
+           transport's own limits. Under Twisted, this sets the `bufferSize` of file descriptor based transports
+           (e.g. TCP), and other transports (e.g. TLS) pause at their own limits. (default: `0`).
+        :type writeBufferHighWatermark: int or None
+        :param writeBufferLowWatermark: Resume writing (see `onWriteResumed` and `drain`) when the transport buffers no more
+           than this many outgoing octets. Twisted transports resume once their buffer is empty. (default: `0`).
+        :type writeBufferLowWatermark: int or None
+        :param writeCoalesceDelay: Buffer outgoing frames for up to this many seconds and write them to the transport at
+           once, instead of writing each frame right away. Control frames, synched or chopped writes and :func:`flush`
+           write out buffered frames immediately. Set to `0` to disable. (default: `0`).
+        :type writeCoalesceDelay: float or None
+        :param writeCoalesceSize: When coalescing writes, write out buffered frames as soon as at least this many octets
+           are buffered. Set to `0` for no limit. (default: `0`).
+        :type writeCoalesceSize: int or None
+        :param receiveQueueHighWatermark: Pause reading from the transport while more than this many received messages are
+           still being processed by the application (e.g. by `onMessage` coroutines). Only honored by the asyncio adapter.
+           Set to `0` to disable. (default: `0`).
+        :type receiveQueueHighWatermark: int or None
+        :param receiveQueueLowWatermark: Resume reading when no more than this many received messages are still being
+           processed by the application. (default: `0`).
+        :type receiveQueueLowWatermark: int or None
+        :param asyncReceiveQueueSize: Queue incoming data and process it asynchronously (in a later event loop iteration)
+           instead of directly when received, pausing reading from the transport while this many chunks of data are
+           queued. Only honored by the asyncio adapter. Set to `0` to process incoming data directly. (default: `0`).
+        :type asyncReceiveQueueSize: int or None
         :param serveFlashSocketPolicy: Serve the Flash Socket Policy when we receive a policy file request on this protocol. (default: `False`).
         :type serveFlashSocketPolicy: bool or None
         :param flashSocketPolicy: The flash socket policy to be served when we are serving the Flash Socket Policy on this protocol
@@ -3595,6 +5013,18 @@ class WebSocketServerFactory(WebSocketFactory):
         :type flashSocketPolicy: str or None
         :param allowedOrigins: A list of allowed WebSocket origins (with '*' as a wildcard character).
         :type allowedOrigins: list or None
+        :param maxOpenHandshakes: Maximum number of opening handshakes in flight. Further connections are rejected
+           with HTTP status 503 (default: `0` for unlimited).
+        :type maxOpenHandshakes: int or None
+        :param handshakeRateLimit: Maximum rate of new connections per second (default: `0` for unlimited).
+        :type handshakeRateLimit: float or None
+        :param handshakeRateBurst: Number of new connections admitted in a burst above `handshakeRateLimit` (default: `10`).
+        :type handshakeRateBurst: int or None
+        :param handshakeRateLimitPerPeer: Apply `handshakeRateLimit` per peer address instead of to all peers together (default: `False`).
+        :type handshakeRateLimitPerPeer: bool or None
+        :param handshakeMaxDelay: Maximum time in seconds an opening handshake is deferred to comply with `handshakeRateLimit`.
+           Connections which would need to wait longer are rejected with HTTP status 503 (default: `1`).
+        :type handshakeMaxDelay: float or None
         """
         if allowHixie76 is not None and allowHixie76 != self.allowHixie76:
             self.allowHixie76 = allowHixie76
@@ -3629,6 +5059,14 @@ class WebSocketServerFactory(WebSocketFactory):
         if maxMessagePayloadSize is not None and maxMessagePayloadSize != self.maxMessagePayloadSize:
             self.maxMessagePayloadSize = maxMessagePayloadSize
 
+        if maxHandshakeHeaderSize is not None and maxHandshakeHeaderSize != self.maxHandshakeHeaderSize:
+            assert(type(maxHandshakeHeaderSize) in six.integer_types and maxHandshakeHeaderSize >= 0)
+            self.maxHandshakeHeaderSize = maxHandshakeHeaderSize
+
+        if maxHandshakeHeaderCount is not None and maxHandshakeHeaderCount != self.maxHandshakeHeaderCount:
+            assert(type(maxHandshakeHeaderCount) in six.integer_types and maxHandshakeHeaderCount >= 0)
+            self.maxHandshakeHeaderCount = maxHandshakeHeaderCount
+
         if autoFragmentSize is not None and autoFragmentSize != self.autoFragmentSize:
             self.autoFragmentSize = autoFragmentSize
 
@@ -3650,6 +5088,13 @@ class WebSocketServerFactory(WebSocketFactory):
         if perMessageCompressionAccept is not None and perMessageCompressionAccept != self.perMessageCompressionAccept:
             self.perMessageCompressionAccept = perMessageCompressionAccept
 
+        if perMessageCompressionMemoryLimit is not None and perMessageCompressionMemoryLimit != self.perMessageCompressionPool.maxMemory:
+            assert(type(perMessageCompressionMemoryLimit) in six.integer_types and perMessageCompressionMemoryLimit >= 0)
+            self.perMessageCompressionPool.maxMemory = perMessageCompressionMemoryLimit
+
+        if perMessageCompressionPolicy is not None and perMessageCompressionPolicy != self.perMessageCompressionPolicy:
+            self.perMessageCompressionPolicy = perMessageCompressionPolicy
+
         if autoPingInterval is not None and autoPingInterval != self.autoPingInterval:
             self.autoPingInterval = autoPingInterval
 
@@ -3661,6 +5106,43 @@ class WebSocketServerFactory(WebSocketFactory):
             assert(4 <= autoPingSize <= 125)
             self.autoPingSize = autoPingSize
 
+        if timerWheelResolution is not None and timerWheelResolution != self.timerWheelResolution:
+            assert(type(timerWheelResolution) == float or type(timerWheelResolution) in six.integer_types)
+            assert(timerWheelResolution >= 0)
+            self.timerWheelResolution = timerWheelResolution
+
+        if writeBufferHighWatermark is not None and writeBufferHighWatermark != self.writeBufferHighWatermark:
+            assert(type(writeBufferHighWatermark) in six.integer_types and writeBufferHighWatermark >= 0)
+            self.writeBufferHighWatermark = writeBufferHighWatermark
+
+        if writeBufferLowWatermark is not None and writeBufferLowWatermark != self.writeBufferLowWatermark:
+            assert(type(writeBufferLowWatermark) in six.integer_types and writeBufferLowWatermark >= 0)
+            self.writeBufferLowWatermark = writeBufferLowWatermark
+
+        # writing must not resume while the transport still buffers more than the high watermark
+        assert(self.writeBufferHighWatermark == 0 or self.writeBufferLowWatermark <= self.writeBufferHighWatermark)
+
+        if writeCoalesceDelay is not None and writeCoalesceDelay != self.writeCoalesceDelay:
+            assert(type(writeCoalesceDelay) == float or type(writeCoalesceDelay) in six.integer_types)
+            assert(writeCoalesceDelay >= 0)
+            self.writeCoalesceDelay = writeCoalesceDelay
+
+        if writeCoalesceSize is not None and writeCoalesceSize != self.writeCoalesceSize:
+            assert(type(writeCoalesceSize) in six.integer_types and writeCoalesceSize >= 0)
+            self.writeCoalesceSize = writeCoalesceSize
+
+        if receiveQueueHighWatermark is not None and receiveQueueHighWatermark != self.receiveQueueHighWatermark:
+            assert(type(receiveQueueHighWatermark) in six.integer_types and receiveQueueHighWatermark >= 0)
+            self.receiveQueueHighWatermark = receiveQueueHighWatermark
+
+        if receiveQueueLowWatermark is not None and receiveQueueLowWatermark != self.receiveQueueLowWatermark:
+            assert(type(receiveQueueLowWatermark) in six.integer_types and receiveQueueLowWatermark >= 0)
+            self.receiveQueueLowWatermark = receiveQueueLowWatermark
+
+        if asyncReceiveQueueSize is not None and asyncReceiveQueueSize != self.asyncReceiveQueueSize:
+            assert(type(asyncReceiveQueueSize) in six.integer_types and asyncReceiveQueueSize >= 0)
+            self.asyncReceiveQueueSize = asyncReceiveQueueSize
+
         if serveFlashSocketPolicy is not None and serveFlashSocketPolicy != self.serveFlashSocketPolicy:
             self.serveFlashSocketPolicy = serveFlashSocketPolicy
 
@@ -3671,6 +5153,27 @@ class WebSocketServerFactory(WebSocketFactory):
             self.allowedOrigins = allowedOrigins
             self.allowedOriginsPatterns = wildcards2patterns(self.allowedOrigins)
 
+        if maxOpenHandshakes is not None and maxOpenHandshakes != self.handshakeAdmission.maxInFlight:
+            assert(type(maxOpenHandshakes) in six.integer_types and maxOpenHandshakes >= 0)
+            self.handshakeAdmission.maxInFlight = maxOpenHandshakes
+
+        if handshakeRateLimit is not None and handshakeRateLimit != self.handshakeAdmission.rate:
+            assert(type(handshakeRateLimit) == float or type(handshakeRateLimit) in six.integer_types)
+            assert(handshakeRateLimit >= 0)
+            self.handshakeAdmission.rate = handshakeRateLimit
+
+        if handshakeRateBurst is not None and handshakeRateBurst != self.handshakeAdmission.burst:
+            assert(type(handshakeRateBurst) in six.integer_types and handshakeRateBurst >= 1)
+            self.handshakeAdmission.burst = handshakeRateBurst
+
+        if handshakeRateLimitPerPeer is not None and handshakeRateLimitPerPeer != self.handshakeAdmission.perPeer:
+            self.handshakeAdmission.perPeer = handshakeRateLimitPerPeer
+
+        if handshakeMaxDelay is not None and handshakeMaxDelay != self.handshakeAdmission.maxDelay:
+            assert(type(handshakeMaxDelay) == float or type(handshakeMaxDelay) in six.integer_types)
+            assert(handshakeMaxDelay >= 0)
+            self.handshakeAdmission.maxDelay = handshakeMaxDelay
+
     def getConnectionCount(self):
         """
         Get number of currently connected clients.
@@ -3748,10 +5251,14 @@ class WebSocketClientProtocol(WebSocketProtocol):
         """
         # only proceed when we have fully received the HTTP request line and all headers
         #
-        end_of_header = self.data.find(b"\x0d\x0a\x0d\x0a")
+        end_of_header = self._findEndOfHeader()
+        reason = self._httpHeaderTooLarge(end_of_header)
+        if reason:
+            return self.failProxyConnect(reason)
+
         if end_of_header >= 0:
 
-            http_response_data = self.data[:end_of_header + 4]
+            http_response_data = self.data.peek(end_of_header + 4)
             if self.debug:
                 self.factory._log("received HTTP response:\n\n%s\n\n" % http_response_data)
 
@@ -3759,6 +5266,10 @@ class WebSocketClientProtocol(WebSocketProtocol):
             #
             (http_status_line, http_headers, http_headers_cnt) = parseHttpHeader(http_response_data)
 
+            reason = self._httpHeaderTooLarge(end_of_header, http_headers_cnt)
+            if reason:
+                return self.failProxyConnect(reason)
+
             # validate proxy connect response
             #
             if self.debug:
@@ -3797,7 +5308,7 @@ class WebSocketClientProtocol(WebSocketProtocol):
 
             # Ok, got complete response for HTTP/CONNECT, remember rest (if any)
             #
-            self.data = self.data[end_of_header + 4:]
+            self.data.skip(end_of_header + 4)
 
             # opening handshake completed, move WebSocket connection into OPEN state
             #
@@ -3944,10 +5455,14 @@ class WebSocketClientProtocol(WebSocketProtocol):
         """
         # only proceed when we have fully received the HTTP request line and all headers
         #
-        end_of_header = self.data.find(b"\x0d\x0a\x0d\x0a")
+        end_of_header = self._findEndOfHeader()
+        reason = self._httpHeaderTooLarge(end_of_header)
+        if reason:
+            return self.failHandshake(reason)
+
         if end_of_header >= 0:
 
-            self.http_response_data = self.data[:end_of_header + 4]
+            self.http_response_data = self.data.peek(end_of_header + 4)
             if self.debug:
                 self.factory._log("received HTTP response:\n\n%s\n\n" % self.http_response_data)
 
@@ -3955,6 +5470,10 @@ class WebSocketClientProtocol(WebSocketProtocol):
             #
             (self.http_status_line, self.http_headers, http_headers_cnt) = parseHttpHeader(self.http_response_data)
 
+            reason = self._httpHeaderTooLarge(end_of_header, http_headers_cnt)
+            if reason:
+                return self.failHandshake(reason)
+
             # validate WebSocket opening handshake server response
             #
             if self.debug:
@@ -4074,6 +5593,8 @@ class WebSocketClientProtocol(WebSocketProtocol):
                             return self.failHandshake("WebSocket permessage-compress extension response from server denied by client")
 
                         self._perMessageCompress = PMCE['PMCE'].createFromResponseAccept(self.factory.isServer, accept)
+                        if isinstance(self._perMessageCompress, PerMessageDeflate):
+                            self._perMessageCompress.pool = self.factory.perMessageCompressionPool
 
                         self.websocket_extensions_in_use.append(self._perMessageCompress)
 
@@ -4101,16 +5622,16 @@ class WebSocketClientProtocol(WebSocketProtocol):
                 if len(self.data) < end_of_header + 4 + 16:
                     return
                 else:
-                    challenge_response = self.data[end_of_header + 4:end_of_header + 4 + 16]
+                    challenge_response = self.data.peek(end_of_header + 4 + 16)[end_of_header + 4:]
                     if challenge_response != self.websocket_expected_challenge_response:
                         return self.failHandshake("invalid challenge response received from server (Hixie-76)")
 
             # Ok, got complete HS input, remember rest (if any)
             #
             if self.version == 0:
-                self.data = self.data[end_of_header + 4 + 16:]
+                self.data.skip(end_of_header + 4 + 16)
             else:
-                self.data = self.data[end_of_header + 4:]
+                self.data.skip(end_of_header + 4)
 
             # opening handshake completed, move WebSocket connection into OPEN state
             #
@@ -4234,6 +5755,10 @@ class WebSocketClientFactory(WebSocketFactory):
         #
         self.setSessionParameters(url, origin, protocols, useragent, headers, proxy)
 
+        # memory budget for zlib contexts of permessage-deflate connections
+        #
+        self.perMessageCompressionPool = PerMessageDeflateContextPool()
+
         # default WebSocket protocol options
         #
         self.resetProtocolOptions()
@@ -4290,6 +5815,8 @@ class WebSocketClientFactory(WebSocketFactory):
         self.applyMask = True
         self.maxFramePayloadSize = 0
         self.maxMessagePayloadSize = 0
+        self.maxHandshakeHeaderSize = 65536
+        self.maxHandshakeHeaderCount = 100
         self.autoFragmentSize = 0
         self.failByDrop = True
         self.echoCloseCodeReason = False
@@ -4302,6 +5829,8 @@ class WebSocketClientFactory(WebSocketFactory):
         #
         self.perMessageCompressionOffers = []
         self.perMessageCompressionAccept = lambda _: None
+        self.perMessageCompressionPool.maxMemory = 0
+        self.perMessageCompressionPolicy = None
 
         # automatic ping/pong ("heartbeating")
         #
@@ -4309,6 +5838,24 @@ class WebSocketClientFactory(WebSocketFactory):
         self.autoPingTimeout = 0
         self.autoPingSize = 4
 
+        # shared timers for handshake timeouts and automatic ping/pong
+        #
+        self.timerWheelResolution = 0
+        self.timerWheel = None
+
+        # write side flow control
+        #
+        self.writeBufferHighWatermark = 0
+        self.writeBufferLowWatermark = 0
+        self.writeCoalesceDelay = 0
+        self.writeCoalesceSize = 0
+
+        # read side flow control
+        #
+        self.receiveQueueHighWatermark = 0
+        self.receiveQueueLowWatermark = 0
+        self.asyncReceiveQueueSize = 0
+
     def setProtocolOptions(self,
                            version=None,
                            allowHixie76=None,
@@ -4318,6 +5865,8 @@ class WebSocketClientFactory(WebSocketFactory):
                            applyMask=None,
                            maxFramePayloadSize=None,
                            maxMessagePayloadSize=None,
+                           maxHandshakeHeaderSize=None,
+                           maxHandshakeHeaderCount=None,
                            autoFragmentSize=None,
                            failByDrop=None,
                            echoCloseCodeReason=None,
@@ -4327,9 +5876,19 @@ class WebSocketClientFactory(WebSocketFactory):
                            tcpNoDelay=None,
                            perMessageCompressionOffers=None,
                            perMessageCompressionAccept=None,
+                           perMessageCompressionMemoryLimit=None,
+                           perMessageCompressionPolicy=None,
                            autoPingInterval=None,
                            autoPingTimeout=None,
-                           autoPingSize=None):
+                           autoPingSize=None,
+                           timerWheelResolution=None,
+                           writeBufferHighWatermark=None,
+                           writeBufferLowWatermark=None,
+                           writeCoalesceDelay=None,
+                           writeCoalesceSize=None,
+                           receiveQueueHighWatermark=None,
+                           receiveQueueLowWatermark=None,
+                           asyncReceiveQueueSize=None):
         """
         Set WebSocket protocol options used as defaults for _new_ protocol instances.
 
@@ -4346,6 +5905,12 @@ class WebSocketClientFactory(WebSocketFactory):
         :type maxFramePayloadSize: int
         :param maxMessagePayloadSize: Maximum message payload size (after reassembly of fragmented messages) that will be accepted when receiving or `0` for unlimited (default: `0`).
         :type maxMessagePayloadSize: int
+        :param maxHandshakeHeaderSize: Maximum size of the HTTP header (request or status line and headers) in the opening
+           handshake that will be accepted, or `0` for unlimited (default: `65536`).
+        :type maxHandshakeHeaderSize: int
+        :param maxHandshakeHeaderCount: Maximum number of HTTP headers in the opening handshake that will be accepted,
+           or `0` for unlimited (default: `100`).
+        :type maxHandshakeHeaderCount: int
         :param autoFragmentSize: Automatic fragmentation of outgoing data messages (when using the message-based API) into frames with payload length `<=` this size or `0` for no auto-fragmentation (default: `0`).
         :type autoFragmentSize: int
         :param failByDrop: Fail connections by dropping the TCP connection without performing closing handshake (default: `True`).
@@ -4364,6 +5929,15 @@ class WebSocketClientFactory(WebSocketFactory):
         :type perMessageCompressionOffers: list of instance of subclass of PerMessageCompressOffer
         :param perMessageCompressionAccept: Acceptor function for responses.
         :type perMessageCompressionAccept: callable
+        :param perMessageCompressionMemoryLimit: Maximum (estimated) memory in octets for zlib contexts kept between
+           messages by all `permessage-deflate` connections of this factory, or `0` for unlimited. Beyond the limit,
+           outgoing messages are compressed without context takeover. (default: `0`).
+        :type perMessageCompressionMemoryLimit: int
+        :param perMessageCompressionPolicy: Policy deciding whether to compress an outgoing message, called with the
+           message payload, the binary flag and the :class:`autobahn.websocket.protocol.TrafficStats` of the connection.
+           Must return `True` to compress, e.g. :class:`autobahn.websocket.compress.AdaptivePerMessageCompressPolicy`.
+           Set to `None` to compress all messages. (default: `None`).
+        :type perMessageCompressionPolicy: callable
         :param autoPingInterval: Automatically send WebSocket pings every given seconds. When the peer does not respond
            in `autoPingTimeout`, drop the connection. Set to `0` to disable. (default: `0`).
         :type autoPingInterval: float or None
@@ -4372,6 +5946,36 @@ class WebSocketClientFactory(WebSocketFactory):
         :type autoPingTimeout: float or None
         :param autoPingSize: Payload size for automatic pings/pongs. Must be an integer from `[4, 125]`. (default: `4`).
         :type autoPingSize: int
+        :param timerWheelResolution: When non-zero, handshake timeouts and automatic ping/pong of all connections
+           are run from a timer wheel shared by the factory, in batches per tick of this many seconds. Timers then
+           run up to one tick late (default: `0` for a separate timer per connection and timeout).
+        :type timerWheelResolution: float
+        :param writeBufferHighWatermark: Pause writing (see `onWritePaused`) when the transport buffers more than this many
+           outgoing octets. Set to `0` to disable, in which case registered producers and `drain` still follow the
+           transport's own limits. Under Twisted, this sets the `bufferSize` of file descriptor based transports
+           (e.g. TCP), and other transports (e.g. TLS) pause at their own limits. (default: `0`).
+        :type writeBufferHighWatermark: int
+        :param writeBufferLowWatermark: Resume writing (see `onWriteResumed` and `drain`) when the transport buffers no more
+           than this many outgoing octets. Twisted transports resume once their buffer is empty. (default: `0`).
+        :type writeBufferLowWatermark: int
+        :param writeCoalesceDelay: Buffer outgoing frames for up to this many seconds and write them to the transport at
+           once, instead of writing each frame right away. Control frames, synched or chopped writes and :func:`flush`
+           write out buffered frames immediately. Set to `0` to disable. (default: `0`).
+        :type writeCoalesceDelay: float
+        :param writeCoalesceSize: When coalescing writes, write out buffered frames as soon as at least this many octets
+           are buffered. Set to `0` for no limit. (default: `0`).
+        :type writeCoalesceSize: int
+        :param receiveQueueHighWatermark: Pause reading from the transport while more than this many received messages are
+           still being processed by the application (e.g. by `onMessage` coroutines). Only honored by the asyncio adapter.
+           Set to `0` to disable. (default: `0`).
+        :type receiveQueueHighWatermark: int
+        :param receiveQueueLowWatermark: Resume reading when no more than this many received messages are still being
+           processed by the application. (default: `0`).
+        :type receiveQueueLowWatermark: int
+        :param asyncReceiveQueueSize: Queue incoming data and process it asynchronously (in a later event loop iteration)
+           instead of directly when received, pausing reading from the transport while this many chunks of data are
+           queued. Only honored by the asyncio adapter. Set to `0` to process incoming data directly. (default: `0`).
+        :type asyncReceiveQueueSize: int
         """
         if allowHixie76 is not None and allowHixie76 != self.allowHixie76:
             self.allowHixie76 = allowHixie76
@@ -4402,6 +6006,14 @@ class WebSocketClientFactory(WebSocketFactory):
         if maxMessagePayloadSize is not None and maxMessagePayloadSize != self.maxMessagePayloadSize:
             self.maxMessagePayloadSize = maxMessagePayloadSize
 
+        if maxHandshakeHeaderSize is not None and maxHandshakeHeaderSize != self.maxHandshakeHeaderSize:
+            assert(type(maxHandshakeHeaderSize) in six.integer_types and maxHandshakeHeaderSize >= 0)
+            self.maxHandshakeHeaderSize = maxHandshakeHeaderSize
+
+        if maxHandshakeHeaderCount is not None and maxHandshakeHeaderCount != self.maxHandshakeHeaderCount:
+            assert(type(maxHandshakeHeaderCount) in six.integer_types and maxHandshakeHeaderCount >= 0)
+            self.maxHandshakeHeaderCount = maxHandshakeHeaderCount
+
         if autoFragmentSize is not None and autoFragmentSize != self.autoFragmentSize:
             self.autoFragmentSize = autoFragmentSize
 
@@ -4435,6 +6047,13 @@ class WebSocketClientFactory(WebSocketFactory):
         if perMessageCompressionAccept is not None and perMessageCompressionAccept != self.perMessageCompressionAccept:
             self.perMessageCompressionAccept = perMessageCompressionAccept
 
+        if perMessageCompressionMemoryLimit is not None and perMessageCompressionMemoryLimit != self.perMessageCompressionPool.maxMemory:
+            assert(type(perMessageCompressionMemoryLimit) in six.integer_types and perMessageCompressionMemoryLimit >= 0)
+            self.perMessageCompressionPool.maxMemory = perMessageCompressionMemoryLimit
+
+        if perMessageCompressionPolicy is not None and perMessageCompressionPolicy != self.perMessageCompressionPolicy:
+            self.perMessageCompressionPolicy = perMessageCompressionPolicy
+
         if autoPingInterval is not None and autoPingInterval != self.autoPingInterval:
             self.autoPingInterval = autoPingInterval
 
@@ -4445,3 +6064,40 @@ class WebSocketClientFactory(WebSocketFactory):
             assert(type(autoPingSize) == float or type(autoPingSize) in six.integer_types)
             assert(4 <= autoPingSize <= 125)
             self.autoPingSize = autoPingSize
+
+        if timerWheelResolution is not None and timerWheelResolution != self.timerWheelResolution:
+            assert(type(timerWheelResolution) == float or type(timerWheelResolution) in six.integer_types)
+            assert(timerWheelResolution >= 0)
+            self.timerWheelResolution = timerWheelResolution
+
+        if writeBufferHighWatermark is not None and writeBufferHighWatermark != self.writeBufferHighWatermark:
+            assert(type(writeBufferHighWatermark) in six.integer_types and writeBufferHighWatermark >= 0)
+            self.writeBufferHighWatermark = writeBufferHighWatermark
+
+        if writeBufferLowWatermark is not None and writeBufferLowWatermark != self.writeBufferLowWatermark:
+            assert(type(writeBufferLowWatermark) in six.integer_types and writeBufferLowWatermark >= 0)
+            self.writeBufferLowWatermark = writeBufferLowWatermark
+
+        # writing must not resume while the transport still buffers more than the high watermark
+        assert(self.writeBufferHighWatermark == 0 or self.writeBufferLowWatermark <= self.writeBufferHighWatermark)
+
+        if writeCoalesceDelay is not None and writeCoalesceDelay != self.writeCoalesceDelay:
+            assert(type(writeCoalesceDelay) == float or type(writeCoalesceDelay) in six.integer_types)
+            assert(writeCoalesceDelay >= 0)
+            self.writeCoalesceDelay = writeCoalesceDelay
+
+        if writeCoalesceSize is not None and writeCoalesceSize != self.writeCoalesceSize:
+            assert(type(writeCoalesceSize) in six.integer_types and writeCoalesceSize >= 0)
+            self.writeCoalesceSize = writeCoalesceSize
+
+        if receiveQueueHighWatermark is not None and receiveQueueHighWatermark != self.receiveQueueHighWatermark:
+            assert(type(receiveQueueHighWatermark) in six.integer_types and receiveQueueHighWatermark >= 0)
+            self.receiveQueueHighWatermark = receiveQueueHighWatermark
+
+        if receiveQueueLowWatermark is not None and receiveQueueLowWatermark != self.receiveQueueLowWatermark:
+            assert(type(receiveQueueLowWatermark) in six.integer_types and receiveQueueLowWatermark >= 0)
+            self.receiveQueueLowWatermark = receiveQueueLowWatermark
+
+        if asyncReceiveQueueSize is not None and asyncReceiveQueueSize != self.asyncReceiveQueueSize:
+            assert(type(asyncReceiveQueueSize) in six.integer_types and asyncReceiveQueueSize >= 0)
+            self.asyncReceiveQueueSize = asyncReceiveQueueSize
@@ -0,0 +1,96 @@
+###############################################################################
+#
+# The MIT License (MIT)
+#
+# Copyright (c) Tavendo GmbH
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+###############################################################################
+
+from __future__ import absolute_import
+
+# from twisted.trial import unittest
+import unittest
+
+from autobahn.websocket.protocol import ReceiveBuffer
+
+
+class TestReceiveBuffer(unittest.TestCase):
+
+    def _buffer(self, *chunks):
+        buf = ReceiveBuffer()
+        for chunk in chunks:
+            buf.append(chunk)
+        return buf
+
+    def test_append(self):
+        buf = self._buffer(b"abc", b"", b"defg")
+        self.assertEqual(len(buf), 7)
+        self.assertEqual(buf.peek(100), b"abcdefg")
+        self.assertEqual(len(buf), 7)
+
+    def test_read_whole_chunk_zero_copy(self):
+        chunk = b"x" * 1000
+        buf = self._buffer(chunk, b"y")
+        self.assertTrue(buf.read(1000) is chunk)
+        self.assertEqual(len(buf), 1)
+
+    def test_read_across_chunks(self):
+        buf = self._buffer(b"ab", b"cd", b"ef")
+        self.assertEqual(buf.read(1), b"a")
+        self.assertEqual(buf.read(4), b"bcde")
+        self.assertEqual(buf.read(10), b"f")
+        self.assertEqual(len(buf), 0)
+        self.assertEqual(buf.read(1), b"")
+
+    def test_skip(self):
+        buf = self._buffer(b"ab", b"cd", b"ef")
+        buf.skip(3)
+        self.assertEqual(buf.peek(2), b"de")
+        buf.skip(10)
+        self.assertEqual(len(buf), 0)
+
+    def test_find(self):
+        buf = self._buffer(b"GET / HTTP/1.1\r", b"\n", b"\r", b"\nrest")
+        self.assertEqual(buf.find(b"\r\n\r\n"), 14)
+        self.assertEqual(buf.find(b"rest"), 18)
+        self.assertEqual(buf.find(b"missing"), -1)
+        buf.skip(2)
+        self.assertEqual(buf.find(b"\r\n\r\n"), 12)
+        self.assertEqual(buf.read(12), b"T / HTTP/1.1")
+        self.assertEqual(buf.read(100), b"\r\n\r\nrest")
+
+    def test_find_keeps_chunks(self):
+        buf = self._buffer(b"ab", b"cd")
+        buf.skip(1)
+        self.assertEqual(buf.find(b"x"), -1)
+        buf.append(b"ef")
+        self.assertEqual(buf.find(b"de"), 2)
+        self.assertEqual(buf.find(b"bc"), 0)
+        self.assertEqual(buf.find(b"de", 3), -1)
+        self.assertEqual(buf.find(b"f", 4), 4)
+        self.assertEqual(len(buf._chunks), 3)
+        self.assertEqual(buf.read(5), b"bcdef")
+
+    def test_find_start(self):
+        buf = self._buffer(b"a\xff", b"b", b"\xffc")
+        self.assertEqual(buf.find(b"\xff"), 1)
+        self.assertEqual(buf.find(b"\xff", 2), 3)
+        self.assertEqual(buf.find(b"\xff", 4), -1)
@@ -0,0 +1,311 @@
+###############################################################################
+#
+# The MIT License (MIT)
+#
+# Copyright (c) Tavendo GmbH
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+###############################################################################
+
+from __future__ import absolute_import
+
+# from twisted.trial import unittest
+import sys
+import unittest
+
+import zlib
+
+from autobahn.websocket.compress import PerMessageDeflate, PerMessageDeflateContextPool, \
+    PerMessageDeflateOffer, PerMessageDeflateResponse, PerMessageDeflateResponseAccept, \
+    AdaptivePerMessageCompressPolicy, PERMESSAGE_COMPRESSION_EXTENSION
+from autobahn.websocket.protocol import TrafficStats, WebSocketServerProtocol
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+else:
+    from autobahn.websocket.compress import PerMessageZstdOffer, \
+        PerMessageZstdResponse, PerMessageZstdResponseAccept, PerMessageZstd
+
+
+def compress(pmce, payload):
+    pmce.startCompressMessage()
+    return pmce.compressMessageData(payload) + pmce.endCompressMessage()
+
+
+def negotiate(offer, serverDictionaries, **kwargs):
+    """
+    Run an offer through negotiation (including extension header parsing) and
+    return the client and server PMCE.
+    """
+    parse = WebSocketServerProtocol()._parseExtensionsHeader
+    PMCE = PERMESSAGE_COMPRESSION_EXTENSION[offer.EXTENSION_NAME]
+
+    # client -> server
+    [(_, params)] = parse(offer.getExtensionString())
+    offerAccept = PMCE['OfferAccept'](PMCE['Offer'].parse(params), dictionaries=serverDictionaries, **kwargs)
+    server = PMCE['PMCE'].createFromOfferAccept(True, offerAccept)
+
+    # server -> client
+    [(_, params)] = parse(offerAccept.getExtensionString())
+    responseAccept = PMCE['ResponseAccept'](PMCE['Response'].parse(params), dictionaries=[offer.dictionary])
+    client = PMCE['PMCE'].createFromResponseAccept(False, responseAccept)
+
+    return client, server
+
+
+def roundtrip(sender, receiver, payload):
+    data = compress(sender, payload)
+    receiver.startDecompressMessage()
+    result = receiver.decompressMessageData(data)
+    receiver.endDecompressMessage()
+    return result, len(data)
+
+
+class TestPerMessageDeflateContextPool(unittest.TestCase):
+
+    def test_budget(self):
+        size = PerMessageDeflateContextPool.compressorMemory(15, 8)
+        pool = PerMessageDeflateContextPool(maxMemory=size)
+
+        pmces = []
+        for _ in range(2):
+            pmce = PerMessageDeflate(True, False, False, 15, 15, 8)
+            pmce.pool = pool
+            pmces.append(pmce)
+
+        # peer decompressor keeps its context between messages
+        peer = zlib.decompressobj(-15)
+        for i in range(3):
+            payload = b'message %d ' % i * 10
+            for pmce in pmces:
+                data = compress(pmce, payload)
+                if pmce is pmces[1]:
+                    self.assertEqual(peer.decompress(data + b'\x00\x00\xff\xff'), payload)
+
+        # first connection keeps its compressor, second one is over budget
+        self.assertTrue(pmces[0]._compressor is not None)
+        self.assertTrue(pmces[1]._compressor is None)
+        self.assertEqual(pool.memory, size)
+        self.assertEqual(pool.hits, 1)
+        self.assertEqual(pool.misses, 3)
+
+        pmces[0].close()
+        self.assertEqual(pool.memory, 0)
+        self.assertEqual(pool.peakMemory, size)
+
+    def test_no_context_takeover(self):
+        pool = PerMessageDeflateContextPool()
+        pmce = PerMessageDeflate(True, True, True, 15, 15, 8)
+        pmce.pool = pool
+
+        compress(pmce, b'hello')
+        self.assertTrue(pmce._compressor is None)
+
+        pmce.startDecompressMessage()
+        pmce.decompressMessageData(compress(PerMessageDeflate(False, True, True, 15, 15, 8), b'hello'))
+        pmce.endDecompressMessage()
+        self.assertTrue(pmce._decompressor is None)
+
+        self.assertEqual(pool.memory, 0)
+        self.assertEqual(pool.hits + pool.misses, 0)
+
+    def test_decompressor_context_takeover(self):
+        pool = PerMessageDeflateContextPool(maxMemory=1)
+        pmce = PerMessageDeflate(True, False, False, 15, 10, 8)
+        pmce.pool = pool
+        pmce.startDecompressMessage()
+        pmce.endDecompressMessage()
+        self.assertEqual(pool.memory, PerMessageDeflateContextPool.decompressorMemory(10))
+        pmce.close()
+        self.assertEqual(pool.memory, 0)
+
+
+class TestAdaptivePerMessageCompressPolicy(unittest.TestCase):
+
+    def test_min_size(self):
+        policy = AdaptivePerMessageCompressPolicy(minSize=100)
+        stats = TrafficStats()
+        self.assertFalse(policy(b'x' * 99, False, stats))
+        self.assertTrue(policy(b'x' * 100, False, stats))
+
+    def test_ratio(self):
+        policy = AdaptivePerMessageCompressPolicy(minSize=0, maxRatio=0.9, probeInterval=4)
+        stats = TrafficStats()
+        stats.outgoingWebSocketMessages = 1
+        stats.trackCompression(True, 1000, 1010)
+        self.assertFalse(policy(b'x', True, stats))
+        self.assertTrue(policy(b'x', False, stats))
+
+        # probe every 4th message
+        stats.outgoingWebSocketMessages = 4
+        self.assertTrue(policy(b'x', True, stats))
+
+    def test_cpu_budget(self):
+        policy = AdaptivePerMessageCompressPolicy(minSize=0, maxTimePerOctet=1e-6, probeInterval=0)
+        stats = TrafficStats()
+        stats.trackCompression(False, 1000, 100, 0.0001)
+        self.assertTrue(policy(b'x', False, stats))
+        stats.trackCompression(False, 1000, 100, 0.1)
+        self.assertFalse(policy(b'x', False, stats))
+        self.assertAlmostEqual(stats.outgoingCompressionTime, 0.1001)
+
+
+@unittest.skipIf(sys.version_info < (3, 3), "zlib preset dictionaries require Python 3.3")
+class TestPerMessageDeflateDictionary(unittest.TestCase):
+
+    def setUp(self):
+        self.dictionary = b'{"topic": "com.example.event", "args": [], "kwargs": {"n": 0}, "publisher": null}'
+        self.payload = b'{"topic": "com.example.event", "args": [23, "hello"], "kwargs": {"n": 42}}'
+
+    def test_dictionary(self):
+        offer = PerMessageDeflateOffer(dictionary=self.dictionary)
+        self.assertTrue("dictionary_id=%d" % zlib.adler32(self.dictionary) in offer.getExtensionString())
+        self.assertEqual(offer.dictionaryId, offer.getDictionaryId(self.dictionary))
+
+        client, server = negotiate(offer, [b'other', self.dictionary], requestNoContextTakeover=True)
+        self.assertEqual(client.dictionary, self.dictionary)
+        self.assertEqual(server.dictionary, self.dictionary)
+
+        # without context takeover, the dictionary still applies to every message
+        plain = len(compress(PerMessageDeflate(False, True, True, 15, 15, 8), self.payload))
+        for _ in range(3):
+            result, length = roundtrip(client, server, self.payload)
+            self.assertEqual(result, self.payload)
+            self.assertTrue(length < plain / 2)
+            result, length = roundtrip(server, client, self.payload)
+            self.assertEqual(result, self.payload)
+
+    def test_compress_context_key(self):
+        key = PerMessageDeflate(True, True, False, 15, 15, 8, self.dictionary).compressContextKey()
+        self.assertEqual(key, PerMessageDeflate(True, True, False, 15, 15, 8, bytes(bytearray(self.dictionary))).compressContextKey())
+        self.assertTrue(zlib.adler32(self.dictionary) in key)
+        self.assertFalse(self.dictionary in key)
+        self.assertNotEqual(key, PerMessageDeflate(True, True, False, 15, 15, 8).compressContextKey())
+
+    def test_unknown_dictionary(self):
+        client, server = negotiate(PerMessageDeflateOffer(dictionary=self.dictionary), [b'other'])
+        self.assertTrue(client.dictionary is None)
+        self.assertTrue(server.dictionary is None)
+        self.assertEqual(roundtrip(client, server, self.payload)[0], self.payload)
+
+    def test_response_unknown_dictionary(self):
+        response = PerMessageDeflateResponse(0, False, 0, False, zlib.adler32(self.dictionary))
+        self.assertRaises(Exception, PerMessageDeflateResponseAccept, response, dictionaries=[b'other'])
+
+    def test_illegal_dictionary_id(self):
+        self.assertRaises(Exception, PerMessageDeflateOffer.parse, {'dictionary_id': ['foo']})
+        self.assertRaises(Exception, PerMessageDeflateOffer.parse, {'dictionary_id': [True]})
+        self.assertRaises(Exception, PerMessageDeflateOffer.parse, {'dictionary_id': ['4294967296']})
+
+
+@unittest.skipIf(zstandard is None, "zstandard not installed")
+class TestPerMessageZstd(unittest.TestCase):
+
+    def setUp(self):
+        samples = [('{"topic": "com.example.event", "args": [%d, "hello"], "kwargs": {"n": %d}}' % (i, i)).encode('utf8')
+                   for i in range(1000)]
+        self.samples = samples
+        self.dictionary = zstandard.train_dictionary(2048, samples).as_bytes()
+
+    def roundtrip(self, sender, receiver, payload):
+        result, length = roundtrip(sender, receiver, payload)
+        self.assertEqual(result, payload)
+        return length
+
+    def test_dictionary(self):
+        offer = PerMessageZstdOffer(acceptNoContextTakeover=True, dictionary=self.dictionary)
+        self.assertTrue("dictionary_id=%d" % PerMessageZstd.getDictionaryId(self.dictionary) in offer.getExtensionString())
+        self.assertEqual(offer.dictionaryId, offer.getDictionaryId(self.dictionary))
+
+        client, server = negotiate(offer, [self.dictionary], requestNoContextTakeover=True)
+        self.assertEqual(client.dictionary, self.dictionary)
+        self.assertEqual(server.dictionary, self.dictionary)
+        self.assertTrue(server.client_no_context_takeover)
+
+        for payload in self.samples[:5]:
+            self.assertTrue(self.roundtrip(client, server, payload) < len(payload) / 2)
+            self.roundtrip(server, client, payload)
+
+    def test_unknown_dictionary(self):
+        offer = PerMessageZstdOffer(dictionary=self.dictionary)
+        client, server = negotiate(offer, [])
+        self.assertTrue(client.dictionary is None)
+        self.assertTrue(server.dictionary is None)
+        for payload in self.samples[:5]:
+            self.roundtrip(client, server, payload)
+            self.roundtrip(server, client, payload)
+
+    def test_response_unknown_dictionary(self):
+        response = PerMessageZstdResponse(False, False, PerMessageZstd.getDictionaryId(self.dictionary))
+        self.assertRaises(Exception, PerMessageZstdResponseAccept, response, dictionaries=[])
+
+    def test_illegal_dictionary_id(self):
+        self.assertRaises(Exception, PerMessageZstdOffer.parse, {'dictionary_id': ['foo']})
+        self.assertRaises(Exception, PerMessageZstdOffer.parse, {'dictionary_id': [True]})
+
+    def test_decompress_bounded(self):
+        client, server = negotiate(PerMessageZstdOffer(), [])
+        data = compress(client, b'\x00' * 20000000)
+        self.assertTrue(len(data) < 10000)
+
+        server.startDecompressMessage()
+        length = 0
+        chunk = server.decompressMessageData(data, 65536)
+        while chunk:
+            self.assertTrue(len(chunk) <= 65536)
+
+            # decompressed output not yet returned stays bounded, too
+            self.assertTrue(len(server._pending) <= 65536 + 33 * 131072)
+
+            length += len(chunk)
+            chunk = server.decompressMessageData(b'', 65536)
+        server.endDecompressMessage()
+        self.assertEqual(length, 20000000)
+
+        # the context is taken over to the next message
+        self.assertEqual(roundtrip(client, server, b'hello')[0], b'hello')
+
+    def test_decompress_split(self):
+        for requestNoContextTakeover in [False, True]:
+            client, server = negotiate(PerMessageZstdOffer(acceptNoContextTakeover=True), [],
+                                       requestNoContextTakeover=requestNoContextTakeover)
+            for payload in self.samples[:3]:
+                data = compress(client, payload)
+                server.startDecompressMessage()
+                result = server.decompressMessageData(data[:len(data) // 2])
+                result += server.decompressMessageData(data[len(data) // 2:])
+                server.endDecompressMessage()
+                self.assertEqual(result, payload)
+
+    def test_decompress_unbounded_drain(self):
+        for requestNoContextTakeover in [False, True]:
+            client, server = negotiate(PerMessageZstdOffer(acceptNoContextTakeover=True), [],
+                                       requestNoContextTakeover=requestNoContextTakeover)
+            for payload in self.samples[:3]:
+                server.startDecompressMessage()
+                self.assertEqual(server.decompressMessageData(compress(client, payload)), payload)
+                self.assertEqual(server.decompressMessageData(b''), b'')
+                server.endDecompressMessage()
+
+
+if __name__ == '__main__':
+    unittest.main()
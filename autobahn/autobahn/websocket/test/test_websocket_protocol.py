@@ -0,0 +1,803 @@
+###############################################################################
+#
+# The MIT License (MIT)
+#
+# Copyright (c) Tavendo GmbH
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+###############################################################################
+
+from __future__ import absolute_import
+
+# from twisted.trial import unittest
+import os
+import struct
+import unittest
+import zlib
+
+from autobahn.websocket import http
+from autobahn.websocket import protocol
+from autobahn.websocket.compress import PerMessageDeflate, AdaptivePerMessageCompressPolicy
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+else:
+    from autobahn.websocket.compress import PerMessageZstd
+
+
+class FakeTransport:
+
+    def __init__(self):
+        self.written = []
+        self.writes = 0
+        self.buffered = 0
+
+    def write(self, data):
+        self.written.append(data)
+        self.writes += 1
+
+    def writeSequence(self, data):
+        self.written.extend(data)
+        self.writes += 1
+
+    def loseConnection(self):
+        pass
+
+    def value(self):
+        return b''.join(self.written)
+
+
+class FakeFuture:
+
+    def __init__(self):
+        self.done = False
+        self.result = None
+
+
+class FakeDelayedCall:
+
+    def __init__(self, calls, fun, delay):
+        self.calls = calls
+        self.fun = fun
+        self.delay = delay
+
+    def cancel(self):
+        self.calls.remove(self)
+
+
+class FakeFactory(protocol.WebSocketServerFactory):
+
+    def __init__(self, *args, **kwargs):
+        protocol.WebSocketServerFactory.__init__(self, *args, **kwargs)
+        self.calls = []
+
+    def _log(self, msg):
+        pass
+
+    def _callLater(self, delay, fun):
+        call = FakeDelayedCall(self.calls, fun, delay)
+        self.calls.append(call)
+        return call
+
+    def runCalls(self):
+        calls, self.calls = self.calls, []
+        for call in calls:
+            call.fun()
+
+
+class FakeProtocol(protocol.WebSocketServerProtocol):
+
+    def _onConnect(self, request):
+        try:
+            res = self.onConnect(request)
+        except http.HttpException as e:
+            self.failHandshake(e.reason, e.code)
+        else:
+            self.succeedHandshake(res)
+
+    def _writeSequence(self, data):
+        self.transport.writeSequence(data)
+
+    def _getWriteBufferSize(self):
+        return self.transport.buffered
+
+    def _onOpen(self):
+        self.onOpen()
+
+    def _onMessageBegin(self, isBinary):
+        self.onMessageBegin(isBinary)
+
+    def _onMessageFrameBegin(self, length):
+        self.onMessageFrameBegin(length)
+
+    def _onMessageFrameData(self, payload):
+        self.onMessageFrameData(payload)
+
+    def _onMessageFrameEnd(self):
+        self.onMessageFrameEnd()
+
+    def _onMessageFrame(self, payload):
+        self.onMessageFrame(payload)
+
+    def _onMessageEnd(self):
+        self.onMessageEnd()
+
+    def _onMessage(self, payload, isBinary):
+        self.onMessage(payload, isBinary)
+
+    def _onPing(self, payload):
+        self.onPing(payload)
+
+    def _onPong(self, payload):
+        self.onPong(payload)
+
+    def _onClose(self, wasClean, code, reason):
+        pass
+
+    def _onWritePaused(self):
+        self.events.append('paused')
+
+    def _onWriteResumed(self):
+        self.events.append('resumed')
+
+    @staticmethod
+    def _create_future():
+        return FakeFuture()
+
+    @staticmethod
+    def _resolve_future(future, value):
+        future.done = True
+        future.result = value
+
+    def _closeConnection(self, abort=False):
+        self.transport.loseConnection()
+
+
+def create_protocol(factory=None):
+    proto = FakeProtocol()
+    proto.events = []
+    proto.factory = factory or FakeFactory()
+    proto.transport = FakeTransport()
+    proto.peer = 'tcp:127.0.0.1:12345'
+    proto.openHandshakeTimeout = 0
+    proto._connectionMade()
+    proto.state = protocol.WebSocketProtocol.STATE_OPEN
+    proto.websocket_version = 13
+    proto.inside_message = False
+    proto.current_frame = None
+    proto.transport.written = []
+    proto.transport.writes = 0
+    return proto
+
+
+def create_connecting_protocol(factory=None, protocolClass=None):
+    proto = (protocolClass or FakeProtocol)()
+    proto.factory = factory or FakeFactory()
+    proto.transport = FakeTransport()
+    proto.peer = 'tcp:127.0.0.1:12345'
+    proto._connectionMade()
+    return proto
+
+
+def handshake_request(key=b'dGhlIHNhbXBsZSBub25jZQ==', extraHeaders=b''):
+    return (b'GET / HTTP/1.1\r\n'
+            b'Host: localhost\r\n'
+            b'Upgrade: websocket\r\n'
+            b'Connection: Upgrade\r\n'
+            b'Sec-WebSocket-Key: ' + key + b'\r\n'
+            b'Sec-WebSocket-Version: 13\r\n' +
+            extraHeaders +
+            b'\r\n')
+
+
+class TestFrameWrites(unittest.TestCase):
+
+    def test_send_message(self):
+        proto = create_protocol()
+        payload = b'\x01' * 70000
+        proto.sendMessage(payload, isBinary=True)
+        self.assertEqual(proto.transport.writes, 1)
+        self.assertEqual(proto.transport.written[0], b'\x82\x7f' + b'\x00\x00\x00\x00\x00\x01\x11\x70')
+        self.assertTrue(proto.transport.written[1] is payload)
+        self.assertEqual(proto.trafficStats.outgoingOctetsWireLevel, 70010)
+
+    def test_send_empty_message(self):
+        proto = create_protocol()
+        proto.sendMessage(b'')
+        self.assertEqual(proto.transport.value(), b'\x81\x00')
+        self.assertEqual(proto.trafficStats.outgoingOctetsWireLevel, 2)
+
+    def test_send_message_sync(self):
+        proto = create_protocol()
+        proto.sendMessage(b'hello', isBinary=True, sync=True)
+        self.assertEqual(proto.transport.value(), b'\x82\x05hello')
+        self.assertEqual(proto.trafficStats.outgoingOctetsWireLevel, 7)
+
+    def test_send_prepared_message(self):
+        proto = create_protocol()
+        msg = proto.factory.prepareMessage(b'hello')
+        self.assertEqual(msg.payloadHybi, b'\x81\x05hello')
+        proto.sendPreparedMessage(msg)
+        self.assertEqual(proto.transport.writes, 1)
+        self.assertEqual(proto.transport.value(), b'\x81\x05hello')
+        self.assertEqual(proto.trafficStats.outgoingOctetsWireLevel, 7)
+
+    def test_send_prepared_message_compressed(self):
+        payload = b'tick ' * 100
+        factory = FakeFactory()
+        msg = factory.prepareMessage(payload)
+        protos = []
+        for noContextTakeover in [True, True, False]:
+            proto = create_protocol(factory)
+            proto._perMessageCompress = PerMessageDeflate(True, noContextTakeover, False, 15, 0, 0)
+            proto.sendPreparedMessage(msg)
+            protos.append(proto)
+        self.assertEqual(len(msg.compressedHybi), 1)
+        self.assertTrue(protos[0].transport.written[1] is protos[1].transport.written[1])
+        for proto in protos:
+            data = proto.transport.value()
+            self.assertEqual(data[0:1], b'\xc1')
+            self.assertEqual(zlib.decompressobj(-15).decompress(data[2:] + b'\x00\x00\xff\xff'), payload)
+
+
+def compressed_frame(payload, pmce=None):
+    if pmce is None:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        data = (compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH))[:-4]
+    else:
+        pmce.startCompressMessage()
+        data = pmce.compressMessageData(payload) + pmce.endCompressMessage()
+    mask = b'\x01\x02\x03\x04'
+    masked = bytearray(data)
+    for i in range(len(masked)):
+        masked[i] ^= bytearray(mask)[i % 4]
+    if len(data) < 126:
+        header = struct.pack('!BB', 0xc2, 0x80 | len(data))
+    elif len(data) < 65536:
+        header = struct.pack('!BBH', 0xc2, 0x80 | 126, len(data))
+    else:
+        header = struct.pack('!BBQ', 0xc2, 0x80 | 127, len(data))
+    return header + mask + bytes(masked)
+
+
+def create_deflate_protocol(**options):
+    factory = FakeFactory()
+    factory.setProtocolOptions(**options)
+    proto = create_protocol(factory)
+    proto._perMessageCompress = PerMessageDeflate(True, False, False, 15, 15, 8)
+    return proto
+
+
+class TestDecompression(unittest.TestCase):
+
+    def test_message(self):
+        proto = create_deflate_protocol(maxMessagePayloadSize=1000000)
+        received = []
+        proto.onMessage = lambda payload, isBinary: received.append(payload)
+        proto._dataReceived(compressed_frame(b'\x00' * 500000))
+        self.assertEqual(received, [b'\x00' * 500000])
+        self.assertEqual(proto.trafficStats.incomingOctetsAppLevel, 500000)
+
+    def test_chunked(self):
+        proto = create_deflate_protocol()
+        chunks = []
+        proto.onMessageFrameData = lambda payload: chunks.append(len(payload))
+        proto._dataReceived(compressed_frame(b'\x00' * 300000))
+        self.assertEqual(sum(chunks), 300000)
+        self.assertTrue(max(chunks) <= protocol.WebSocketProtocol._DECOMPRESS_CHUNK_SIZE)
+
+    def test_message_too_big(self):
+        proto = create_deflate_protocol(maxMessagePayloadSize=1000000)
+        received = []
+        proto.onMessage = lambda payload, isBinary: received.append(payload)
+        proto._dataReceived(compressed_frame(b'\x00' * 50000000))
+        self.assertEqual(received, [])
+        self.assertTrue(proto.wasMaxMessagePayloadSizeExceeded)
+        self.assertEqual(proto.state, protocol.WebSocketProtocol.STATE_CLOSED)
+        self.assertTrue(proto.trafficStats.incomingOctetsAppLevel <= 1000000)
+
+    @unittest.skipIf(zstandard is None, "zstandard not installed")
+    def test_zstd_message_too_big(self):
+        proto = create_deflate_protocol(maxMessagePayloadSize=1000000)
+        proto._perMessageCompress = PerMessageZstd(True, False, False)
+        chunks = []
+        proto.onMessageFrameData = lambda payload: chunks.append(len(payload))
+        proto._dataReceived(compressed_frame(b'\x00' * 50000000, PerMessageZstd(False, False, False)))
+        self.assertTrue(max(chunks) <= protocol.WebSocketProtocol._DECOMPRESS_CHUNK_SIZE)
+        self.assertTrue(proto.wasMaxMessagePayloadSizeExceeded)
+        self.assertEqual(proto.state, protocol.WebSocketProtocol.STATE_CLOSED)
+        self.assertTrue(proto.trafficStats.incomingOctetsAppLevel <= 1000000)
+
+
+class TestCompressionPolicy(unittest.TestCase):
+
+    def test_no_policy(self):
+        proto = create_deflate_protocol()
+        proto.sendMessage(b'{}')
+        self.assertEqual(proto.transport.written[0][0:1], b'\xc1')
+        self.assertEqual(proto.trafficStats.outgoingCompressedMessages, 1)
+        self.assertEqual(proto.trafficStats.outgoingCompressionTime, 0)
+
+    def test_adaptive(self):
+        proto = create_deflate_protocol(perMessageCompressionPolicy=AdaptivePerMessageCompressPolicy(minSize=64))
+
+        # too small
+        proto.sendMessage(b'{}')
+        self.assertEqual(proto.transport.written[0], b'\x81\x02')
+
+        # compresses well
+        proto.transport.written = []
+        proto.sendMessage(b'{}' * 100)
+        self.assertEqual(proto.transport.written[0][0:1], b'\xc1')
+
+        # incompressible binary messages are no longer compressed ..
+        for _ in range(3):
+            proto.transport.written = []
+            proto.sendMessage(os.urandom(1000), isBinary=True)
+        self.assertEqual(proto.transport.written[0][0:1], b'\x82')
+
+        # .. but text messages still are
+        proto.transport.written = []
+        proto.sendMessage(b'{}' * 100)
+        self.assertEqual(proto.transport.written[0][0:1], b'\xc1')
+
+        stats = proto.trafficStats
+        self.assertEqual(stats.outgoingCompressedMessages, 3)
+        self.assertEqual(stats.outgoingCompressionSkipped, 3)
+        self.assertTrue(stats.recentBinaryCompressionRatio > 1)
+        self.assertTrue(stats.recentTextCompressionRatio < 0.2)
+
+
+class TestWriteBackpressure(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = FakeFactory()
+        self.factory.setProtocolOptions(writeBufferHighWatermark=1000, writeBufferLowWatermark=100)
+        self.proto = create_protocol(self.factory)
+
+    def test_pause_resume(self):
+        proto = self.proto
+        proto.transport.buffered = 1000
+        proto.sendMessage(b'hello')
+        self.assertFalse(proto.writePaused)
+
+        proto.transport.buffered = 1001
+        proto.sendMessage(b'hello')
+        self.assertTrue(proto.writePaused)
+        self.assertEqual(proto.events, ['paused'])
+
+        d = proto.drain()
+        proto.transport.buffered = 101
+        self.factory.runCalls()
+        self.assertTrue(proto.writePaused)
+        self.assertFalse(d.done)
+
+        proto.transport.buffered = 100
+        self.factory.runCalls()
+        self.assertFalse(proto.writePaused)
+        self.assertEqual(proto.events, ['paused', 'resumed'])
+        self.assertTrue(d.done)
+        self.assertEqual(self.factory.calls, [])
+
+    def test_watermark_options(self):
+        self.assertRaises(AssertionError, FakeFactory().setProtocolOptions,
+                          writeBufferHighWatermark=100, writeBufferLowWatermark=1000)
+        self.assertRaises(AssertionError, self.factory.setProtocolOptions, writeBufferLowWatermark=1001)
+        self.assertRaises(AssertionError, protocol.WebSocketClientFactory().setProtocolOptions,
+                          writeBufferHighWatermark=100, writeBufferLowWatermark=1000)
+
+        # the low watermark doesn't matter when write flow control is disabled
+        FakeFactory().setProtocolOptions(writeBufferLowWatermark=1000)
+
+    def test_drain_not_paused(self):
+        d = self.proto.drain()
+        self.assertTrue(d.done)
+
+    def test_connection_lost(self):
+        proto = self.proto
+        proto.transport.buffered = 2000
+        proto.sendMessage(b'hello')
+        d = proto.drain()
+        proto._connectionLost(None)
+        self.assertTrue(d.done)
+        self.assertEqual(self.factory.calls, [])
+
+    def test_transport_paused(self):
+        proto = self.proto
+        proto._pauseTransportWriting()
+        self.assertTrue(proto.writePaused)
+        d = proto.drain()
+        proto._resumeTransportWriting()
+        self.assertFalse(proto.writePaused)
+        self.assertEqual(proto.events, ['paused', 'resumed'])
+        self.assertTrue(d.done)
+
+    def test_transport_paused_disabled(self):
+        proto = create_protocol()
+        proto._pauseTransportWriting()
+        self.assertFalse(proto.writePaused)
+        d = proto.drain()
+        self.assertFalse(d.done)
+        proto._resumeTransportWriting()
+        self.assertTrue(d.done)
+        self.assertEqual(proto.events, [])
+
+
+class TestWriteCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = FakeFactory()
+        self.factory.setProtocolOptions(writeCoalesceDelay=0.001, writeCoalesceSize=1000)
+        self.proto = create_protocol(self.factory)
+
+    def test_delay(self):
+        for i in range(10):
+            self.proto.sendMessage(b'event')
+        self.assertEqual(self.proto.transport.writes, 0)
+        self.assertEqual(len(self.factory.calls), 1)
+
+        self.factory.runCalls()
+        self.assertEqual(self.proto.transport.writes, 1)
+        self.assertEqual(self.proto.transport.value(), b'\x81\x05event' * 10)
+        self.assertEqual(self.proto.trafficStats.outgoingOctetsWireLevel, 70)
+
+    def test_size(self):
+        self.proto.sendMessage(b'x' * 500)
+        self.assertEqual(self.proto.transport.writes, 0)
+        self.proto.sendMessage(b'x' * 500)
+        self.assertEqual(self.proto.transport.writes, 1)
+        self.assertEqual(self.factory.calls, [])
+
+    def test_flush(self):
+        self.proto.sendMessage(b'event')
+        self.proto.flush()
+        self.assertEqual(self.proto.transport.value(), b'\x81\x05event')
+        self.assertEqual(self.factory.calls, [])
+
+    def test_sync_keeps_order(self):
+        self.proto.sendMessage(b'first')
+        self.proto.sendMessage(b'second', sync=True)
+        self.assertEqual(self.proto.transport.value(), b'\x81\x05first\x81\x06second')
+
+    def test_control_frame(self):
+        self.proto.sendMessage(b'event')
+        self.proto.sendPing(b'ping')
+        self.assertEqual(self.proto.transport.value(), b'\x81\x05event\x89\x04ping')
+        self.assertEqual(self.factory.calls, [])
+
+    def test_connection_lost(self):
+        self.proto.sendMessage(b'event')
+        self.proto._connectionLost(None)
+        self.assertEqual(self.factory.calls, [])
+        self.assertEqual(self.proto.transport.writes, 0)
+
+
+class TestBroadcastGroup(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = FakeFactory()
+        self.group = self.factory.getBroadcastGroup(u'ticks', maxBufferSize=1000)
+
+    def test_get_group(self):
+        self.assertTrue(self.factory.getBroadcastGroup(u'ticks') is self.group)
+        self.factory.removeBroadcastGroup(u'ticks')
+        self.assertFalse(self.factory.getBroadcastGroup(u'ticks') is self.group)
+
+    def test_send_frames_once(self):
+        protos = [create_protocol(self.factory) for _ in range(3)]
+        for proto in protos:
+            self.group.add(proto)
+        self.assertEqual(self.group.sendMessage(b'hello'), 3)
+        for proto in protos:
+            self.assertEqual(proto.transport.value(), b'\x81\x05hello')
+        self.assertTrue(protos[0].transport.written[1] is protos[2].transport.written[1])
+        self.assertEqual(self.group.stats.messages, 1)
+        self.assertEqual(self.group.stats.delivered, 3)
+        self.assertEqual(self.group.stats.octets, 21)
+
+    def test_skip_slow_consumer(self):
+        fast = create_protocol(self.factory)
+        slow = create_protocol(self.factory)
+        slow.transport.buffered = 1001
+        self.group.add(fast)
+        self.group.add(slow)
+        self.assertEqual(self.group.sendMessage(b'hello'), 1)
+        self.assertEqual(slow.transport.written, [])
+        self.assertEqual(self.group.stats.skipped, 1)
+
+    def test_skip_paused_consumer(self):
+        # e.g. a Twisted transport, which doesn't tell its buffer size
+        proto = create_protocol(self.factory)
+        proto._pauseTransportWriting()
+        self.group.add(proto)
+        self.assertEqual(self.group.sendMessage(b'hello'), 0)
+        proto._resumeTransportWriting()
+        self.assertEqual(self.group.sendMessage(b'hello'), 1)
+
+    def test_connection_lost(self):
+        proto = create_protocol(self.factory)
+        self.group.add(proto)
+        self.assertTrue(proto in self.group)
+        proto._connectionLost(None)
+        self.assertEqual(len(self.group), 0)
+
+    def test_compressed_variants(self):
+        protos = []
+        for noContextTakeover, windowBits in [(True, 15), (True, 15), (True, 10), (False, 15)]:
+            proto = create_protocol(self.factory)
+            proto._perMessageCompress = PerMessageDeflate(True, noContextTakeover, False, windowBits, 0, 0)
+            self.group.add(proto)
+            protos.append(proto)
+        payload = b'tick ' * 100
+        self.group.sendMessage(payload)
+        self.assertEqual(self.group.stats.compressed, 2)
+        self.assertTrue(protos[0].transport.written[1] is protos[1].transport.written[1])
+        for proto in protos:
+            data = proto.transport.value()
+            self.assertEqual(data[0:1], b'\xc1')
+            self.assertEqual(zlib.decompressobj(-15).decompress(data[2:] + b'\x00\x00\xff\xff'), payload)
+
+
+class TestHandshakeHeader(unittest.TestCase):
+
+    HANDSHAKE = handshake_request()
+
+    def setUp(self):
+        self.factory = FakeFactory()
+        self.proto = create_connecting_protocol(self.factory)
+
+    def test_trickled_handshake(self):
+        for i in range(len(self.HANDSHAKE)):
+            self.proto._dataReceived(self.HANDSHAKE[i:i + 1])
+        self.assertEqual(self.proto.state, protocol.WebSocketProtocol.STATE_OPEN)
+        self.assertTrue(self.proto.transport.value().startswith(b'HTTP/1.1 101'))
+        self.assertTrue(b's3pPLMBiTxaQ9kYGzzhZRbK+xOo=' in self.proto.transport.value())
+
+    def test_trickled_long_handshake(self):
+        handshake = handshake_request(extraHeaders=b'X-Padding: ' + b'x' * 20000 + b'\r\n')
+        for i in range(len(handshake) - 1):
+            self.proto._dataReceived(handshake[i:i + 1])
+
+            # received octets are kept as is, and each scan only looks at the new ones
+            self.assertEqual(len(self.proto.data._chunks), i + 1)
+        self.proto._dataReceived(handshake[-1:])
+        self.assertEqual(self.proto.state, protocol.WebSocketProtocol.STATE_OPEN)
+
+    def test_header_too_large(self):
+        self.factory.setProtocolOptions(maxHandshakeHeaderSize=len(self.HANDSHAKE) - 1)
+        self.proto.maxHandshakeHeaderSize = self.factory.maxHandshakeHeaderSize
+        self.proto._dataReceived(self.HANDSHAKE[:-4])
+        self.assertEqual(self.proto.transport.value(), b'')
+        self.proto._dataReceived(self.HANDSHAKE[-4:])
+        self.assertTrue(self.proto.transport.value().startswith(b'HTTP/1.1 431'))
+        self.assertEqual(self.proto.state, protocol.WebSocketProtocol.STATE_CLOSED)
+
+    def test_incomplete_header_too_large(self):
+        self.proto.maxHandshakeHeaderSize = 64
+        self.proto._dataReceived(b'GET / HTTP/1.1\r\nX-Padding: ' + b'x' * 64)
+        self.assertTrue(self.proto.transport.value().startswith(b'HTTP/1.1 431'))
+
+    def test_too_many_headers(self):
+        self.proto.maxHandshakeHeaderCount = 4
+        self.proto._dataReceived(self.HANDSHAKE)
+        self.assertTrue(self.proto.transport.value().startswith(b'HTTP/1.1 431'))
+
+        proto = create_connecting_protocol(self.factory)
+        proto.maxHandshakeHeaderCount = 5
+        proto._dataReceived(self.HANDSHAKE)
+        self.assertEqual(proto.state, protocol.WebSocketProtocol.STATE_OPEN)
+
+
+class TestHandshakeResponse(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = FakeFactory(server=u'Test', headers={u'X-Node': [u'a', u'b']})
+
+    def test_default_template(self):
+        proto = create_connecting_protocol(self.factory)
+        proto._dataReceived(handshake_request())
+        self.assertEqual(proto.transport.value(),
+                         b'HTTP/1.1 101 Switching Protocols\r\n'
+                         b'Server: Test\r\n'
+                         b'Upgrade: WebSocket\r\n'
+                         b'Connection: Upgrade\r\n'
+                         b'X-Node: a\r\n'
+                         b'X-Node: b\r\n'
+                         b'Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=\r\n'
+                         b'\r\n')
+        template = self.factory._handshakeResponseDefault
+
+        proto = create_connecting_protocol(self.factory)
+        proto._dataReceived(handshake_request(key=b'AQIDBAUGBwgJCgsMDQ4PEA=='))
+        self.assertTrue(self.factory._handshakeResponseDefault is template)
+        self.assertTrue(b'Sec-WebSocket-Accept: C/0nmHhBztSRGR1CwL6Tf4ZjwpY=\r\n' in proto.transport.value())
+        self.assertEqual(self.factory._handshakeResponseTemplates, {})
+
+    def test_negotiated_template(self):
+        for _ in range(2):
+            proto = create_connecting_protocol(self.factory)
+            proto.onConnect = lambda request: (u'wamp.2.json', {u'X-Session': u'1'})
+            proto._dataReceived(handshake_request(extraHeaders=b'Sec-WebSocket-Protocol: wamp.2.json\r\n'))
+            response = proto.transport.value()
+            self.assertTrue(response.endswith(b'X-Node: b\r\n'
+                                              b'X-Session: 1\r\n'
+                                              b'Sec-WebSocket-Protocol: wamp.2.json\r\n'
+                                              b'Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=\r\n'
+                                              b'\r\n'))
+        self.assertEqual(len(self.factory._handshakeResponseTemplates), 1)
+
+    def test_session_parameters(self):
+        proto = create_connecting_protocol(self.factory)
+        proto._dataReceived(handshake_request())
+        self.factory.setSessionParameters(server=u'Other')
+        proto = create_connecting_protocol(self.factory)
+        proto._dataReceived(handshake_request())
+        self.assertTrue(b'Server: Other\r\n' in proto.transport.value())
+        self.assertFalse(b'X-Node' in proto.transport.value())
+
+
+class TestHandshakeAdmission(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.
+        self.factory = FakeFactory()
+        self.factory.setProtocolOptions(openHandshakeTimeout=0)
+        self.factory.handshakeAdmission.clock = lambda: self.now
+
+    def connect(self, peer='tcp:127.0.0.1:12345'):
+        proto = FakeProtocol()
+        proto.factory = self.factory
+        proto.transport = FakeTransport()
+        proto.peer = peer
+        proto._connectionMade()
+        return proto
+
+    def test_max_open_handshakes(self):
+        self.factory.setProtocolOptions(maxOpenHandshakes=2)
+        protos = [self.connect() for _ in range(3)]
+        protos[2]._dataReceived(b'GET / HTTP/1.1\r\n')
+        response = protos[2].transport.value()
+        self.assertTrue(response.startswith(b'HTTP/1.1 503'))
+        self.assertTrue(b'Retry-After: 1\r\n' in response)
+
+        protos[0]._dataReceived(handshake_request())
+        self.assertEqual(protos[0].state, protocol.WebSocketProtocol.STATE_OPEN)
+        protos[1]._connectionLost(None)
+        self.assertEqual(self.factory.handshakeAdmission.inFlight, 0)
+        self.connect()
+        admission = self.factory.handshakeAdmission
+        self.assertEqual((admission.accepted, admission.deferred, admission.rejected), (3, 0, 1))
+
+    def test_rate_limit(self):
+        self.factory.setProtocolOptions(handshakeRateLimit=10, handshakeRateBurst=2, handshakeMaxDelay=0.25)
+        self.connect()
+        self.connect()
+        deferred = self.connect()
+        self.assertEqual(len(self.factory.calls), 1)
+        deferred._dataReceived(handshake_request())
+        self.assertEqual(deferred.transport.value(), b'')
+
+        self.connect()
+        rejected = self.connect()
+        rejected._dataReceived(handshake_request())
+        self.assertTrue(rejected.transport.value().startswith(b'HTTP/1.1 503'))
+
+        self.factory.runCalls()
+        self.assertEqual(deferred.state, protocol.WebSocketProtocol.STATE_OPEN)
+        admission = self.factory.handshakeAdmission
+        self.assertEqual((admission.accepted, admission.deferred, admission.rejected), (4, 2, 1))
+
+        self.now += 1
+        self.connect()
+        self.assertEqual(admission.deferred, 2)
+
+    def test_rate_limit_per_peer(self):
+        self.factory.setProtocolOptions(handshakeRateLimit=1, handshakeRateBurst=1, handshakeMaxDelay=0,
+                                        handshakeRateLimitPerPeer=True)
+        self.connect('tcp4:10.0.0.1:1000')
+        self.connect('tcp4:10.0.0.2:1000')
+        self.connect('tcp4:10.0.0.1:1001')
+        admission = self.factory.handshakeAdmission
+        self.assertEqual((admission.accepted, admission.rejected), (2, 1))
+
+    def test_deferred_connection_lost(self):
+        self.factory.setProtocolOptions(handshakeRateLimit=1, handshakeRateBurst=1)
+        self.connect()
+        proto = self.connect()
+        proto._connectionLost(None)
+        self.assertEqual(self.factory.calls, [])
+        self.assertEqual(self.factory.handshakeAdmission.inFlight, 1)
+
+
+class TestTimerWheel(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.
+        self.factory = FakeFactory()
+        self.wheel = protocol.TimerWheel(self.factory, 1, clock=lambda: self.now)
+        self.fired = []
+
+    def test_batched_calls(self):
+        for i in range(10):
+            self.wheel.callLater(5 + i * 0.1, lambda i=i: self.fired.append(i))
+        self.wheel.callLater(7, lambda: self.fired.append('late'))
+        self.assertEqual(len(self.factory.calls), 1)
+        self.assertEqual(len(self.wheel), 11)
+
+        self.now = 1005.
+        self.factory.runCalls()
+        self.assertEqual(sorted(self.fired), [0])
+        self.now = 1006.
+        self.factory.runCalls()
+        self.assertEqual(sorted(self.fired), list(range(10)))
+        self.now = 1007.
+        self.factory.runCalls()
+        self.assertEqual(self.fired[-1], 'late')
+        self.assertEqual(self.factory.calls, [])
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_cancel(self):
+        call = self.wheel.callLater(1, lambda: self.fired.append(1))
+        self.wheel.callLater(2, lambda: self.fired.append(2))
+        call.cancel()
+        call.cancel()
+        self.now = 1002.
+        self.factory.runCalls()
+        self.factory.runCalls()
+        self.assertEqual(self.fired, [2])
+
+    def test_reschedule_from_call(self):
+        self.wheel.callLater(3, lambda: self.fired.append(3))
+
+        def first():
+            self.fired.append(1)
+            self.wheel.callLater(9, lambda: self.fired.append(10))
+        self.wheel.callLater(1, first)
+
+        self.now = 1001.
+        self.factory.runCalls()
+        self.now = 1003.
+        self.factory.runCalls()
+        self.assertEqual(self.fired, [1, 3])
+
+    def test_auto_ping(self):
+        self.factory.setProtocolOptions(autoPingInterval=10, autoPingTimeout=5, timerWheelResolution=1)
+        self.factory.timerWheel = self.wheel
+        protos = []
+        for _ in range(3):
+            proto = create_connecting_protocol(self.factory)
+            proto.openHandshakeTimeout = 0
+            proto._dataReceived(handshake_request())
+            proto.transport.written = []
+            protos.append(proto)
+        self.assertEqual(len(self.factory.calls), 1)
+
+        self.now = 1010.
+        self.factory.runCalls()
+        for proto in protos:
+            self.assertEqual(proto.transport.value()[0:2], b'\x89\x04')
+            self.assertTrue(proto.autoPingTimeoutCall is not None)
+        self.assertEqual(len(self.wheel), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
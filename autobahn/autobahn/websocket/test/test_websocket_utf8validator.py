@@ -0,0 +1,104 @@
+###############################################################################
+#
+# The MIT License (MIT)
+#
+# Copyright (c) Tavendo GmbH
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+###############################################################################
+
+from __future__ import absolute_import
+
+# from twisted.trial import unittest
+import unittest
+
+import random
+
+from autobahn.websocket.utf8validator import Utf8Validator, \
+    UTF8VALIDATOR_DFA, UTF8_ACCEPT, UTF8_REJECT
+
+
+def _validate(chunks):
+    # reference: run Hoehrmann's DFA octet by octet
+    res = []
+    state = UTF8_ACCEPT
+    total = 0
+    for chunk in chunks:
+        quad = None
+        for i, b in enumerate(bytearray(chunk)):
+            state = UTF8VALIDATOR_DFA[256 + state * 16 + UTF8VALIDATOR_DFA[b]]
+            if state == UTF8_REJECT:
+                quad = (False, False, i, total + i)
+                break
+        if quad is None:
+            total += len(chunk)
+            quad = (True, state == UTF8_ACCEPT, len(chunk), total)
+        res.append(quad)
+        if not quad[0]:
+            break
+    return res
+
+
+class TestUtf8Validator(unittest.TestCase):
+
+    VECTORS = [
+        b"",
+        b"Hello, world!",
+        u"\u03ba\u1f79\u03c3\u03bc\u03b5".encode('utf8'),
+        u"{\"topic\": \"com.myapp.\u00fcber\", \"args\": [1, 2, 3]}".encode('utf8'),
+        u"\U0001f600 emoji".encode('utf8'),
+        b"\xed\xa0\x80",            # surrogate
+        b"\xc0\xaf",                # overlong
+        b"\xe0\x80\xaf",            # overlong
+        b"\xf4\x90\x80\x80",        # > U+10FFFF
+        b"\xce\xba\xe1\xbd\xb9\xcf\x83\xce\xbc\xce\xb5\xed\xa0\x80edited",
+        b"ascii then \xff invalid",
+        b"ends within code point \xe1\xbd",
+    ]
+
+    def _check(self, chunks):
+        v = Utf8Validator()
+        res = []
+        for chunk in chunks:
+            quad = v.validate(chunk)
+            res.append(quad)
+            if not quad[0]:
+                break
+        self.assertEqual(res, _validate(chunks), chunks)
+
+    def test_vectors(self):
+        for data in self.VECTORS:
+            self._check([data])
+
+    def test_vectors_chunked(self):
+        for data in self.VECTORS:
+            for n in range(1, 6):
+                self._check([data[i:i + n] for i in range(0, len(data), n)])
+
+    def test_random(self):
+        rng = random.Random(42)
+        alphabet = bytearray(u"abc \u00e4\u00f6\u03ba\u20ac\U0001f600".encode('utf8'))
+        for _ in range(300):
+            data = bytearray(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            if rng.random() < 0.3 and data:
+                data[rng.randrange(len(data))] = rng.randint(0, 255)
+            data = bytes(data)
+            cut = sorted(rng.randint(0, len(data)) for _ in range(3))
+            self._check([data[:cut[0]], data[cut[0]:cut[1]], data[cut[1]:cut[2]], data[cut[2]:]])
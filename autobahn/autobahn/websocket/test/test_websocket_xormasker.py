@@ -0,0 +1,81 @@
+###############################################################################
+#
+# The MIT License (MIT)
+#
+# Copyright (c) Tavendo GmbH
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+###############################################################################
+
+from __future__ import absolute_import
+
+# from twisted.trial import unittest
+import unittest
+
+import os
+
+from autobahn.websocket.xormasker import XorMaskerNull, createXorMasker
+
+
+def _mask(mask, data, offset=0):
+    mask = bytearray(mask)
+    return bytes(bytearray([b ^ mask[(offset + i) & 3] for i, b in enumerate(bytearray(data))]))
+
+
+class TestXorMasker(unittest.TestCase):
+
+    def test_null(self):
+        masker = XorMaskerNull()
+        self.assertEqual(masker.process(b"hello"), b"hello")
+        self.assertEqual(masker.pointer(), 5)
+
+    def test_process(self):
+        mask = b"\x01\x02\x03\x04"
+        for length in [0, 1, 3, 4, 5, 127, 128, 129, 65536 + 7]:
+            data = os.urandom(length)
+            masker = createXorMasker(mask, length)
+            self.assertEqual(masker.process(data), _mask(mask, data))
+            self.assertEqual(masker.pointer(), length)
+
+    def test_process_chunked(self):
+        mask = os.urandom(4)
+        data = os.urandom(1000)
+        for length in [None, 1000]:
+            masker = createXorMasker(mask, length)
+            res = []
+            i = 0
+            for n in [1, 2, 3, 5, 7, 11, 200, 771]:
+                res.append(masker.process(data[i:i + n]))
+                i += n
+            self.assertEqual(b''.join(res), _mask(mask, data))
+            self.assertEqual(masker.pointer(), 1000)
+
+    def test_reset(self):
+        mask = b"abcd"
+        masker = createXorMasker(mask, 10)
+        masker.process(b"xyz")
+        masker.reset()
+        self.assertEqual(masker.pointer(), 0)
+        self.assertEqual(masker.process(b"abcd"), b"\x00\x00\x00\x00")
+
+    def test_leading_zeros(self):
+        mask = b"\x00\x00\x00\x00"
+        data = b"\x00\x00\x00\x01"
+        self.assertEqual(createXorMasker(mask, 4).process(data), data)
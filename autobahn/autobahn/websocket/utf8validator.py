@@ -68,6 +68,21 @@ except ImportError:
 
     import six
 
+    if hasattr(bytes, 'isascii'):
+
+        # Python 3.7 and above
+        def _isascii(ba):
+            return ba.isascii()
+
+    else:
+
+        def _isascii(ba):
+            try:
+                ba.decode('ascii')
+            except UnicodeDecodeError:
+                return False
+            return True
+
     if six.PY3:
 
         # Python 3 and above
@@ -126,13 +141,40 @@ except ImportError:
                 When ``valid? == True``, currentIndex will be ``len(ba)`` and ``totalIndex`` the
                 total amount of consumed bytes.
                 """
+                l = len(ba)
+                i = 0
+                state = self.state
+
+                # finish a code point begun in a previous chunk using the DFA
+                while i < l and state != UTF8_ACCEPT:
+                    state = UTF8VALIDATOR_DFA_S[256 + (state << 4) + UTF8VALIDATOR_DFA_S[ba[i]]]
+                    if state == UTF8_REJECT:
+                        self.state = state
+                        self.i += i
+                        return False, False, i, self.i
+                    i += 1
+
+                if state == UTF8_ACCEPT and i < l:
+                    # fast path: check the (rest of the) chunk in one go, either as
+                    # pure ASCII or with a single decode. On failure, the DFA below
+                    # picks up at the first octet not part of a complete code point,
+                    # which is either invalid or the start of a code point spanning
+                    # into the next chunk.
+                    rest = ba[i:] if i else ba
+                    if _isascii(rest):
+                        i = l
+                    else:
+                        try:
+                            rest.decode('utf8')
+                        except UnicodeDecodeError as e:
+                            i += e.start
+                        else:
+                            i = l
+
                 #
                 # The code here is written for optimal JITting in PyPy, not for best
                 # readability by your grandma or particular elegance. Do NOT touch!
                 #
-                l = len(ba)
-                i = 0
-                state = self.state
                 while i < l:
                     # optimized version of decode(), since we are not interested in actual code points
                     state = UTF8VALIDATOR_DFA_S[256 + (state << 4) + UTF8VALIDATOR_DFA_S[ba[i]]]
@@ -201,13 +243,20 @@ except ImportError:
                 When ``valid? == True``, currentIndex will be ``len(ba)`` and ``totalIndex`` the
                 total amount of consumed bytes.
                 """
+                l = len(ba)
+                i = 0
+                state = self.state
+
+                # fast path: a chunk of pure ASCII starting on a code point boundary
+                # is valid as a whole. Note that we cannot use the UTF-8 codec for
+                # non-ASCII on Python 2, since it accepts encoded surrogates.
+                if state == UTF8_ACCEPT and _isascii(ba):
+                    i = l
+
                 #
                 # The code here is written for optimal JITting in PyPy, not for best
                 # readability by your grandma or particular elegance. Do NOT touch!
                 #
-                l = len(ba)
-                i = 0
-                state = self.state
                 while i < l:
                     # optimized version of decode(), since we are not interested in actual code points
                     state = ord(UTF8VALIDATOR_DFA_S[256 + (state << 4) + ord(UTF8VALIDATOR_DFA_S[ord(ba[i])])])
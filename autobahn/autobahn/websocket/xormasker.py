@@ -34,16 +34,27 @@ try:
 
 except ImportError:
     # fallback to pure Python implementation
+    #
+    # Instead of XORing octet by octet in a Python loop, payload and
+    # (repeated) mask are converted to (big) integers and XORed as a
+    # whole, which runs word-wide in the interpreter's C code.
 
-    # http://stackoverflow.com/questions/15014310/python3-xrange-lack-hurts
-    try:
-        xrange
-    except NameError:
-        # Python 3
-        # noinspection PyShadowingBuiltins
-        xrange = range
+    import binascii
 
-    from array import array
+    if six.PY3:
+
+        def _xor(data, mask):
+            return (int.from_bytes(data, 'big') ^ int.from_bytes(mask, 'big')).to_bytes(len(data), 'big')
+
+    else:
+
+        def _xor(data, mask):
+            value = int(binascii.hexlify(data), 16) ^ int(binascii.hexlify(mask), 16)
+            return binascii.unhexlify('%0*x' % (2 * len(data), value))
+
+    def _repeat(mask, length):
+        # repeat 4 octet mask to cover exactly length octets
+        return mask * (length >> 2) + mask[:length & 3]
 
     class XorMaskerNull:
 
@@ -66,7 +77,7 @@ except ImportError:
         def __init__(self, mask):
             assert len(mask) == 4
             self.ptr = 0
-            self.msk = array('B', mask)
+            self.msk = mask
 
         def pointer(self):
             return self.ptr
@@ -76,33 +87,19 @@ except ImportError:
 
         def process(self, data):
             dlen = len(data)
-            payload = array('B', data)
-            for k in xrange(dlen):
-                payload[k] ^= self.msk[self.ptr & 3]
-                self.ptr += 1
-            if six.PY3:
-                return payload.tobytes()
-            else:
-                return payload.tostring()
+            if dlen == 0:
+                return b''
+            shift = self.ptr & 3
+            msk = self.msk[shift:] + self.msk[:shift]
+            self.ptr += dlen
+            return _xor(data, _repeat(msk, dlen))
 
     class XorMaskerShifted1:
 
         def __init__(self, mask):
             assert len(mask) == 4
             self.ptr = 0
-            self.mskarray = [array('B'), array('B'), array('B'), array('B')]
-            if six.PY3:
-                for j in xrange(4):
-                    self.mskarray[0].append(mask[j & 3])
-                    self.mskarray[1].append(mask[(j + 1) & 3])
-                    self.mskarray[2].append(mask[(j + 2) & 3])
-                    self.mskarray[3].append(mask[(j + 3) & 3])
-            else:
-                for j in xrange(4):
-                    self.mskarray[0].append(ord(mask[j & 3]))
-                    self.mskarray[1].append(ord(mask[(j + 1) & 3]))
-                    self.mskarray[2].append(ord(mask[(j + 2) & 3]))
-                    self.mskarray[3].append(ord(mask[(j + 3) & 3]))
+            self.mskarray = [mask[j:] + mask[:j] for j in range(4)]
 
         def pointer(self):
             return self.ptr
@@ -112,15 +109,11 @@ except ImportError:
 
         def process(self, data):
             dlen = len(data)
-            payload = array('B', data)
+            if dlen == 0:
+                return b''
             msk = self.mskarray[self.ptr & 3]
-            for k in xrange(dlen):
-                payload[k] ^= msk[k & 3]
             self.ptr += dlen
-            if six.PY3:
-                return payload.tobytes()
-            else:
-                return payload.tostring()
+            return _xor(data, _repeat(msk, dlen))
 
     def createXorMasker(mask, length=None):
         if length is None or length < 128:
@@ -0,0 +1,316 @@
+###############################################################################
+#
+# The MIT License (MIT)
+#
+# Copyright (c) Tavendo GmbH
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+###############################################################################
+
+"""
+Benchmark for the WebSocket compression extensions (PMCEs).
+
+Drives the `PerMessageCompress` implementations directly (without network)
+with synthetic or recorded message corpora, for a grid of extension parameters,
+and reports compression ratio, throughput, per-message latency percentiles and
+peak memory per connection.
+
+Usage:
+
+    python benchmark/bench_compress.py
+    python benchmark/bench_compress.py --corpus json --json > results.json
+    python benchmark/bench_compress.py --file messages.txt --extension permessage-deflate
+"""
+
+from __future__ import absolute_import, print_function
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python < 3.4: no memory measurement
+    tracemalloc = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+import autobahn
+from autobahn.websocket.compress import PERMESSAGE_COMPRESSION_EXTENSION, \
+    PerMessageDeflate
+
+_now = timeit.default_timer
+
+
+def corpus_json(count, rnd):
+    """
+    WAMP-like JSON events: repetitive structure with varying values.
+    """
+    messages = []
+    for i in range(count):
+        event = [36, rnd.randint(1, 2 ** 53), rnd.randint(1, 2 ** 53), {},
+                 [u"com.example.topic{}".format(rnd.randint(1, 20))],
+                 {u"seq": i, u"value": rnd.random(), u"tags": [u"alpha", u"beta", u"gamma"][:rnd.randint(0, 3)],
+                  u"text": u" ".join(rnd.choice([u"lorem", u"ipsum", u"dolor", u"sit", u"amet"]) for _ in range(rnd.randint(1, 20)))}]
+        messages.append((json.dumps(event, separators=(',', ':')).encode('utf8'), False))
+    return messages
+
+
+def corpus_msgpack(count, rnd):
+    """
+    The JSON corpus events serialized with MsgPack.
+    """
+    if msgpack is None:
+        raise Exception("msgpack not installed")
+    return [(msgpack.packb(json.loads(payload.decode('utf8'))), True) for payload, _ in corpus_json(count, rnd)]
+
+
+def corpus_binary(count, rnd):
+    """
+    Binary messages: half random (incompressible), half with long repeats.
+    """
+    messages = []
+    for i in range(count):
+        size = rnd.randint(64, 4096)
+        if i % 2:
+            payload = bytes(bytearray(rnd.getrandbits(8) for _ in range(size)))
+        else:
+            block = bytes(bytearray(rnd.getrandbits(8) for _ in range(32)))
+            payload = (block * (size // 32 + 1))[:size]
+        messages.append((payload, True))
+    return messages
+
+
+CORPORA = {
+    'json': corpus_json,
+    'msgpack': corpus_msgpack,
+    'binary': corpus_binary,
+}
+
+
+def corpus_file(filename):
+    """
+    Recorded corpus: one message per line (text messages, line ends stripped).
+    """
+    with open(filename, 'rb') as f:
+        return [(line.rstrip(b'\r\n'), False) for line in f if line.strip()]
+
+
+def configurations(extensions):
+    """
+    Generate the parameter grid: (extension, params, factory) where factory(isServer)
+    creates the PMCE for one side of a connection.
+    """
+    if 'permessage-deflate' in extensions:
+        for windowBits in [9, 12, 15]:
+            for memLevel in [1, 4, 8, 9]:
+                for noContextTakeover in [False, True]:
+                    params = {'windowBits': windowBits, 'memLevel': memLevel, 'noContextTakeover': noContextTakeover}
+                    yield ('permessage-deflate', params,
+                           lambda isServer, wb=windowBits, ml=memLevel, nct=noContextTakeover:
+                           PerMessageDeflate(isServer, nct, nct, wb, wb, ml))
+
+    if 'permessage-bzip2' in extensions and 'permessage-bzip2' in PERMESSAGE_COMPRESSION_EXTENSION:
+        PMCE = PERMESSAGE_COMPRESSION_EXTENSION['permessage-bzip2']['PMCE']
+        for level in [1, 9]:
+            yield ('permessage-bzip2', {'compressLevel': level},
+                   lambda isServer, level=level: PMCE(isServer, level, level))
+
+    if 'permessage-snappy' in extensions and 'permessage-snappy' in PERMESSAGE_COMPRESSION_EXTENSION:
+        PMCE = PERMESSAGE_COMPRESSION_EXTENSION['permessage-snappy']['PMCE']
+        for noContextTakeover in [False, True]:
+            yield ('permessage-snappy', {'noContextTakeover': noContextTakeover},
+                   lambda isServer, nct=noContextTakeover: PMCE(isServer, nct, nct))
+
+    if 'permessage-zstd' in extensions and 'permessage-zstd' in PERMESSAGE_COMPRESSION_EXTENSION:
+        PMCE = PERMESSAGE_COMPRESSION_EXTENSION['permessage-zstd']['PMCE']
+        for level in [1, 3, 9]:
+            for noContextTakeover in [False, True]:
+                yield ('permessage-zstd', {'compressionLevel': level, 'noContextTakeover': noContextTakeover},
+                       lambda isServer, level=level, nct=noContextTakeover: PMCE(isServer, nct, nct, None, level))
+
+
+def percentile(values, p):
+    """
+    Percentile (nearest rank) of sorted values.
+    """
+    if not values:
+        return None
+    k = max(0, min(len(values) - 1, int(round(p / 100. * len(values) + 0.5)) - 1))
+    return values[k]
+
+
+def run(factory, messages):
+    """
+    Send all messages from a sender to a receiver PMCE, timing each message.
+    """
+    sender = factory(True)
+    receiver = factory(False)
+
+    compressTimes = []
+    decompressTimes = []
+    octetsIn = 0
+    octetsOut = 0
+
+    for payload, _ in messages:
+        started = _now()
+        sender.startCompressMessage()
+        data = sender.compressMessageData(payload) + sender.endCompressMessage()
+        compressed = _now()
+        receiver.startDecompressMessage()
+        result = receiver.decompressMessageData(data)
+        receiver.endDecompressMessage()
+        decompressed = _now()
+
+        if result != payload:
+            raise Exception("message did not survive roundtrip")
+
+        compressTimes.append(compressed - started)
+        decompressTimes.append(decompressed - compressed)
+        octetsIn += len(payload)
+        octetsOut += len(data)
+
+    sender.close()
+    receiver.close()
+
+    return compressTimes, decompressTimes, octetsIn, octetsOut
+
+
+def peak_memory(factory, messages):
+    """
+    Peak memory (in octets) allocated for one connection (both directions),
+    measured in a separate run, since tracing slows down everything.
+    """
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        sender = factory(True)
+        receiver = factory(False)
+        for payload, _ in messages:
+            sender.startCompressMessage()
+            data = sender.compressMessageData(payload) + sender.endCompressMessage()
+            receiver.startDecompressMessage()
+            receiver.decompressMessageData(data)
+            receiver.endDecompressMessage()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(extension, params, factory, corpus, messages, repeat):
+    best = None
+    for _ in range(repeat):
+        result = run(factory, messages)
+        if best is None or sum(result[0]) < sum(best[0]):
+            best = result
+    compressTimes, decompressTimes, octetsIn, octetsOut = best
+
+    compressTime = sum(compressTimes)
+    decompressTime = sum(decompressTimes)
+    compressTimes.sort()
+    decompressTimes.sort()
+
+    return {
+        'extension': extension,
+        'params': params,
+        'corpus': corpus,
+        'messages': len(messages),
+        'octetsIn': octetsIn,
+        'octetsOut': octetsOut,
+        'ratio': float(octetsOut) / octetsIn if octetsIn else None,
+        'compressThroughput': octetsIn / compressTime if compressTime else None,
+        'decompressThroughput': octetsIn / decompressTime if decompressTime else None,
+        'compressLatency': dict(('p%d' % p, percentile(compressTimes, p)) for p in (50, 90, 99, 100)),
+        'decompressLatency': dict(('p%d' % p, percentile(decompressTimes, p)) for p in (50, 90, 99, 100)),
+        'peakMemory': peak_memory(factory, messages),
+    }
+
+
+def print_table(results):
+    header = "%-20s %-50s %-8s %7s %10s %10s %9s %9s %9s %10s" % \
+             ("extension", "params", "corpus", "ratio", "comp MB/s", "decomp MB/s",
+              "p50 us", "p99 us", "max us", "peak KB")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        params = ", ".join("%s=%s" % kv for kv in sorted(r['params'].items()))
+        peak = "%10.1f" % (r['peakMemory'] / 1024.) if r['peakMemory'] is not None else "%10s" % "-"
+        print("%-20s %-50s %-8s %7.3f %10.1f %10.1f %9.1f %9.1f %9.1f %s" %
+              (r['extension'], params, r['corpus'], r['ratio'],
+               r['compressThroughput'] / 1e6, r['decompressThroughput'] / 1e6,
+               r['compressLatency']['p50'] * 1e6, r['compressLatency']['p99'] * 1e6,
+               r['compressLatency']['p100'] * 1e6, peak))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WebSocket compression extensions.")
+    parser.add_argument("--corpus", action="append", choices=sorted(CORPORA),
+                        help="Synthetic corpus to use (may be given multiple times, default: all available).")
+    parser.add_argument("--file", action="append", default=[],
+                        help="Recorded corpus file with one (text) message per line (may be given multiple times).")
+    parser.add_argument("--extension", action="append", choices=sorted(PERMESSAGE_COMPRESSION_EXTENSION),
+                        help="Extension to benchmark (may be given multiple times, default: all available).")
+    parser.add_argument("--messages", type=int, default=2000, help="Number of messages in synthetic corpora.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeat each run and report the fastest.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic corpora.")
+    parser.add_argument("--json", action="store_true", help="Output results as JSON.")
+    args = parser.parse_args()
+
+    corpora = []
+    for name in args.corpus or ([] if args.file else sorted(CORPORA)):
+        if name == 'msgpack' and msgpack is None and not args.corpus:
+            continue
+        corpora.append((name, CORPORA[name](args.messages, random.Random(args.seed))))
+    for filename in args.file:
+        corpora.append((os.path.basename(filename), corpus_file(filename)))
+
+    extensions = args.extension or sorted(PERMESSAGE_COMPRESSION_EXTENSION)
+
+    results = []
+    for extension, params, factory in configurations(extensions):
+        for corpus, messages in corpora:
+            results.append(benchmark(extension, params, factory, corpus, messages, args.repeat))
+
+    if args.json:
+        report = {
+            'autobahn': autobahn.__version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+    else:
+        print_table(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -88,7 +88,9 @@ packages = [
     'autobahn.websocket',
     'autobahn.websocket.test',
     'autobahn.asyncio',
+    'autobahn.asyncio.test',
     'autobahn.twisted',
+    'autobahn.twisted.test',
     'twisted.plugins'
 ]
 
@@ -150,7 +152,7 @@ setup(
 
         # for (non-standard) WebSocket compression methods - not needed if you
         # only want standard WebSocket compression ("permessage-deflate")
-        'compress': ["python-snappy>=0.5", "lz4>=0.2.1"],
+        'compress': ["python-snappy>=0.5", "lz4>=0.2.1", "zstandard>=0.8"],
 
         # needed if you want WAMPv2 binary serialization support
         'serialization': ["msgpack-python>=0.4.0"]
@@ -101,6 +101,27 @@ class BroadcastPreparedServerFactory(BroadcastServerFactory):
             print("prepared message sent to {}".format(c.peer))
 
 
+class BroadcastGroupServerFactory(BroadcastServerFactory):
+
+    """
+    Functionally same as above, but using a broadcast group, which
+    frames (and compresses) a message only once for all members.
+    """
+
+    def register(self, client):
+        print("registered client {}".format(client.peer))
+        self.getBroadcastGroup(u'clients').add(client)
+
+    def unregister(self, client):
+        print("unregistered client {}".format(client.peer))
+        self.getBroadcastGroup(u'clients').remove(client)
+
+    def broadcast(self, msg):
+        print("broadcasting message '{}' to group ..".format(msg))
+        sent = self.getBroadcastGroup(u'clients').sendMessage(msg.encode('utf8'))
+        print("message sent to {} clients".format(sent))
+
+
 if __name__ == '__main__':
 
     if len(sys.argv) > 1 and sys.argv[1] == 'debug':
@@ -111,6 +132,7 @@ if __name__ == '__main__':
 
     ServerFactory = BroadcastServerFactory
     # ServerFactory = BroadcastPreparedServerFactory
+    # ServerFactory = BroadcastGroupServerFactory
 
     factory = ServerFactory("ws://localhost:9000",
                             debug=debug,